@@ -0,0 +1,718 @@
+import base64
+import binascii
+import json
+import logging
+import re
+import uuid
+from datetime import datetime
+from psycopg import sql
+from reference_data import ENRICHMENT_VALUE_BOOLEAN
+
+# Shared by the WSGI app (app.py) and the ASGI app (asgi_app.py): the SQL both run, and the
+# request validation and helpers that depend on neither the web framework nor the driver mode.
+
+logger = logging.getLogger(__name__)
+
+# Parsed rows written to TemporaryDischarge per COPY batch; bounds ingestion memory
+INGEST_BATCH_SIZE = 1000
+
+# POST /api/approve: rows approved per transaction, and the most IDs one request may list
+APPROVE_CHUNK_SIZE = 200
+APPROVE_MAX_IDS = 5000
+
+# GET /raw-data page sizes
+RAW_DATA_PAGE_SIZE = 50
+RAW_DATA_MAX_PAGE_SIZE = 200
+
+# GET /raw-data status filter values -> the status shown for an import
+RAW_DATA_STATUSES = {
+    "empty": "No discharge records found",
+    "reviewed": "All records reviewed",
+    "pending": "Records still pending review",
+}
+
+#Pretend the user is signed in
+session_user_id = "77118899-1111-1111-1111-111111111111"  # Replace with the actual user_id
+
+# Review and discharge payloads change whenever one of their rows is inserted, updated
+# (touch_updated_at keeps updated_at current) or deleted. The version digests the row
+# count and the sum and latest of updated_at, so any of those changes it; the latest
+# alone would miss an update that leaves a row older than the newest one.
+CHANGE_VERSION_COLUMNS = "count(*) || ':' || coalesce(max({t}.updated_at)::text, '') || ':' || coalesce(sum(extract(epoch FROM {t}.updated_at)), 0)"
+
+# Resources that are re-polled while a reviewer has them open: revalidate on every use
+REVALIDATE_HEADERS = {'Cache-Control': 'private, no-cache'}
+
+# Columns of TemporaryDischarge a client may not change through PUT /api/temp-discharge
+DISCHARGE_EXCLUDED_KEYS = ["temp_discharge_id", "raw_data_id", "approved_by", "created_by", "updated_by", "updated_at"]
+
+# ETag of the /review payload for a raw_data_id; no row if it does not exist
+REVIEW_VERSION_SQL = f"""
+    SELECT md5(coalesce(r.updated_at::text, '') || '/' || d.version || '/' || e.version)
+    FROM RawDataIngested r
+    CROSS JOIN LATERAL (
+        SELECT {CHANGE_VERSION_COLUMNS.format(t='td')} AS version
+        FROM TemporaryDischarge td
+        WHERE td.raw_data_id = r.raw_data_id
+    ) d
+    CROSS JOIN LATERAL (
+        SELECT {CHANGE_VERSION_COLUMNS.format(t='ed')} AS version
+        FROM TemporaryDischarge td
+        JOIN TemporaryEnrichmentData ed ON ed.temp_discharge_id = td.temp_discharge_id
+        WHERE td.raw_data_id = r.raw_data_id
+    ) e
+    WHERE r.raw_data_id = %s
+"""
+
+# ETag of the /api/temp-discharge payload for a temp_discharge_id; no row if it does not exist
+DISCHARGE_VERSION_SQL = f"""
+    SELECT md5(coalesce(td.updated_at::text, '') || '/' || e.version)
+    FROM TemporaryDischarge td
+    CROSS JOIN LATERAL (
+        SELECT {CHANGE_VERSION_COLUMNS.format(t='ed')} AS version
+        FROM TemporaryEnrichmentData ed
+        WHERE ed.temp_discharge_id = td.temp_discharge_id
+    ) e
+    WHERE td.temp_discharge_id = %s
+"""
+
+# The whole /review payload as JSON text, and whether the import has no discharges
+REVIEW_PAYLOAD_SQL = """
+    SELECT
+        json_build_object(
+            'rawData', json_build_object(
+                'fileName', r.source_file_name,
+                'uploadedBy', u.name,
+                'ingestTimestamp', r.created_at,
+                'contentSize', r.content_size,
+                -- The document itself is served separately so it can be streamed and cached
+                'contentUrl', '/raw-data/' || r.raw_data_id || '/content',
+                'importType', it.type_name
+            ),
+            'temporaryDischarge', COALESCE(d.discharges, '[]'::json)
+        )::text,
+        d.discharges IS NULL AS no_discharges
+    FROM RawDataIngested r
+    LEFT JOIN AppUser u ON r.updated_by = u.app_user_id
+    LEFT JOIN ImportType it ON r.import_type_id = it.import_type_id
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_object(
+            'temp_discharge_id', td.temp_discharge_id,
+            'name', td.name,
+            'epic_id', td.epic_id,
+            'phone_number', td.phone_number,
+            'attending_physician', td.attending_physician,
+            'date', td.date,
+            'primary_care_provider', td.primary_care_provider,
+            'insurance', td.insurance,
+            'disposition', td.disposition,
+            'status', td.status,
+            'hospital_name', td.hospital_name,
+            'enrichmentData', COALESCE(e.enrichments, '[]'::json)
+        )) AS discharges
+        FROM TemporaryDischarge td
+        LEFT JOIN LATERAL (
+            SELECT json_agg(json_build_object(
+                'enrichment_data_id', ed.enrichment_data_id,
+                'temp_discharge_id', ed.temp_discharge_id,
+                'enrichment_type_id', ed.enrichment_type_id,
+                'enrichment_value', ed.enrichment_value,
+                'approved_at', ed.approved_at,
+                'approved_by', ed.approved_by,
+                'created_by', ed.created_by,
+                'updated_by', ed.updated_by,
+                'created_at', ed.created_at,
+                'updated_at', ed.updated_at,
+                'enrichment_type_name', et.type_name
+            )) AS enrichments
+            FROM TemporaryEnrichmentData ed
+            LEFT JOIN EnrichmentType et ON et.enrichment_type_id = ed.enrichment_type_id
+            WHERE ed.temp_discharge_id = td.temp_discharge_id
+        ) e ON TRUE
+        WHERE td.raw_data_id = r.raw_data_id
+    ) d ON TRUE
+    WHERE r.raw_data_id = %s
+"""
+
+DISCHARGE_SQL = """
+    SELECT *
+    FROM TemporaryDischarge
+    WHERE temp_discharge_id = %s
+"""
+
+DISCHARGE_ENRICHMENT_SQL = """
+    SELECT
+        e.enrichment_data_id,
+        e.temp_discharge_id,
+        e.enrichment_type_id,
+        e.enrichment_value,
+        e.approved_at,
+        e.approved_by,
+        e.created_by,
+        e.updated_by,
+        e.created_at,
+        e.updated_at,
+        et.type_name,
+        et.description
+    FROM TemporaryEnrichmentData e
+    LEFT JOIN EnrichmentType et
+        ON e.enrichment_type_id = et.enrichment_type_id
+    WHERE e.temp_discharge_id = %s
+"""
+
+FIND_RAW_DATA_BY_HASH_SQL = """
+    SELECT raw_data_id
+    FROM RawDataIngested
+    WHERE content_hash = %s AND import_type_id = %s AND NOT import_failed
+"""
+
+MARK_IMPORT_FAILED_SQL = "UPDATE RawDataIngested SET import_failed = TRUE WHERE raw_data_id = %s"
+
+INSERT_RAW_DATA_SQL = """
+    INSERT INTO RawDataIngested (source_file_name, content_hash, content_size, import_type_id, created_by, updated_by)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON CONFLICT (content_hash, import_type_id) WHERE NOT import_failed DO NOTHING
+    RETURNING raw_data_id;
+"""
+
+COPY_TEMPORARY_DISCHARGE_SQL = """
+    COPY TemporaryDischarge (
+        name,
+        epic_id,
+        phone_number,
+        attending_physician,
+        date,
+        primary_care_provider,
+        insurance,
+        disposition,
+        raw_data_id,
+        status,
+        created_by,
+        updated_by,
+        hospital_name
+    ) FROM STDIN
+"""
+
+# The fields validate_discharge_for_approval takes, in order
+FETCH_DISCHARGE_RECORD_SQL = """
+    SELECT name, epic_id, phone_number, attending_physician, date, primary_care_provider, insurance, disposition, status, hospital_name
+    FROM TemporaryDischarge
+    WHERE temp_discharge_id = %s
+"""
+
+APPROVE_DISCHARGE_SQL = "SELECT f_approve_discharge(%s);"
+
+APPROVE_DISCHARGES_SQL = "SELECT count(*) FROM f_approve_discharges(%s::uuid[])"
+
+APPROVAL_CANDIDATES_BY_IMPORT_SQL = """
+    SELECT temp_discharge_id, name, epic_id, phone_number, attending_physician, date,
+           primary_care_provider, insurance, disposition, status, hospital_name
+    FROM TemporaryDischarge
+    WHERE raw_data_id = %s
+      AND (status IS NULL OR status NOT IN ('Approved', 'Rejected'))
+"""
+
+APPROVAL_CANDIDATES_BY_ID_SQL = """
+    SELECT temp_discharge_id, name, epic_id, phone_number, attending_physician, date,
+           primary_care_provider, insurance, disposition, status, hospital_name
+    FROM TemporaryDischarge
+    WHERE temp_discharge_id = ANY(%s::uuid[])
+"""
+
+# Lock a chunk; rows approved concurrently since validation are skipped
+LOCK_APPROVAL_CHUNK_SQL = """
+    SELECT temp_discharge_id
+    FROM TemporaryDischarge
+    WHERE temp_discharge_id = ANY(%s::uuid[]) AND status IS DISTINCT FROM 'Approved'
+    ORDER BY temp_discharge_id
+    FOR UPDATE
+"""
+
+REJECT_DISCHARGE_SQL = """
+    UPDATE TemporaryDischarge
+    SET status = 'Rejected', approved_at = CURRENT_TIMESTAMP, approved_by = %s
+    WHERE temp_discharge_id = %s
+"""
+
+STORED_DISCHARGE_FOR_UPDATE_SQL = "SELECT * FROM TemporaryDischarge WHERE temp_discharge_id = %s FOR UPDATE"
+
+# All enrichment values of a discharge in one upsert
+ENRICHMENT_UPSERT_SQL = """
+    INSERT INTO TemporaryEnrichmentData (
+        temp_discharge_id, enrichment_type_id, enrichment_value,
+        created_at, updated_at, created_by, updated_by
+    )
+    SELECT %s, e.enrichment_type_id, e.enrichment_value,
+           CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, %s, %s
+    FROM unnest(%s::uuid[], %s::text[]) AS e (enrichment_type_id, enrichment_value)
+    ON CONFLICT (temp_discharge_id, enrichment_type_id) DO UPDATE
+    SET enrichment_value = EXCLUDED.enrichment_value,
+        updated_at = CURRENT_TIMESTAMP,
+        updated_by = EXCLUDED.updated_by
+    -- Unchanged values are not rewritten (and not audited)
+    WHERE TemporaryEnrichmentData.enrichment_value IS DISTINCT FROM EXCLUDED.enrichment_value
+"""
+
+# One page of RawDataIngested, newest first. Walks idx_rawdataingested_created_at_id backwards,
+# or idx_rawdataimportsummary_status_created_at_id when filtered by status (see build_raw_data_query)
+RAW_DATA_PAGE_SQL = """
+    SELECT
+        r.raw_data_id,
+        r.source_file_name,
+        r.created_at,
+        it.type_name,
+        sm.status,
+        sm.total_count,
+        sm.pending_count,
+        sm.approved_count,
+        sm.rejected_count
+    FROM
+        RawDataIngested r
+    JOIN
+        ImportType it ON r.import_type_id = it.import_type_id
+    JOIN
+        RawDataImportSummary sm ON sm.raw_data_id = r.raw_data_id
+    {where_clause}
+    ORDER BY
+        {created_at} DESC, {raw_data_id} DESC
+    LIMIT %(limit)s;
+"""
+
+RAW_DATA_SOURCE_SQL = "SELECT source_file_name, content_hash FROM RawDataIngested WHERE raw_data_id = %s"
+
+
+def temporary_discharge_copy_row(record, raw_data_id):
+    """The COPY_TEMPORARY_DISCHARGE_SQL row for one parsed record."""
+    return (
+        record["name"],
+        record.get("epic_id"),
+        record["phone_number"],
+        record["attending_physician"],
+        record["date"],
+        record["primary_care_provider"],
+        record["insurance"],
+        record["disposition"],
+        raw_data_id,
+        'Pending',
+        session_user_id,
+        session_user_id,
+        record["hospital"]
+    )
+
+
+def copy_temporary_discharge_rows(cursor, parsed_data, raw_data_id):
+    """
+    Streams parsed records into the TemporaryDischarge table with COPY FROM STDIN.
+    Runs in the caller's transaction and returns the number of rows written.
+    Takes a synchronous cursor; asgi_app.py has its own version for async cursors.
+    """
+    row_count = 0
+    with cursor.copy(COPY_TEMPORARY_DISCHARGE_SQL) as copy:
+        for record in parsed_data:
+            copy.write_row(temporary_discharge_copy_row(record, raw_data_id))
+            row_count += 1
+    return row_count
+
+
+def validate_phone_number(phone_number):
+    """
+    Validates a phone number by ensuring it contains at least 6 digits if provided.
+    """
+    if not phone_number:  # If the phone number is not provided, it's valid (optional field)
+        return True
+
+    # Remove all non-digit characters
+    digits = re.sub(r'\D', '', phone_number)
+
+    # Check if there are at least 6 digits
+    return len(digits) >= 6
+
+
+def is_valid_uuid(value):
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
+
+def is_valid_date_format(date_str):
+    """
+    Validates if the date string matches MM-DD-YYYY format and represents a real date.
+    """
+    date_regex = re.compile(r'^(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])-\d{4}$')
+    if not date_regex.match(date_str):
+        return False
+    try:
+        month, day, year = map(int, date_str.split('-'))
+        datetime(year, month, day)
+    except ValueError:
+        return False
+    return True
+
+
+def validate_discharge_for_approval(name, epic_id, phone_number, attending_physician, date,
+                                    primary_care_provider, insurance, disposition, status, hospital_name):
+    """
+    Validates the fields of a discharge record (as read by FETCH_DISCHARGE_RECORD_SQL)
+    before approval. Returns a dict of field -> error message; empty if it may be approved.
+    """
+    errors = {}
+
+    # Validate "required" fields
+    if not name:
+        errors['name'] = "Name is required."
+    if not epic_id:
+        errors['epic_id'] = "Epic ID is required."
+    if not validate_phone_number(phone_number):
+        errors['phone_number'] = "Invalid phone number format."
+    if not date:
+        errors['date'] = "Date is required."
+    elif not is_valid_date_format(date):
+        errors['date'] = "Date must be in MM-DD-YYYY format and valid."
+
+    return errors
+
+
+def parse_approval_request(data):
+    """
+    Read the body of POST /api/approve. Returns (temp_discharge_ids, raw_data_id, chunk_size),
+    with exactly one of the first two set; the IDs are normalised and deduplicated so
+    results line up with the UUIDs read back from the database. Raises ValueError with
+    the message for the client if the body is invalid.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("The request body must be a JSON object.")
+
+    temp_discharge_ids = data.get('temp_discharge_ids')
+    raw_data_id = data.get('raw_data_id')
+
+    if (temp_discharge_ids is None) == (raw_data_id is None):
+        raise ValueError("Provide either temp_discharge_ids or raw_data_id.")
+    if raw_data_id is not None and not is_valid_uuid(raw_data_id):
+        raise ValueError("Invalid raw_data_id format.")
+    if temp_discharge_ids is not None:
+        if not isinstance(temp_discharge_ids, list) or not all(isinstance(i, str) and is_valid_uuid(i) for i in temp_discharge_ids):
+            raise ValueError("temp_discharge_ids must be a list of discharge IDs.")
+        if len(temp_discharge_ids) > APPROVE_MAX_IDS:
+            raise ValueError(f"At most {APPROVE_MAX_IDS} discharges can be approved per request.")
+        temp_discharge_ids = list(dict.fromkeys(str(uuid.UUID(i)) for i in temp_discharge_ids))
+
+    chunk_size = data.get('chunk_size', APPROVE_CHUNK_SIZE)
+    if not isinstance(chunk_size, int) or isinstance(chunk_size, bool) or chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    return temp_discharge_ids, raw_data_id, chunk_size
+
+
+def classify_approval_candidates(ordered_ids, records):
+    """
+    Sort the requested rows into those that cannot be approved and those that may be.
+    records maps temp_discharge_id -> the row read by an APPROVAL_CANDIDATES query
+    (without its ID). Returns (results, to_approve): results holds not_found,
+    already_approved and invalid rows, to_approve the IDs that passed validation.
+    """
+    results = {}
+    to_approve = []
+    for temp_discharge_id in ordered_ids:
+        record = records.get(temp_discharge_id)
+        if record is None:
+            results[temp_discharge_id] = {"status": "not_found"}
+        elif record[8] == 'Approved':
+            results[temp_discharge_id] = {"status": "already_approved"}
+        else:
+            errors = validate_discharge_for_approval(*record)
+            if errors:
+                results[temp_discharge_id] = {"status": "invalid", "errors": errors}
+            else:
+                to_approve.append(temp_discharge_id)
+    return results, to_approve
+
+
+def format_approval_results(ordered_ids, results):
+    """
+    Turn temp_discharge_id -> result into the list returned by approve_discharges, in
+    request order. Rows without a result (their chunk did not commit) are left out.
+    """
+    return [
+        {"temp_discharge_id": temp_discharge_id, **results[temp_discharge_id]}
+        for temp_discharge_id in ordered_ids
+        if temp_discharge_id in results
+    ]
+
+
+def summarize_approval_results(formatted):
+    """Count the formatted approval results by status."""
+    summary = {}
+    for result in formatted:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return summary
+
+
+def validate_discharge_update(data, get_enrichment_type):
+    """
+    Validate the body of PUT /api/temp-discharge. get_enrichment_type(id) returns the
+    EnrichmentType row for an id, or None. Returns (discharge_data, enrichment_values),
+    where enrichment_values maps enrichment_type_id -> value for every entry with a
+    value (a type submitted twice keeps its last value). Raises ValueError with the
+    message for the client if the body is invalid.
+    """
+    if not data:
+        logger.warning("No data provided in PUT request.")
+        raise ValueError("No data provided")
+
+    discharge_data = data.get("dischargeData", {})
+    enrichment_data = data.get("enrichmentData", [])
+
+    logger.info(f"Received discharge_data: {discharge_data}")
+    logger.info(f"Received enrichment_data: {enrichment_data}")
+
+    # Validate discharge_data fields
+    required_discharge_fields = ["name", "epic_id","date"]
+    for field in required_discharge_fields:
+        if not discharge_data.get(field):
+            logger.warning(f"Missing required field in discharge_data: {field}")
+            raise ValueError(f"Missing required field: {field}")
+
+    # Validate 'date' field format (MM-DD-YYYY)
+    date_value = discharge_data.get('date')
+    if not is_valid_date_format(date_value):
+        logger.warning(f"Invalid date format or invalid date: {date_value}")
+        raise ValueError("Invalid date format or invalid date. Expected MM-DD-YYYY.")
+
+    # Validate phone number
+    phone_number = discharge_data.get('phone_number')
+    if not validate_phone_number(phone_number):
+        logger.warning(f"Invalid phone number format: {phone_number}")
+        raise ValueError("Invalid phone number format.")
+
+    # Process enrichment_data
+    enrichment_values = {}
+    for enrichment in enrichment_data:
+        enrichment_type_id = enrichment.get("enrichment_type_id")
+        enrichment_value = enrichment.get("enrichment_value")
+
+        if not enrichment_type_id:
+            logger.warning("Enrichment data missing 'enrichment_type_id'.")
+            continue  # Skip invalid enrichment entries
+
+        if not enrichment_value or enrichment_value == "--select--":
+            logger.info(f"Skipping enrichment_type_id {enrichment_type_id} due to empty or default value.")
+            continue  # Skip if no valid value is provided
+
+        enrichment_type = get_enrichment_type(enrichment_type_id)
+        if enrichment_type is None:
+            logger.warning(f"Unknown enrichment_type_id: {enrichment_type_id}")
+            raise ValueError(f"Unknown enrichment type ID {enrichment_type_id}.")
+
+        if enrichment_type["value_type"] == ENRICHMENT_VALUE_BOOLEAN:
+            if enrichment_value.lower() not in ["true", "false"]:
+                logger.warning(f"Invalid enrichment_value for type ID {enrichment_type_id}: {enrichment_value}")
+                raise ValueError(f"Enrichment value for type ID {enrichment_type_id} must be 'true' or 'false'.")
+
+        if len(enrichment_value) > 255:
+            logger.warning(f"Enrichment value too long for type ID {enrichment_type_id}: {len(enrichment_value)} characters.")
+            raise ValueError(f"Enrichment value for type ID {enrichment_type_id} exceeds 255 characters.")
+
+        enrichment_values[enrichment_type_id] = enrichment_value
+
+    return discharge_data, enrichment_values
+
+
+def is_value_changed(stored, submitted):
+    """
+    Compare a stored column value with the value a client submitted for it. Clients
+    send timestamps as ISO 8601 strings and UUIDs as strings, so those are compared
+    in their stored types.
+    """
+    if stored is None or submitted is None:
+        return stored is not submitted
+    if isinstance(stored, datetime):
+        try:
+            return datetime.fromisoformat(str(submitted)) != stored
+        except ValueError:
+            return True
+    if isinstance(stored, uuid.UUID):
+        return str(stored) != str(submitted).lower()
+    return stored != submitted
+
+
+def diff_discharge_fields(stored, discharge_data):
+    """
+    Diff the submitted fields against the stored row (a dict). Returns (changed, skipped):
+    the column -> value pairs that differ, and how many known columns were submitted
+    unchanged. Excluded and unknown keys are ignored.
+    """
+    changed = {}
+    for key, value in discharge_data.items():
+        if key in DISCHARGE_EXCLUDED_KEYS:
+            continue
+        if key not in stored:
+            logger.warning(f"Ignoring unknown discharge field: {key}")
+            continue
+        if is_value_changed(stored[key], value):
+            changed[key] = value
+    skipped = len([key for key in discharge_data if key in stored and key not in DISCHARGE_EXCLUDED_KEYS]) - len(changed)
+    return changed, skipped
+
+
+def update_discharge_query(changed):
+    """The UPDATE writing only the changed columns; its parameters are the values, then the ID."""
+    return sql.SQL("""
+        UPDATE TemporaryDischarge
+        SET {assignments},
+            updated_at = CURRENT_TIMESTAMP
+        WHERE temp_discharge_id = %s
+    """).format(assignments=sql.SQL(', ').join(
+        sql.SQL("{} = %s").format(sql.Identifier(key)) for key in changed
+    ))
+
+
+def enrichment_upsert_params(temp_discharge_id, discharge_data, enrichment_values):
+    """Parameters of ENRICHMENT_UPSERT_SQL."""
+    return (
+        temp_discharge_id, discharge_data.get("created_by"), discharge_data.get("updated_by"),
+        list(enrichment_values), list(enrichment_values.values())
+    )
+
+
+def encode_raw_data_cursor(created_at, raw_data_id):
+    """
+    Encode the (created_at, raw_data_id) key of the last entry on a page as an opaque cursor.
+    """
+    key = json.dumps([created_at.isoformat(), str(raw_data_id)])
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_raw_data_cursor(cursor_value):
+    """
+    Decode a cursor from encode_raw_data_cursor. Raises ValueError if it is malformed.
+    """
+    try:
+        created_at, raw_data_id = json.loads(base64.urlsafe_b64decode(cursor_value.encode()))
+        return datetime.fromisoformat(created_at), str(uuid.UUID(raw_data_id))
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor_value}") from e
+
+
+def build_raw_data_query(args):
+    """
+    Build the GET /raw-data page query from the request's query parameters.
+    Returns (query, params, limit); the query asks for one row more than limit, which
+    tells whether there is a next page. Raises ValueError with the message for the
+    client if a parameter is invalid.
+    """
+    start_date_str = args.get('start_date')
+    end_date_str = args.get('end_date')
+    import_type_id = args.get('import_type_id')
+    status = args.get('status')
+    file_name = args.get('file_name', '').strip()
+    cursor_value = args.get('cursor')
+
+    try:
+        limit = int(args.get('limit', RAW_DATA_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit must be an integer.')
+    if not 1 <= limit <= RAW_DATA_MAX_PAGE_SIZE:
+        raise ValueError(f'limit must be between 1 and {RAW_DATA_MAX_PAGE_SIZE}.')
+
+    # With a status filter the page is keyed on the summary's copy of created_at, so the
+    # status index gives the rows in page order
+    if status:
+        created_at, raw_data_id = "sm.import_created_at", "sm.raw_data_id"
+    else:
+        created_at, raw_data_id = "r.created_at", "r.raw_data_id"
+
+    # Initialize filter conditions
+    filters = []
+    params = {'limit': limit + 1}  # One extra row tells us whether there is a next page
+
+    if start_date_str:
+        try:
+            start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
+            filters.append(f"{created_at} >= %(start_date)s")
+            params['start_date'] = start_date
+        except ValueError:
+            raise ValueError('Invalid start_date format. Use ISO 8601 format.')
+
+    if end_date_str:
+        try:
+            end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
+            filters.append(f"{created_at} < %(end_date)s")
+            params['end_date'] = end_date
+        except ValueError:
+            raise ValueError('Invalid end_date format. Use ISO 8601 format.')
+
+    if import_type_id:
+        if not is_valid_uuid(import_type_id):
+            raise ValueError('Invalid import_type_id.')
+        filters.append("r.import_type_id = %(import_type_id)s")
+        params['import_type_id'] = import_type_id
+
+    if status:
+        if status not in RAW_DATA_STATUSES:
+            raise ValueError(f"Invalid status. Use one of: {', '.join(RAW_DATA_STATUSES)}.")
+        filters.append("sm.status = %(status)s")
+        params['status'] = RAW_DATA_STATUSES[status]
+
+    if file_name:
+        # Served by the trigram index on source_file_name
+        filters.append("r.source_file_name ILIKE %(file_name)s")
+        params['file_name'] = "%" + re.sub(r"([\\%_])", r"\\\1", file_name) + "%"
+
+    if cursor_value:
+        try:
+            params['cursor_created_at'], params['cursor_raw_data_id'] = decode_raw_data_cursor(cursor_value)
+        except ValueError:
+            raise ValueError('Invalid cursor.')
+        filters.append(f"({created_at}, {raw_data_id}) < (%(cursor_created_at)s, %(cursor_raw_data_id)s)")
+
+    # Build the WHERE clause
+    where_clause = ""
+    if filters:
+        where_clause = "WHERE " + " AND ".join(filters)
+
+    query = RAW_DATA_PAGE_SQL.format(where_clause=where_clause, created_at=created_at, raw_data_id=raw_data_id)
+    return query, params, limit
+
+
+def paginate_raw_data_rows(rows, limit):
+    """
+    Trim the rows of a RAW_DATA_PAGE_SQL query (dicts) to limit. Returns (rows, next_cursor);
+    next_cursor is None on the last page.
+    """
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_raw_data_cursor(last['created_at'], last['raw_data_id'])
+    return rows, next_cursor
+
+
+def raw_content_headers(file_name):
+    """Headers of GET /raw-data/<raw_data_id>/content responses."""
+    # The content behind a raw_data_id never changes, so the browser may reuse it
+    return {
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'private, max-age=86400',
+        'Content-Disposition': f'inline; filename="{file_name}"',
+    }
+
+
+def resolve_content_range(request, info):
+    """
+    Work out which bytes of a stored document to send, from the request's Range and
+    If-Range headers (a werkzeug-style request, as Flask and Quart both provide).
+    Returns (start, end, status): status is 200 for the whole document, 206 for a
+    single satisfiable range and 416 if that range is not satisfiable. Requests for
+    several ranges get the whole document.
+    """
+    if_range = request.if_range
+    range_applies = (if_range.etag is None and if_range.date is None) or if_range.etag == info.content_hash
+    if request.range and range_applies and len(request.range.ranges) == 1:
+        byte_range = request.range.range_for_length(info.size)
+        if byte_range is None:
+            return 0, 0, 416
+        start, end = byte_range
+        return start, end, 206
+    return 0, info.size, 200
@@ -0,0 +1,737 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from quart import Quart, Response, request, jsonify
+from quart_cors import cors
+from werkzeug.utils import secure_filename
+import psycopg
+from psycopg.rows import dict_row
+from db import get_async_connection, get_pool_stats, open_async_pool, close_async_pool
+import db
+from json_encoding import FastJSONProvider
+from jobs import JOB_WORKER_CONFIG, submit_async_job, get_job, shutdown_async_jobs, JobQueueFull
+from discharge_parser import iter_structured_data
+from upload_buffer import read_upload, UPLOAD_SPOOL_THRESHOLD
+from document_store import store_document_async, get_document_info_async, aiter_stored_document
+from reference_data import (
+    REFERENCE_DATA_CONFIG, REFERENCE_QUERIES, get_reference_data_async, invalidate_reference_data,
+)
+from pdf_extraction import iter_pdf_page_texts, iter_text_lines, shutdown_extraction_pool
+from api_common import (
+    INGEST_BATCH_SIZE, REVALIDATE_HEADERS, session_user_id,
+    REVIEW_VERSION_SQL, DISCHARGE_VERSION_SQL, REVIEW_PAYLOAD_SQL, DISCHARGE_SQL, DISCHARGE_ENRICHMENT_SQL,
+    FIND_RAW_DATA_BY_HASH_SQL, MARK_IMPORT_FAILED_SQL, INSERT_RAW_DATA_SQL, COPY_TEMPORARY_DISCHARGE_SQL,
+    FETCH_DISCHARGE_RECORD_SQL, APPROVE_DISCHARGE_SQL, APPROVE_DISCHARGES_SQL,
+    APPROVAL_CANDIDATES_BY_IMPORT_SQL, APPROVAL_CANDIDATES_BY_ID_SQL, LOCK_APPROVAL_CHUNK_SQL,
+    REJECT_DISCHARGE_SQL, STORED_DISCHARGE_FOR_UPDATE_SQL, ENRICHMENT_UPSERT_SQL, RAW_DATA_SOURCE_SQL,
+    temporary_discharge_copy_row, is_valid_uuid, validate_discharge_for_approval,
+    parse_approval_request, classify_approval_candidates, format_approval_results, summarize_approval_results,
+    validate_discharge_update, diff_discharge_fields, update_discharge_query, enrichment_upsert_params,
+    build_raw_data_query, paginate_raw_data_rows, raw_content_headers, resolve_content_range,
+)
+
+# ASGI variant of app.py: the same routes, served from one event loop with psycopg's
+# async driver, so a request waiting on the database does not tie up a thread.
+# Run with an ASGI server, e.g.:
+#   hypercorn asgi_app:app --bind localhost:5000
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+app = Quart(__name__)
+# Serializes query rows as they are (UUID, date/datetime, Decimal), so routes return rows directly
+app.json = FastJSONProvider(app)
+app = cors(app, allow_origin="http://localhost:5173")  # Adjust the origin as needed
+
+# Uploads are read once into memory; files over this size are spooled to a temporary file
+app.config['UPLOAD_SPOOL_THRESHOLD'] = UPLOAD_SPOOL_THRESHOLD
+# No request body limit, as with Flask (Quart defaults to 16 MB)
+app.config['MAX_CONTENT_LENGTH'] = None
+
+# Ingestion pulls parsed rows on these threads, off the event loop. PDF extraction, the
+# CPU-heavy part, runs in the process pool of pdf_extraction.py (offload=True), so it
+# does not compete with the event loop for the GIL.
+_ingestion_executor = ThreadPoolExecutor(
+    max_workers=JOB_WORKER_CONFIG["max_workers"],
+    thread_name_prefix="ingestion-parse",
+)
+
+
+@app.before_serving
+async def startup():
+    # Open the async database connection pool (configured in db.py)
+    await open_async_pool()
+
+
+@app.after_serving
+async def shutdown():
+    await shutdown_async_jobs()
+    await close_async_pool()
+    _ingestion_executor.shutdown(wait=True)
+    shutdown_extraction_pool()
+
+
+@app.route('/')
+async def home():
+    return jsonify({"message": "Welcome to the PDF Processor API"})
+
+@app.route('/pool-stats', methods=['GET'])
+async def pool_stats():
+    """
+    Report database pool usage: in-use and waiting counts and checkout latency.
+    """
+    return jsonify(get_pool_stats(db.async_pool)), 200
+
+def not_modified_response(etag, headers=None):
+    """
+    Return a 304 Not Modified response if the request's If-None-Match matches etag, else None.
+    """
+    if not request.if_none_match.contains(etag):
+        return None
+    response = Response(None, status=304, headers=headers)
+    response.set_etag(etag)
+    return response
+
+def reference_data_response(snapshot, body):
+    """
+    Serve cached reference data with its ETag, answering a matching If-None-Match
+    with 304 Not Modified.
+    """
+    headers = {'Cache-Control': f"public, max-age={REFERENCE_DATA_CONFIG['browser_max_age_seconds']}"}
+    response = not_modified_response(snapshot.etag, headers)
+    if response is None:
+        response = jsonify(body)
+        response.headers.update(headers)
+        response.set_etag(snapshot.etag)
+    return response
+
+@app.route('/import-types', methods=['GET'])
+async def get_import_types():
+    """
+    Fetch all import types from the ImportType table (served from the reference data cache).
+    """
+    try:
+        snapshot = await get_reference_data_async("import_types")
+        return reference_data_response(
+            snapshot,
+            [{"id": row["import_type_id"], "name": row["type_name"]} for row in snapshot.rows]
+        )
+    except Exception as e:
+        logger.error(f"Error fetching import types: {e}")
+        return jsonify({'error': 'Failed to fetch import types'}), 500
+
+@app.route('/reference-data/invalidate', methods=['POST'])
+async def invalidate_reference_data_route():
+    """
+    Drop the cached reference data so it is read again on next use. Takes an
+    optional ?name= (import_types or enrichment_types); without it everything is dropped.
+    """
+    name = request.args.get('name')
+    if name is not None and name not in REFERENCE_QUERIES:
+        return jsonify({'error': f"Unknown reference data '{name}'"}), 400
+    invalidate_reference_data(name)
+    return jsonify({'invalidated': [name] if name else list(REFERENCE_QUERIES)}), 200
+
+@app.route('/upload-pdf', methods=['POST'])
+async def upload_pdf():
+    """
+    Save the uploaded PDF and queue it for ingestion. Returns 202 with a job id;
+    poll /jobs/<job_id> for progress and the resulting raw_data_id.
+    """
+    files = await request.files
+    if 'file' not in files:
+        return jsonify({'error': 'No file part in the request'}), 400
+
+    file = files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No file selected for uploading'}), 400
+
+    import_type_id = (await request.form).get('import_type_id')
+    if not import_type_id:
+        return jsonify({'error': 'No import type selected'}), 400
+    try:
+        import_type = (await get_reference_data_async("import_types")).by_id.get(str(import_type_id))
+    except Exception as e:
+        logger.error(f"Error looking up import type {import_type_id}: {e}")
+        return jsonify({'error': 'Failed to fetch import types'}), 500
+    if import_type is None:
+        return jsonify({'error': 'Unknown import type'}), 400
+
+    # Read the file once, hashing it as it is read (in a worker thread: it may spool to disk)
+    filename = secure_filename(file.filename)
+    document = await asyncio.to_thread(read_upload, file, filename, app.config['UPLOAD_SPOOL_THRESHOLD'])
+
+    # A re-sent document costs one hash plus one index lookup
+    try:
+        existing_raw_data_id = await find_raw_data_by_hash(document.content_hash, import_type_id)
+    except Exception as e:
+        logger.error(f"Error checking for duplicate upload: {e}")
+        document.cleanup()
+        return jsonify({'error': f'Failed to process file: {e}'}), 500
+    if existing_raw_data_id:
+        logger.info(f"Upload of {filename} matches existing raw_data_id {existing_raw_data_id}; skipping ingestion.")
+        document.cleanup()
+        return jsonify({
+            'message': 'This file has already been imported',
+            'duplicate': True,
+            'raw_data_id': str(existing_raw_data_id)
+        }), 200
+
+    try:
+        job = submit_async_job(f"Ingest {filename}", run_ingestion_pipeline, document, import_type_id)
+    except JobQueueFull as e:
+        logger.warning(f"Rejecting upload of {filename}: {e}")
+        document.cleanup()
+        return jsonify({'error': 'Too many uploads are being processed. Please try again shortly.'}), 503
+
+    return jsonify({
+        'message': 'File accepted for processing',
+        'job_id': job.job_id,
+        'status_url': f"/jobs/{job.job_id}"
+    }), 202
+
+
+async def run_ingestion_pipeline(job, document, import_type_id):
+    """
+    Ingestion pipeline run as a task on the event loop: store the raw PDF, extract its
+    pages in the extraction process pool and parse its rows on _ingestion_executor,
+    then load them into TemporaryDischarge.
+    """
+    try:
+        # Insert raw PDF content into RawDataIngested table
+        with job.stage("insert_raw_pdf"):
+            logger.info("Trying to insert file into RawDataIngested table.")
+            raw_data_id, inserted = await insert_raw_pdf(document, import_type_id)
+        job.set_result(raw_data_id=str(raw_data_id))
+
+        if not inserted:
+            # The same document was imported while this job was queued
+            logger.info(f"Job {job.job_id} is a duplicate of raw_data_id {raw_data_id}; skipping ingestion.")
+            job.set_result(duplicate=True)
+            return
+
+        # Stream pages -> parsed rows -> TemporaryDischarge in bounded batches
+        page_texts = job.timed_iter("extract_pdf", iter_pdf_page_texts(document.source, offload=True))
+        records = job.timed_iter("parse_rows", iter_structured_data(iter_text_lines(page_texts)), count="rows_parsed")
+        with job.stage("stream_to_database"):
+            try:
+                rows_inserted = await insert_into_temporary_discharge(
+                    records,
+                    raw_data_id,
+                    on_batch=lambda row_count: job.add_count("rows_inserted", row_count),
+                )
+            except Exception:
+                # Let the same document be uploaded again once the problem is fixed
+                await mark_import_failed(raw_data_id)
+                raise
+    finally:
+        document.cleanup()
+
+    job.set_count("rows_inserted", rows_inserted)
+
+    # parse_rows includes the time spent waiting on extraction and stream_to_database
+    # includes both, so subtract to leave each stage's own time
+    job.add_stage_time("load_rows", job.stages["stream_to_database"] - job.stages["parse_rows"])
+    job.add_stage_time("parse_rows", -job.stages["extract_pdf"])
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+async def get_job_status(job_id):
+    """
+    Report the state, per-stage timings and row counts of an ingestion job.
+    """
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict()), 200
+
+
+async def find_raw_data_by_hash(content_hash, import_type_id):
+    """
+    Returns the raw_data_id of a document with the same content and import type, or None.
+    """
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(FIND_RAW_DATA_BY_HASH_SQL, (content_hash, import_type_id))
+            row = await cursor.fetchone()
+            return row[0] if row else None
+
+
+async def mark_import_failed(raw_data_id):
+    """
+    Flags a failed import so the same document can be uploaded again.
+    """
+    try:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(MARK_IMPORT_FAILED_SQL, (raw_data_id,))
+                await conn.commit()
+    except Exception as e:
+        logger.error(f"Error marking raw_data_id {raw_data_id} as failed: {e}")
+
+
+async def insert_raw_pdf(document, import_type_id):
+    """
+    Stores the raw PDF in RawDocument and records the import in RawDataIngested.
+    Returns (raw_data_id, inserted); inserted is False when a document with the same
+    content hash and import type already exists, in which case its raw_data_id is returned.
+    """
+    try:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                # The compressed content is written once per hash; RawDataIngested only references it
+                await store_document_async(cursor, document)
+                await cursor.execute(
+                    INSERT_RAW_DATA_SQL,
+                    (document.filename, document.content_hash, document.size, import_type_id, session_user_id, session_user_id)
+                )
+                row = await cursor.fetchone()
+                if row is None:
+                    await conn.rollback()
+                    return await find_raw_data_by_hash(document.content_hash, import_type_id), False
+                await conn.commit()
+                logger.info("Raw PDF data inserted into RawDataIngested table.")
+                return row[0], True
+    except Exception as e:
+        logger.error(f"Error inserting raw PDF data: {e}")
+        raise
+
+
+async def copy_temporary_discharge_rows(cursor, parsed_data, raw_data_id):
+    """
+    Streams parsed records into the TemporaryDischarge table with COPY FROM STDIN.
+    Runs in the caller's transaction and returns the number of rows written.
+    """
+    row_count = 0
+    async with cursor.copy(COPY_TEMPORARY_DISCHARGE_SQL) as copy:
+        for record in parsed_data:
+            await copy.write_row(temporary_discharge_copy_row(record, raw_data_id))
+            row_count += 1
+    return row_count
+
+
+async def insert_into_temporary_discharge(parsed_data, raw_data_id, batch_size=None, on_batch=None):
+    """
+    Inserts parsed data into the TemporaryDischarge table in one transaction.
+
+    Records are pulled from `parsed_data` batch_size at a time on _ingestion_executor,
+    so the work behind a generator runs off the event loop, and each batch is written
+    with one COPY. `on_batch(row_count)` is called after each batch
+    is written. Returns the total number of rows inserted.
+    """
+    batch_size = batch_size or INGEST_BATCH_SIZE
+    records = iter(parsed_data)
+    loop = asyncio.get_running_loop()
+    total_rows = 0
+    try:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                while True:
+                    batch = await loop.run_in_executor(_ingestion_executor, lambda: list(islice(records, batch_size)))
+                    if not batch:
+                        break
+                    row_count = await copy_temporary_discharge_rows(cursor, batch, raw_data_id)
+                    total_rows += row_count
+                    if on_batch:
+                        on_batch(row_count)
+                await conn.commit()
+                logger.info(f"Extracted data inserted into TemporaryDischarge table ({total_rows} rows).")
+        return total_rows
+    except Exception as e:
+        logger.error(f"Error inserting into TemporaryDischarge: {e}")
+        raise
+
+
+async def get_review_version(cursor, raw_data_id):
+    """
+    Return the ETag of the /review payload for raw_data_id, or None if it does not exist.
+    """
+    await cursor.execute(REVIEW_VERSION_SQL, (raw_data_id,))
+    row = await cursor.fetchone()
+    return row[0] if row else None
+
+async def get_discharge_version(cursor, temp_discharge_id):
+    """
+    Return the ETag of the /api/temp-discharge payload for temp_discharge_id, or None if it does not exist.
+    """
+    await cursor.execute(DISCHARGE_VERSION_SQL, (temp_discharge_id,))
+    row = await cursor.fetchone()
+    return row[0] if row else None
+
+@app.route('/review/<raw_data_id>', methods=['GET'])
+async def get_review_data(raw_data_id):
+    """
+    Fetch raw data and its temporary Discharge rows, each with its enrichment data nested
+    under "enrichmentData". PostgreSQL builds the whole payload in a single query and it is
+    returned as-is.
+    """
+    try:
+        logger.info(f"Starting to fetch review data for raw_data_id: {raw_data_id}")
+
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                # Read the version first: if the payload changes in between, the client
+                # merely gets a full response on its next poll
+                version = await get_review_version(cursor, raw_data_id)
+                if version is None:
+                    logger.warning(f"No data found for raw_data_id: {raw_data_id}")
+                    return jsonify({'error': 'No data found for the given raw_data_id'}), 404
+                response = not_modified_response(version, REVALIDATE_HEADERS)
+                if response is not None:
+                    return response
+
+                await cursor.execute(REVIEW_PAYLOAD_SQL, (raw_data_id,))
+                row = await cursor.fetchone()
+
+        if row is None:
+            logger.warning(f"No data found for raw_data_id: {raw_data_id}")
+            return jsonify({'error': 'No data found for the given raw_data_id'}), 404
+
+        payload, no_discharges = row
+        if no_discharges:
+            logger.warning(f"No temporary discharge data found for raw_data_id: {raw_data_id}")
+            return jsonify({'error': 'No temporary discharge data found'}), 404
+
+        logger.info(f"Review data for raw_data_id {raw_data_id} built ({len(payload)} bytes).")
+        response = Response(payload, status=200, mimetype='application/json', headers=REVALIDATE_HEADERS)
+        response.set_etag(version)
+        return response
+
+    except Exception as e:
+        logger.error(f"Error fetching review data for raw_data_id {raw_data_id}: {str(e)}")
+        return jsonify({'error': f'Failed to fetch review data: {str(e)}'}), 500
+
+
+async def fetch_discharge_record(cursor, temp_discharge_id):
+    """
+    Fetches the discharge record from the TemporaryDischarge table.
+    """
+    await cursor.execute(FETCH_DISCHARGE_RECORD_SQL, (temp_discharge_id,))
+    return await cursor.fetchone()
+
+@app.route('/api/approve/<temp_discharge_id>', methods=['POST'])
+async def approve_discharge(temp_discharge_id):
+    """
+    Approves a discharge record after validating its fields.
+    """
+    try:
+        # Validate the temp_discharge_id
+        if not is_valid_uuid(temp_discharge_id):
+            logger.warning(f"Invalid UUID format: {temp_discharge_id}")
+            return jsonify({"error": "Invalid discharge ID format."}), 400
+
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                discharge_record = await fetch_discharge_record(cursor, temp_discharge_id)
+                if not discharge_record:
+                    logger.warning(f"No discharge record found for ID: {temp_discharge_id}")
+                    return jsonify({"error": "Discharge record not found."}), 404
+
+                errors = validate_discharge_for_approval(*discharge_record)
+                if errors:
+                    logger.warning(f"Validation errors for discharge ID {temp_discharge_id}: {errors}")
+                    return jsonify({"errors": errors}), 400
+
+                logger.info(f"Approving discharge with ID: {temp_discharge_id}")
+                await cursor.execute(APPROVE_DISCHARGE_SQL, [temp_discharge_id])
+                await conn.commit()
+                logger.info(f"Successfully approved discharge with ID: {temp_discharge_id}")
+
+        return jsonify({"message": "Discharge approved successfully."}), 200
+
+    except psycopg.OperationalError as e:
+        logger.error(f"Database connection error: {str(e)}")
+        return jsonify({"error": f"Database connection error: {str(e)}"}), 500
+    except Exception as e:
+        logger.error(f"An error occurred while approving discharge: {str(e)}")
+        return jsonify({"error": f"An error occurred: {str(e)}"}), 500
+
+
+@app.route('/api/approve', methods=['POST'])
+async def approve_discharges():
+    """
+    Approve many discharges in one request; the body and results are those of
+    app.approve_discharges. Rows are validated with one query, then approved in
+    transactions of chunk_size rows, falling back to row-by-row savepoints when a
+    chunk's f_approve_discharges call fails.
+    """
+    data = await request.get_json(silent=True) or {}
+    try:
+        temp_discharge_ids, raw_data_id, chunk_size = parse_approval_request(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    ordered_ids = []
+    results = {}
+    try:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                # Validate every row with one query
+                if raw_data_id is not None:
+                    await cursor.execute(APPROVAL_CANDIDATES_BY_IMPORT_SQL, (raw_data_id,))
+                else:
+                    await cursor.execute(APPROVAL_CANDIDATES_BY_ID_SQL, (temp_discharge_ids,))
+                records = {str(row[0]): row[1:] for row in await cursor.fetchall()}
+                await conn.commit()
+
+                ordered_ids = temp_discharge_ids if temp_discharge_ids is not None else list(records)
+                results, to_approve = classify_approval_candidates(ordered_ids, records)
+
+                logger.info(f"Batch approval: {len(to_approve)} of {len(ordered_ids)} discharges passed validation.")
+
+                for start in range(0, len(to_approve), chunk_size):
+                    chunk = to_approve[start:start + chunk_size]
+                    # Only reported once the chunk has committed
+                    chunk_results = {}
+                    async with conn.transaction():
+                        await cursor.execute(LOCK_APPROVAL_CHUNK_SQL, (chunk,))
+                        approvable = [str(row[0]) for row in await cursor.fetchall()]
+                        for temp_discharge_id in set(chunk).difference(approvable):
+                            chunk_results[temp_discharge_id] = {"status": "already_approved"}
+
+                        if approvable:
+                            try:
+                                async with conn.transaction():
+                                    await cursor.execute(APPROVE_DISCHARGES_SQL, (approvable,))
+                                for temp_discharge_id in approvable:
+                                    chunk_results[temp_discharge_id] = {"status": "approved"}
+                            except psycopg.DatabaseError as e:
+                                logger.warning(f"Batch approval of {len(approvable)} discharges failed, retrying row by row: {e}")
+                                for temp_discharge_id in approvable:
+                                    try:
+                                        async with conn.transaction():
+                                            await cursor.execute(APPROVE_DISCHARGE_SQL, (temp_discharge_id,))
+                                        chunk_results[temp_discharge_id] = {"status": "approved"}
+                                    except psycopg.DatabaseError as e:
+                                        logger.warning(f"Approving discharge {temp_discharge_id} failed: {e}")
+                                        chunk_results[temp_discharge_id] = {"status": "failed", "error": str(e)}
+                    results.update(chunk_results)
+                    logger.info(f"Batch approval: committed chunk of {len(chunk)} discharges.")
+
+    except psycopg.OperationalError as e:
+        logger.error(f"Database connection error: {str(e)}")
+        return jsonify({"error": f"Database connection error: {str(e)}", "results": format_approval_results(ordered_ids, results)}), 500
+    except Exception as e:
+        logger.error(f"An error occurred while approving discharges: {str(e)}")
+        return jsonify({"error": f"An error occurred: {str(e)}", "results": format_approval_results(ordered_ids, results)}), 500
+
+    formatted = format_approval_results(ordered_ids, results)
+    return jsonify({"summary": summarize_approval_results(formatted), "results": formatted}), 200
+
+
+@app.route('/api/reject/<temp_discharge_id>', methods=['POST'])
+async def reject_discharge(temp_discharge_id):
+    try:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    REJECT_DISCHARGE_SQL,
+                    ("11111111-1111-1111-1111-111111111111", temp_discharge_id),  # Assuming a static user ID for now
+                )
+                await conn.commit()
+        return jsonify({"message": "Record rejected successfully"}), 200
+    except Exception as e:
+        logger.error(f"Error rejecting record: {e}")
+        return jsonify({"error": "Failed to reject record"}), 500
+
+
+@app.route('/api/enrichment-types', methods=['GET'])
+async def get_enrichment_types():
+    """
+    Fetch all enrichment types (served from the reference data cache).
+    """
+    try:
+        snapshot = await get_reference_data_async("enrichment_types")
+        return reference_data_response(snapshot, {"enrichmentTypes": snapshot.rows})
+    except Exception as e:
+        logger.error(f"Error fetching enrichment types: {e}")
+        return jsonify({"error": "Failed to fetch enrichment types"}), 500
+
+@app.route('/api/temp-discharge/<temp_discharge_id>', methods=['GET'])
+async def get_discharge(temp_discharge_id):
+    """
+    Fetch discharge data along with its enrichment data.
+    """
+    try:
+        if not is_valid_uuid(temp_discharge_id):
+            logger.warning(f"Invalid UUID format: {temp_discharge_id}")
+            return jsonify({"error": "Invalid discharge ID format"}), 400
+
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                version = await get_discharge_version(cursor, temp_discharge_id)
+                if version is None:
+                    logger.warning(f"Discharge record not found for ID: {temp_discharge_id}")
+                    return jsonify({"error": "Discharge record not found"}), 404
+                response = not_modified_response(version, REVALIDATE_HEADERS)
+                if response is not None:
+                    return response
+
+            async with conn.cursor(row_factory=dict_row) as cursor:
+                await cursor.execute(DISCHARGE_SQL, (temp_discharge_id,))
+                discharge_data = await cursor.fetchone()
+
+                if not discharge_data:
+                    logger.warning(f"Discharge record not found for ID: {temp_discharge_id}")
+                    return jsonify({"error": "Discharge record not found"}), 404
+
+                await cursor.execute(DISCHARGE_ENRICHMENT_SQL, (temp_discharge_id,))
+                enrichment_data = await cursor.fetchall()
+
+                response = jsonify({
+                    "dischargeData": discharge_data,
+                    "enrichmentData": enrichment_data
+                })
+                response.headers.update(REVALIDATE_HEADERS)
+                response.set_etag(version)
+                return response
+    except Exception as e:
+        logger.error(f"Error fetching discharge record: {e}")
+        return jsonify({"error": "Failed to fetch discharge record"}), 500
+
+@app.route('/api/temp-discharge/<temp_discharge_id>', methods=['PUT'])
+async def update_discharge(temp_discharge_id):
+    """
+    Update discharge data along with its enrichment data.
+    """
+    try:
+        if not is_valid_uuid(temp_discharge_id):
+            logger.warning(f"Invalid UUID format: {temp_discharge_id}")
+            return jsonify({"error": "Invalid discharge ID format"}), 400
+
+        # Enrichment types are validated against the cached table, loaded before validating
+        enrichment_types = await get_reference_data_async("enrichment_types")
+        try:
+            discharge_data, enrichment_values = validate_discharge_update(
+                await request.get_json(),
+                lambda enrichment_type_id: enrichment_types.by_id.get(str(enrichment_type_id)),
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        async with get_async_connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cursor:
+                # Diff the submitted fields against the stored row; only columns whose
+                # value changed are written, and nothing at all if none did
+                await cursor.execute(STORED_DISCHARGE_FOR_UPDATE_SQL, (temp_discharge_id,))
+                stored = await cursor.fetchone()
+                if stored is None:
+                    logger.warning(f"Discharge record not found for ID: {temp_discharge_id}")
+                    return jsonify({"error": "Discharge record not found"}), 404
+
+                changed, skipped_fields = diff_discharge_fields(stored, discharge_data)
+
+                if changed:
+                    await cursor.execute(update_discharge_query(changed), [*changed.values(), temp_discharge_id])
+                    logger.info(f"Updated discharge {temp_discharge_id} fields: {', '.join(changed)}")
+                else:
+                    logger.info(f"No discharge fields changed for {temp_discharge_id}; skipping update.")
+
+                # All enrichment values in one upsert
+                if enrichment_values:
+                    await cursor.execute(
+                        ENRICHMENT_UPSERT_SQL,
+                        enrichment_upsert_params(temp_discharge_id, discharge_data, enrichment_values)
+                    )
+                    written_enrichments = cursor.rowcount
+                else:
+                    written_enrichments = 0
+
+                await conn.commit()
+
+        return jsonify({
+            "message": "Discharge and enrichment data updated successfully",
+            "written": {"discharge_fields": len(changed), "enrichment_values": written_enrichments},
+            "skipped": {"discharge_fields": skipped_fields, "enrichment_values": len(enrichment_values) - written_enrichments},
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error updating discharge record: {e}")
+        return jsonify({"error": "Failed to update discharge record"}), 500
+
+
+@app.route('/raw-data', methods=['GET'])
+async def get_raw_data():
+    """
+    Fetch one page of RawDataIngested entries along with their ImportType and Status,
+    newest first, keyset-paginated on (created_at, raw_data_id). Takes the query
+    parameters of app.get_raw_data and returns {"items": [...], "next_cursor": ...}.
+    """
+    try:
+        logger.info("Fetching a page of raw data ingested entries.")
+
+        try:
+            query, params, limit = build_raw_data_query(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        async with get_async_connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cursor:
+                logger.info(f"Executing query: {query} with params: {params}")
+                await cursor.execute(query, params)
+                rows, next_cursor = paginate_raw_data_rows(await cursor.fetchall(), limit)
+
+                logger.info(f"Fetched {len(rows)} raw data entries.")
+
+                return jsonify({'items': rows, 'next_cursor': next_cursor}), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching raw data: {e}")
+        return jsonify({'error': 'Failed to fetch raw data'}), 500
+
+
+@app.route('/raw-data/<raw_data_id>/content', methods=['GET'])
+async def get_raw_data_content(raw_data_id):
+    """
+    Stream the original uploaded file of a RawDataIngested entry, with the same
+    ETag and byte range handling as app.get_raw_data_content.
+    """
+    if not is_valid_uuid(raw_data_id):
+        return jsonify({'error': 'Invalid raw_data_id'}), 400
+
+    try:
+        async with get_async_connection() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(RAW_DATA_SOURCE_SQL, (raw_data_id,))
+                row = await cursor.fetchone()
+                if row is None:
+                    return jsonify({'error': 'No data found for the given raw_data_id'}), 404
+                file_name, content_hash = row
+                info = await get_document_info_async(cursor, content_hash)
+    except Exception as e:
+        logger.error(f"Error fetching raw content for raw_data_id {raw_data_id}: {e}")
+        return jsonify({'error': 'Failed to fetch raw content'}), 500
+
+    if info is None:
+        logger.error(f"Stored document {content_hash} for raw_data_id {raw_data_id} is missing")
+        return jsonify({'error': 'Raw content not found'}), 404
+
+    headers = raw_content_headers(file_name)
+
+    response = not_modified_response(info.content_hash, headers)
+    if response is not None:
+        return response
+
+    start, end, status = resolve_content_range(request, info)
+    if status == 416:
+        response = Response(None, status=416, headers=headers)
+        response.headers['Content-Range'] = f"bytes */{info.size}"
+        return response
+
+    response = Response(
+        aiter_stored_document(info, start, end),
+        status=status,
+        mimetype=info.content_type,
+        headers=headers,
+    )
+    response.set_etag(info.content_hash)
+    response.content_length = end - start
+    if status == 206:
+        response.headers['Content-Range'] = f"bytes {start}-{end - 1}/{info.size}"
+    return response
+
+
+if __name__ == '__main__':
+    app.run(debug=True)
@@ -0,0 +1,201 @@
+import gzip
+import logging
+import os
+import re
+import sys
+from datetime import date
+import psycopg
+from psycopg import sql
+from db import DB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Monthly partition maintenance for the audit tables. Run it daily, e.g. from cron:
+#   python audit_partitions.py
+AUDIT_PARTITION_CONFIG = {
+    "months_ahead": 3,  # Monthly partitions created in advance, beyond the current month
+    "retention_months": 12,  # Full months of audit history kept in the database, besides the current one
+    "archive_dir": "audit_archive",  # Where expired partitions are exported, as gzip-compressed CSV
+}
+
+# Partitioned audit table -> its partition key (see SCHEMA_SQL in init_db.py)
+AUDIT_TABLES = {
+    "TemporaryDischargeAudit": "change_timestamp",
+    "TemporaryEnrichmentDataAudit": "change_timestamp",
+    "RawDataIngestedAudit": "action_timestamp",
+}
+
+_PARTITION_NAME = re.compile(r"^(?P<table>[a-z]+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+def _add_months(month_start, months):
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month_start):
+    """Name of the partition of table holding the month starting at month_start."""
+    return f"{table.lower()}_p{month_start:%Y_%m}"
+
+
+def _current_month(cursor):
+    # The partition keys default to the database's CURRENT_TIMESTAMP, so its clock decides the month
+    cursor.execute("SELECT date_trunc('month', LOCALTIMESTAMP)::date")
+    return cursor.fetchone()[0]
+
+
+def _create_partition(cursor, table, column, name, start):
+    """
+    Create the partition of table for the month starting at start. Rows for that month
+    already in the default partition are moved into it, since PostgreSQL refuses to
+    create a partition whose rows the default partition holds.
+    """
+    identifiers = {
+        "parent": sql.Identifier(table.lower()),
+        "default": sql.Identifier(f"{table.lower()}_default"),
+        "partition": sql.Identifier(name),
+        "column": sql.Identifier(column),
+        "start": sql.Literal(start),
+        "end": sql.Literal(_add_months(start, 1)),
+    }
+    cursor.execute(sql.SQL(
+        "SELECT EXISTS (SELECT 1 FROM {default} WHERE {column} >= {start} AND {column} < {end})"
+    ).format(**identifiers))
+    has_stray_rows = cursor.fetchone()[0]
+
+    if has_stray_rows:
+        logger.warning(f"Moving {table} rows for {start:%Y-%m} out of the default partition.")
+        cursor.execute(sql.SQL("CREATE TEMP TABLE audit_partition_rows (LIKE {parent})").format(**identifiers))
+        cursor.execute(sql.SQL(
+            """
+            WITH moved AS (
+                DELETE FROM {default} WHERE {column} >= {start} AND {column} < {end} RETURNING *
+            )
+            INSERT INTO audit_partition_rows SELECT * FROM moved
+            """
+        ).format(**identifiers))
+
+    cursor.execute(sql.SQL(
+        "CREATE TABLE {partition} PARTITION OF {parent} FOR VALUES FROM ({start}) TO ({end})"
+    ).format(**identifiers))
+
+    if has_stray_rows:
+        cursor.execute(sql.SQL("INSERT INTO {parent} SELECT * FROM audit_partition_rows").format(**identifiers))
+        cursor.execute("DROP TABLE audit_partition_rows")
+
+
+def create_audit_partitions(conn, months_ahead=None):
+    """
+    Create the missing monthly partitions of each audit table, from the current month
+    through months_ahead months ahead. Past months whose rows ended up in the default
+    partition (because the job did not run in time) get their partitions as well.
+
+    Each partition is created in its own transaction (a savepoint when conn is already
+    in one, as in init_db.py). Returns the names of the partitions created.
+    """
+    if months_ahead is None:
+        months_ahead = AUDIT_PARTITION_CONFIG["months_ahead"]
+
+    created = []
+    with conn.cursor() as cursor:
+        current_month = _current_month(cursor)
+        for table, column in AUDIT_TABLES.items():
+            cursor.execute(sql.SQL("SELECT date_trunc('month', min({column}))::date FROM {default}").format(
+                column=sql.Identifier(column),
+                default=sql.Identifier(f"{table.lower()}_default"),
+            ))
+            oldest_stray_month = cursor.fetchone()[0]
+            month = min(current_month, oldest_stray_month or current_month)
+            last_month = _add_months(current_month, months_ahead)
+
+            while month <= last_month:
+                name = partition_name(table, month)
+                cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (name,))
+                if not cursor.fetchone()[0]:
+                    with conn.transaction():
+                        _create_partition(cursor, table, column, name, month)
+                    created.append(name)
+                    logger.info(f"Created audit partition {name}.")
+                month = _add_months(month, 1)
+
+    return created
+
+
+def _export_partition(cursor, name, archive_dir):
+    """
+    Write a detached partition to archive_dir/<name>.csv.gz. The file appears under its
+    final name only once it is complete. Returns its path.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    partial_path = f"{path}.partial"
+    copy_sql = sql.SQL("COPY {partition} TO STDOUT WITH (FORMAT csv, HEADER)").format(partition=sql.Identifier(name))
+    with gzip.open(partial_path, "wb") as archive, cursor.copy(copy_sql) as copy:
+        for data in copy:
+            archive.write(data)
+    os.replace(partial_path, path)
+    return path
+
+
+def archive_audit_partitions(conn, retention_months=None, archive_dir=None):
+    """
+    Detach the audit partitions for months older than retention_months full months,
+    export each to a gzip-compressed CSV file in archive_dir and drop it. Detaching and
+    dropping only change the catalog, so expired rows are never deleted one by one.
+    A partition left detached by an interrupted run is exported and dropped by the next.
+
+    conn must be in autocommit mode, so that each partition is detached in a short
+    transaction of its own and the export holds no lock on the audit table. Returns the
+    archive file paths written.
+    """
+    if not conn.autocommit:
+        raise ValueError("Archiving audit partitions needs an autocommit connection")
+    if retention_months is None:
+        retention_months = AUDIT_PARTITION_CONFIG["retention_months"]
+    if archive_dir is None:
+        archive_dir = AUDIT_PARTITION_CONFIG["archive_dir"]
+
+    tables = {table.lower(): table for table in AUDIT_TABLES}
+    archived = []
+    with conn.cursor() as cursor:
+        cutoff = _add_months(_current_month(cursor), -retention_months)
+        cursor.execute(
+            """
+            SELECT c.relname, c.relispartition
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema() AND c.relkind = 'r' AND c.relname ~ '_p[0-9]{4}_[0-9]{2}$'
+            ORDER BY c.relname
+            """
+        )
+        for name, is_attached in cursor.fetchall():
+            match = _PARTITION_NAME.match(name)
+            if match is None or match["table"] not in tables:
+                continue
+            if date(int(match["year"]), int(match["month"]), 1) >= cutoff:
+                continue
+
+            if is_attached:
+                cursor.execute(sql.SQL("ALTER TABLE {parent} DETACH PARTITION {partition}").format(
+                    parent=sql.Identifier(match["table"]),
+                    partition=sql.Identifier(name),
+                ))
+                logger.info(f"Detached audit partition {name} from {tables[match['table']]}.")
+            path = _export_partition(cursor, name, archive_dir)
+            cursor.execute(sql.SQL("DROP TABLE {partition}").format(partition=sql.Identifier(name)))
+            logger.info(f"Archived audit partition {name} to {path} and dropped it.")
+            archived.append(path)
+
+    return archived
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        with psycopg.connect(**DB_CONFIG, autocommit=True) as connection:
+            partitions = create_audit_partitions(connection)
+            archives = archive_audit_partitions(connection)
+    except Exception as e:
+        logger.error(f"Audit partition maintenance failed: {e}")
+        sys.exit(1)
+    print(f"Created {len(partitions)} audit partitions and archived {len(archives)}.")
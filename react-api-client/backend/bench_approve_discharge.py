@@ -0,0 +1,328 @@
+import logging
+import sys
+import time
+import psycopg
+from db import DB_CONFIG
+from api_common import APPROVE_CHUNK_SIZE, copy_temporary_discharge_rows, session_user_id
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Discharge counts to benchmark
+ROW_COUNTS = [1_000, 100_000]
+
+# The previous f_approve_discharge: one discharge per call, SELECT-then-INSERT for every
+# dimension. Created as a temporary function so it only exists for the benchmark session.
+LEGACY_APPROVE_SQL = """
+CREATE OR REPLACE FUNCTION pg_temp.f_approve_discharge_legacy(i_temp_discharge_id UUID)
+RETURNS VOID AS $$
+DECLARE
+    tv_patient_id UUID;
+    tv_epic_id UUID; -- To store the generated UUID from Epic
+    tv_raw_epic_id VARCHAR; -- To store the raw epic_id from TemporaryDischarge
+    tv_phone_number VARCHAR;
+    tv_phone_validation_status VARCHAR;
+    tv_phone_type VARCHAR;
+    tv_insurance_name VARCHAR;
+    tv_insurance_verified BOOLEAN;
+    tv_attending_physician VARCHAR;
+    tv_primary_care_provider VARCHAR;
+    tv_provider_verified BOOLEAN;
+    tv_hospital_name VARCHAR;
+    tv_discharge_id UUID;
+    tv_provider_id UUID;
+    tv_provider_provider_type_id UUID;
+    tv_insurance_id UUID;
+    tv_hospital_id UUID;
+    tv_provider_type_id UUID;
+    tv_full_name VARCHAR;
+    tv_disposition VARCHAR;
+    tv_discharge_date DATE;
+    tv_provider_name VARCHAR; -- To use in the loop
+    tv_enrichment_record RECORD; -- To hold enrichment data
+BEGIN
+    -- Fetch discharge data from TemporaryDischarge
+    SELECT td.name, td.epic_id, td.date, td.phone_number,
+           td.insurance, td.attending_physician, td.primary_care_provider,
+           td.hospital_name, td.disposition
+    INTO tv_full_name, tv_raw_epic_id, tv_discharge_date, tv_phone_number,
+         tv_insurance_name, tv_attending_physician, tv_primary_care_provider, tv_hospital_name, tv_disposition
+    FROM TemporaryDischarge td
+    WHERE td.temp_discharge_id = i_temp_discharge_id;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Discharge not found for ID: %', i_temp_discharge_id;
+    END IF;
+
+    -- Fetch enrichment data from TemporaryEnrichmentData
+    FOR tv_enrichment_record IN
+        SELECT ted.enrichment_type_id, ted.enrichment_value
+        FROM TemporaryEnrichmentData ted
+        WHERE ted.temp_discharge_id = i_temp_discharge_id
+    LOOP
+        IF tv_enrichment_record.enrichment_type_id = 'eeb9f5b4-15e3-4ac2-a4b4-5c7c7f92b717' THEN
+            -- Phone Validation Status
+            tv_phone_validation_status := tv_enrichment_record.enrichment_value;
+        ELSIF tv_enrichment_record.enrichment_type_id = 'add1ed02-dc4e-460a-b3e1-9b9a160ab2b2' THEN
+            -- Phone Type
+            tv_phone_type := tv_enrichment_record.enrichment_value;
+        ELSIF tv_enrichment_record.enrichment_type_id = 'c8f7629d-38ec-4506-93b8-c2a9a08b3b65' THEN
+            -- Insurance Verified
+            tv_insurance_verified := tv_enrichment_record.enrichment_value::BOOLEAN;
+        ELSIF tv_enrichment_record.enrichment_type_id = '2a8760cb-505b-4c6f-a0b0-2a4d87fe8850' THEN
+            -- Provider Verified
+            tv_provider_verified := tv_enrichment_record.enrichment_value::BOOLEAN;
+        END IF;
+    END LOOP;
+
+    -- Check for existing Patient
+    SELECT p.patient_id INTO tv_patient_id
+    FROM Patient p
+    WHERE p.full_name = tv_full_name;
+
+    IF NOT FOUND THEN
+        -- Insert new Patient
+        INSERT INTO Patient (full_name, created_at, updated_at)
+        VALUES (tv_full_name, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        RETURNING patient_id INTO tv_patient_id;
+    END IF;
+
+    -- Check if epic_identifier already exists
+    SELECT epic_id INTO tv_epic_id
+    FROM Epic
+    WHERE epic_identifier = tv_raw_epic_id;
+
+    IF NOT FOUND THEN
+        -- Insert into Epic table with raw_epic_id and retrieve generated epic_id
+        INSERT INTO Epic (epic_identifier, patient_id, created_at, updated_at)
+        VALUES (tv_raw_epic_id, tv_patient_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        RETURNING epic_id INTO tv_epic_id;
+    END IF;
+
+    -- Insert into Discharge table using the generated epic_id
+    INSERT INTO Discharge (epic_id, discharge_date, disposition, created_at, updated_at)
+    VALUES (tv_epic_id, tv_discharge_date, tv_disposition, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+    RETURNING discharge_id INTO tv_discharge_id;
+
+    -- Handle Providers (Attending Physician and Primary Care Provider)
+    -- Only proceed if at least one provider is present
+    IF (tv_attending_physician IS NOT NULL AND TRIM(tv_attending_physician) <> '') OR
+       (tv_primary_care_provider IS NOT NULL AND TRIM(tv_primary_care_provider) <> '') THEN
+
+        FOR tv_provider_name IN SELECT unnest(ARRAY[
+            CASE WHEN tv_attending_physician IS NOT NULL AND TRIM(tv_attending_physician) <> '' THEN tv_attending_physician ELSE NULL END,
+            CASE WHEN tv_primary_care_provider IS NOT NULL AND TRIM(tv_primary_care_provider) <> '' THEN tv_primary_care_provider ELSE NULL END
+        ])
+        LOOP
+            -- Skip if provider name is NULL or empty
+            IF tv_provider_name IS NULL THEN
+                CONTINUE;
+            END IF;
+
+            -- Check if provider exists
+            SELECT pr.provider_id INTO tv_provider_id
+            FROM Provider pr
+            WHERE pr.name = tv_provider_name;
+
+            IF NOT FOUND THEN
+                -- Insert new Provider
+                INSERT INTO Provider (name, created_at, updated_at)
+                VALUES (tv_provider_name, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                RETURNING provider_id INTO tv_provider_id;
+            END IF;
+
+            -- Handle Provider Type
+            IF tv_provider_name = tv_attending_physician THEN
+                tv_provider_type_id := '47b4d1f9-60fc-4ec4-aab4-7c94b9cd5290';
+            ELSE
+                tv_provider_type_id := '7a21f43a-df8e-4f7e-9c4a-c3f8f9e28fe2';
+            END IF;
+
+            -- Check or insert into ProviderProviderType
+            SELECT ppt.provider_provider_type_id INTO tv_provider_provider_type_id
+            FROM ProviderProviderType ppt
+            WHERE ppt.provider_id = tv_provider_id AND ppt.provider_type_id = tv_provider_type_id;
+
+            IF NOT FOUND THEN
+                INSERT INTO ProviderProviderType (provider_id, provider_type_id, created_at, updated_at)
+                VALUES (tv_provider_id, tv_provider_type_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                RETURNING provider_provider_type_id INTO tv_provider_provider_type_id;
+            END IF;
+
+            -- Insert into DischargeProvider table 
+            IF tv_discharge_id IS NOT NULL THEN
+                -- Check if a matching record already exists in DischargeProvider
+                PERFORM 1
+                FROM DischargeProvider dp
+                WHERE dp.discharge_id = tv_discharge_id AND dp.provider_provider_type_id = tv_provider_provider_type_id;
+
+                IF NOT FOUND THEN
+                    -- Insert into DischargeProvider table only if the record does not exist
+                    INSERT INTO DischargeProvider (discharge_id, provider_provider_type_id, created_at, updated_at)
+                    VALUES (tv_discharge_id, tv_provider_provider_type_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
+                END IF;
+            END IF;
+        END LOOP;
+    END IF;
+
+    -- Check and insert into PatientPhone only if tv_phone_number is not null or empty
+    IF tv_phone_number IS NOT NULL AND TRIM(tv_phone_number) <> '' THEN
+        PERFORM 1
+        FROM PatientPhone pp
+        WHERE pp.patient_id = tv_patient_id 
+          AND pp.phone_number = tv_phone_number
+          AND pp.phone_validation_status = tv_phone_validation_status
+          AND pp.phone_type = tv_phone_type;
+
+        IF NOT FOUND THEN
+            INSERT INTO PatientPhone (patient_id, phone_number, phone_validation_status, phone_type, created_at, updated_at)
+            VALUES (tv_patient_id, tv_phone_number, tv_phone_validation_status, tv_phone_type, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
+        END IF;
+    END IF;
+
+    -- Insert into Insurance and EpicInsurance only if tv_insurance_name is not null or empty
+    IF tv_insurance_name IS NOT NULL AND TRIM(tv_insurance_name) <> '' THEN
+        SELECT i.insurance_id INTO tv_insurance_id
+        FROM Insurance i
+        WHERE i.insurance_name = tv_insurance_name;
+
+        IF NOT FOUND THEN
+            INSERT INTO Insurance (insurance_name, created_at, updated_at)
+            VALUES (tv_insurance_name, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            RETURNING insurance_id INTO tv_insurance_id;
+        END IF;
+
+        -- Insert into EpicInsurance if not already present
+        INSERT INTO EpicInsurance (epic_id, insurance_id, insurance_verified, created_at, updated_at)
+        VALUES (tv_epic_id, tv_insurance_id, tv_insurance_verified, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
+    END IF;
+
+    -- Insert data into Hospital and EpicHospital only if tv_hospital_name is not null or empty
+    IF tv_hospital_name IS NOT NULL AND TRIM(tv_hospital_name) <> '' THEN
+        SELECT h.hospital_id INTO tv_hospital_id
+        FROM Hospital h
+        WHERE h.hospital_name = tv_hospital_name;
+
+        IF NOT FOUND THEN
+            INSERT INTO Hospital (hospital_name, created_at, updated_at)
+            VALUES (tv_hospital_name, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            RETURNING hospital_id INTO tv_hospital_id;
+        END IF;
+
+        -- Insert into EpicHospital if not already present
+        PERFORM 1
+        FROM EpicHospital eh
+        WHERE eh.epic_id = tv_epic_id AND eh.hospital_id = tv_hospital_id;
+
+        IF NOT FOUND THEN
+            INSERT INTO EpicHospital (epic_id, hospital_id, created_at, updated_at)
+            VALUES (tv_epic_id, tv_hospital_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
+        END IF;
+    END IF;
+
+    -- Update the status of TemporaryDischarge
+    UPDATE TemporaryDischarge
+    SET status = 'Approved'
+    WHERE temp_discharge_id = i_temp_discharge_id;
+
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Enrichment values for each discharge (Phone Validation Status, Phone Type, Insurance Verified, Provider Verified)
+ENRICHMENT_SQL = """
+INSERT INTO TemporaryEnrichmentData (temp_discharge_id, enrichment_type_id, enrichment_value, created_by, updated_by)
+SELECT td.temp_discharge_id, v.enrichment_type_id::uuid, v.enrichment_value, %(user_id)s, %(user_id)s
+FROM TemporaryDischarge td
+CROSS JOIN (VALUES
+    ('eeb9f5b4-15e3-4ac2-a4b4-5c7c7f92b717', 'Valid'),
+    ('add1ed02-dc4e-460a-b3e1-9b9a160ab2b2', 'Mobile'),
+    ('c8f7629d-38ec-4506-93b8-c2a9a08b3b65', 'true'),
+    ('2a8760cb-505b-4c6f-a0b0-2a4d87fe8850', 'false')
+) AS v (enrichment_type_id, enrichment_value)
+WHERE td.temp_discharge_id = ANY(%(ids)s::uuid[])
+"""
+
+
+def make_records(count):
+    """
+    Build synthetic discharges. Patients and Epic ids are unique; providers,
+    insurances and hospitals repeat, as they do in real imports.
+    """
+    return [
+        {
+            "name": f"Bench Patient {i}",
+            "epic_id": f"BENCH{1_000_000 + i}",
+            "phone_number": f"404-555-{i % 10000:04d}",
+            "attending_physician": f"Dr. Attending {i % 200}",
+            "date": "01-15-2024",
+            "primary_care_provider": f"Dr. Primary {i % 500}",
+            "insurance": f"Insurance Plan {i % 40}",
+            "disposition": "Home",
+            "hospital": f"Hospital {i % 10}",
+        }
+        for i in range(count)
+    ]
+
+
+def approve_one_by_one(cursor, temp_discharge_ids):
+    """The previous approval path: one legacy function call per discharge."""
+    for temp_discharge_id in temp_discharge_ids:
+        cursor.execute("SELECT pg_temp.f_approve_discharge_legacy(%s)", (temp_discharge_id,))
+
+
+def approve_all_at_once(cursor, temp_discharge_ids):
+    """One f_approve_discharges call for the whole batch."""
+    cursor.execute("SELECT count(*) FROM f_approve_discharges(%s::uuid[])", (temp_discharge_ids,))
+
+
+def approve_in_chunks(cursor, temp_discharge_ids):
+    """f_approve_discharges in chunks of APPROVE_CHUNK_SIZE, as POST /api/approve does."""
+    for start in range(0, len(temp_discharge_ids), APPROVE_CHUNK_SIZE):
+        approve_all_at_once(cursor, temp_discharge_ids[start:start + APPROVE_CHUNK_SIZE])
+
+
+def time_approval(approve_fn, records):
+    """
+    Load the records into TemporaryDischarge and time approve_fn on them, inside a
+    transaction that is rolled back afterwards, so the benchmark leaves no rows behind.
+    """
+    with psycopg.connect(**DB_CONFIG) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(LEGACY_APPROVE_SQL)
+            copy_temporary_discharge_rows(cursor, records, None)
+            cursor.execute(
+                "SELECT temp_discharge_id FROM TemporaryDischarge WHERE epic_id LIKE 'BENCH%' AND status = 'Pending'"
+            )
+            temp_discharge_ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute(ENRICHMENT_SQL, {"ids": temp_discharge_ids, "user_id": session_user_id})
+            cursor.execute("ANALYZE TemporaryDischarge")
+            cursor.execute("ANALYZE TemporaryEnrichmentData")
+
+            start = time.perf_counter()
+            approve_fn(cursor, temp_discharge_ids)
+            elapsed = time.perf_counter() - start
+        conn.rollback()
+    return elapsed
+
+
+def run_benchmark():
+    """Compare the per-discharge function with the set-based one for each configured count."""
+    try:
+        print(f"{'rows':>10} {'one by one (s)':>16} {'set-based (s)':>15} {'chunked (s)':>13} {'speedup':>9}")
+        for count in ROW_COUNTS:
+            records = make_records(count)
+            one_by_one = time_approval(approve_one_by_one, records)
+            all_at_once = time_approval(approve_all_at_once, records)
+            chunked = time_approval(approve_in_chunks, records)
+            print(
+                f"{count:>10} {one_by_one:>16.3f} {all_at_once:>15.3f} {chunked:>13.3f} "
+                f"{one_by_one / all_at_once:>8.1f}x"
+            )
+    except psycopg.OperationalError as e:
+        logging.error(f"Operational error running benchmark: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_benchmark()
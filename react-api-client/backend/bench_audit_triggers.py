@@ -0,0 +1,157 @@
+import logging
+import sys
+import time
+import psycopg
+from db import DB_CONFIG
+from api_common import copy_temporary_discharge_rows, session_user_id
+from bench_approve_discharge import ENRICHMENT_SQL, make_records
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Discharge counts to benchmark
+ROW_COUNTS = [10_000, 100_000]
+
+AUDIT_TABLES = ["TemporaryDischargeAudit", "TemporaryEnrichmentDataAudit", "RawDataIngestedAudit"]
+
+# The statement-level audit triggers created by init_db.py
+STATEMENT_TRIGGERS = [
+    (table, f"trigger_{prefix}_audit_{event}")
+    for table, prefix in [
+        ("TemporaryDischarge", "temporary_discharge"),
+        ("TemporaryEnrichmentData", "temporary_enrichment_data"),
+        ("RawDataIngested", "raw_data_ingested"),
+    ]
+    for event in ("insert", "update", "delete")
+]
+
+# The previous audit triggers: FOR EACH ROW, full row_to_json copies of OLD and NEW on every
+# update. Created inside the benchmark transaction, so they are rolled back with it.
+LEGACY_ROW_TRIGGERS_SQL = """
+CREATE FUNCTION bench_log_temporary_discharge_audit()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (TG_OP = 'INSERT') THEN
+        INSERT INTO TemporaryDischargeAudit (temp_discharge_id, action, changed_by, change_timestamp, new_value)
+        VALUES (NEW.temp_discharge_id, 'INSERT', NEW.updated_by, CURRENT_TIMESTAMP, row_to_json(NEW)::jsonb);
+    ELSIF (TG_OP = 'UPDATE') THEN
+        INSERT INTO TemporaryDischargeAudit (temp_discharge_id, action, changed_by, change_timestamp, previous_value, new_value)
+        VALUES (NEW.temp_discharge_id, 'UPDATE', NEW.updated_by, CURRENT_TIMESTAMP, row_to_json(OLD)::jsonb, row_to_json(NEW)::jsonb);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bench_trigger_temporary_discharge_audit
+AFTER INSERT OR UPDATE ON TemporaryDischarge
+FOR EACH ROW EXECUTE FUNCTION bench_log_temporary_discharge_audit();
+
+CREATE FUNCTION bench_log_temporary_enrichment_data_audit()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (TG_OP = 'INSERT') THEN
+        INSERT INTO TemporaryEnrichmentDataAudit (enrichment_data_id, action, changed_by, change_timestamp, new_value)
+        VALUES (NEW.enrichment_data_id, 'INSERT', NEW.updated_by, CURRENT_TIMESTAMP, row_to_json(NEW)::jsonb);
+    ELSIF (TG_OP = 'UPDATE') THEN
+        INSERT INTO TemporaryEnrichmentDataAudit (enrichment_data_id, action, changed_by, change_timestamp, previous_value, new_value)
+        VALUES (NEW.enrichment_data_id, 'UPDATE', NEW.updated_by, CURRENT_TIMESTAMP, row_to_json(OLD)::jsonb, row_to_json(NEW)::jsonb);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bench_trigger_temporary_enrichment_data_audit
+AFTER INSERT OR UPDATE ON TemporaryEnrichmentData
+FOR EACH ROW EXECUTE FUNCTION bench_log_temporary_enrichment_data_audit();
+"""
+
+# The writes measured after the COPY load, in order: its enrichment values, the bulk status
+# update an approval makes, and a reviewer edit of one enrichment value on every discharge
+WORKLOAD = [
+    ("enrichment insert", ENRICHMENT_SQL),
+    ("approve update", """
+        UPDATE TemporaryDischarge
+        SET status = 'Approved', approved_at = CURRENT_TIMESTAMP, approved_by = %(user_id)s, updated_by = %(user_id)s
+        WHERE temp_discharge_id = ANY(%(ids)s::uuid[])
+    """),
+    ("enrichment update", """
+        UPDATE TemporaryEnrichmentData
+        SET enrichment_value = 'Landline', updated_by = %(user_id)s
+        WHERE temp_discharge_id = ANY(%(ids)s::uuid[])
+          AND enrichment_type_id = 'add1ed02-dc4e-460a-b3e1-9b9a160ab2b2'
+    """),
+]
+
+MODES = ["off", "row-level", "statement-level"]
+
+
+def set_audit_triggers(cursor, mode):
+    """Leave the statement-level triggers on, swap in the row-level ones, or turn auditing off."""
+    if mode == "statement-level":
+        return
+    for table, trigger in STATEMENT_TRIGGERS:
+        cursor.execute(f"ALTER TABLE {table} DISABLE TRIGGER {trigger}")
+    if mode == "row-level":
+        cursor.execute(LEGACY_ROW_TRIGGERS_SQL)
+
+
+def audit_size(cursor):
+    """Total size in bytes of the audit tables, including TOAST and indexes."""
+    cursor.execute(
+        "SELECT sum(pg_total_relation_size(t::regclass)) FROM unnest(%s::text[]) AS t",
+        (AUDIT_TABLES,),
+    )
+    return cursor.fetchone()[0]
+
+
+def time_workload(mode, records):
+    """
+    Run WORKLOAD with the audit triggers in the given mode and time each write, inside a
+    transaction that is rolled back afterwards, so the benchmark leaves no rows behind.
+    Returns the elapsed seconds per write and the bytes the audit tables grew by.
+    """
+    timings = {}
+    with psycopg.connect(**DB_CONFIG) as conn:
+        with conn.cursor() as cursor:
+            set_audit_triggers(cursor, mode)
+            size_before = audit_size(cursor)
+            start = time.perf_counter()
+            copy_temporary_discharge_rows(cursor, records, None)
+            timings["copy load"] = time.perf_counter() - start
+
+            cursor.execute(
+                "SELECT temp_discharge_id FROM TemporaryDischarge WHERE epic_id LIKE 'BENCH%' AND status = 'Pending'"
+            )
+            params = {"ids": [row[0] for row in cursor.fetchall()], "user_id": session_user_id}
+            for name, query in WORKLOAD:
+                start = time.perf_counter()
+                cursor.execute(query, params)
+                timings[name] = time.perf_counter() - start
+            audit_bytes = audit_size(cursor) - size_before
+        conn.rollback()
+    return timings, audit_bytes
+
+
+def run_benchmark():
+    """Compare write throughput with the audit triggers off, row-level and statement-level."""
+    try:
+        print(f"{'rows':>10} {'write':<18} " + " ".join(f"{mode + ' (discharges/s)':>30}" for mode in MODES))
+        for count in ROW_COUNTS:
+            records = make_records(count)
+            results = {mode: time_workload(mode, records) for mode in MODES}
+            for name in ["copy load"] + [name for name, _ in WORKLOAD]:
+                print(
+                    f"{count:>10} {name:<18} "
+                    + " ".join(f"{count / results[mode][0][name]:>30,.0f}" for mode in MODES)
+                )
+            print(
+                f"{count:>10} {'audit size (MB)':<18} "
+                + " ".join(f"{results[mode][1] / 1_048_576:>30.1f}" for mode in MODES)
+            )
+    except psycopg.OperationalError as e:
+        logging.error(f"Operational error running benchmark: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,103 @@
+import logging
+import random
+import sys
+import time
+from discharge_parser import (
+    DISPOSITION_LIST,
+    INSURANCE_LIST,
+    _parse_discharge_line_fallback,
+    iter_structured_data,
+    parse_discharge_line,
+)
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Number of synthetic rows to time the parser on
+LINE_COUNT = 1_000_000
+HOSPITAL_NAME = "Sacred Heart Hospital"
+
+# Rows taken from uploads/Sacred.Heart.Hospital.Discharges.pdf plus hand-written edge cases
+GOLDEN_LINES = [
+    "Sunshine, Melody EP001234567 202-555-0152 Kildare, James MD 07-04-2023 Bailey, Miranda MD BCBS Home",
+    "O’Furniture, Patty EP001239901 202-555-0148 Hardy, Steve MD 07-04-2023 Webber, Richard MD Aetna Health HHS",
+    "Bacon, Chris P. EP001237654 4047271234 Manning, Steward Wallace PA 07-04-2023 Sloan, MD Mark Self Pay SNF",
+    "Mellow, S. Marsha Bayabygirl EP001239876 House, Greg MD 07-04-2023 Humana Health Home",
+    "Epstein, EPHRAIM EP001230001 (404) 727-1234 Grey, Meredith MD 07-05-2023 Shepherd, Derek MD Medicare Hospice",
+    "Doe, Jane EP001230002 07-05-2023 Yang, Cristina MD Cigna Home with Follow-up",
+    "Doe, John EP001230003  07-05-2023 Karev, Alex MD No Insurance ICU Stepdown",
+    "Roe, Richard EP001230004 404 727 1234 Bailey, Miranda MD 07-05-2023 Webber, Richard MD 07-05-2023 Tricare SNF",
+    "Birthday 01-01-1990 Smith EP001230005 202-555-0100 Hunt, Owen MD 07-06-2023 Robbins, Arizona MD Anthem Observation",
+    "Noid, Phone EP001230006 Torres, Callie MD (555) 123-4567 07-06-2023 Pierce, Maggie MD Kaiser Permanente Home",
+    "Line without an epic id 07-06-2023 Medicare Home",
+    "Line with EP001230007 but no date",
+    "Tab\tSeparated EP001230008\t202-555-0199\tAvery, Jackson MD\t07-07-2023\tKepner, April MD\tBlue Shield\tHHS",
+    "xEP001230009 202-555-0111 Lincoln, Atticus MD 07-07-2023 Schmitt, Levi MD Medicaid Home",
+    "Two, Epics EP001230010 EP001230011 202-555-0122 Wilson, Jo MD 07-07-2023 Warren, Ben MD Self Pay Home",
+    "",
+]
+
+FIRST_NAMES = ["Melody", "Patty", "Chris", "Marsha", "Ephraim", "Jane", "John", "Owen", "Callie", "April"]
+LAST_NAMES = ["Sunshine", "O’Furniture", "Bacon", "Mellow", "Epstein", "Doe", "Hunt", "Torres", "Kepner", "Avery"]
+PHYSICIANS = ["Kildare, James MD", "Hardy, Steve MD", "Manning, Steward Wallace PA", "House, Greg MD", "Grey, Meredith MD"]
+
+
+def synthetic_line(rng, i):
+    """Build one synthetic discharge row, with some of the odd shapes seen in real exports."""
+    name = f"{rng.choice(LAST_NAMES)}, {rng.choice(FIRST_NAMES)}"
+    phone = rng.choice([
+        f"202-555-{i % 10000:04d}",
+        f"(404) 727-{i % 10000:04d}",
+        f"404 727 {i % 10000:04d}",
+        f"404727{i % 10000:04d}",
+        "",
+    ])
+    date = f"{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}-2023"
+    details = f"{rng.choice(PHYSICIANS)} {rng.choice(INSURANCE_LIST)} {rng.choice(DISPOSITION_LIST)}"
+    middle = f"{phone} {rng.choice(PHYSICIANS)}" if phone else rng.choice(PHYSICIANS)
+    return f"{name} EP{i:09d} {middle} {date} {details}"
+
+
+def check_golden(lines):
+    """Fail if the fast path and the reference parser disagree on any line."""
+    mismatches = 0
+    for line in lines:
+        expected = _parse_discharge_line_fallback(line.strip(), HOSPITAL_NAME) if line.strip() else None
+        actual = parse_discharge_line(line, HOSPITAL_NAME)
+        if actual != expected:
+            mismatches += 1
+            print(f"Mismatch for line: {line!r}\n  expected: {expected}\n  actual:   {actual}")
+    return mismatches
+
+
+def time_parser(parse_line, lines):
+    start = time.perf_counter()
+    for line in lines:
+        parse_line(line, HOSPITAL_NAME)
+    return time.perf_counter() - start
+
+
+def run_benchmark():
+    """Check the parser against the golden corpus, then time it on LINE_COUNT synthetic rows."""
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else LINE_COUNT
+    rng = random.Random(42)
+    lines = [synthetic_line(rng, i) for i in range(line_count)]
+
+    mismatches = check_golden(GOLDEN_LINES) + check_golden(lines[:100_000])
+    if mismatches:
+        print(f"{mismatches} lines parsed differently from the reference parser")
+        sys.exit(1)
+    print("Golden corpus: fast path matches the reference parser")
+
+    # Sanity check the full iterator on a title + header + rows document
+    document = ["Sacred Heart Hospital Discharges for July 4th, 2023", "Name Epic Id ..."] + GOLDEN_LINES
+    print(f"Golden document rows parsed: {sum(1 for _ in iter_structured_data(document))}")
+
+    reference = time_parser(lambda line, hospital: _parse_discharge_line_fallback(line.strip(), hospital), lines)
+    fast = time_parser(parse_discharge_line, lines)
+    print(f"{'lines':>10} {'reference (s)':>15} {'fast (s)':>10} {'speedup':>9}")
+    print(f"{line_count:>10} {reference:>15.3f} {fast:>10.3f} {reference / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
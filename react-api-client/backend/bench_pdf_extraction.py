@@ -0,0 +1,98 @@
+import logging
+import os
+import sys
+import tempfile
+import time
+from pdf_extraction import PDF_EXTRACTION_CONFIG, extract_pdf_text, shutdown_extraction_pool
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Page counts to benchmark
+PAGE_COUNTS = [10, 50, 150, 300]
+ROWS_PER_PAGE = 40
+
+
+def discharge_line(i):
+    return (
+        f"Patient{i}, Test EP{1000000 + i:09d} 202-555-{i % 10000:04d} Kildare, James MD "
+        f"07-04-2023 Bailey, Miranda MD BCBS Home"
+    )
+
+
+def write_discharge_pdf(path, page_count, rows_per_page=ROWS_PER_PAGE):
+    """
+    Write a text-only PDF shaped like a Sacred Heart discharge list, with
+    page_count pages of rows_per_page rows each.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages object, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    row = 0
+    for page in range(page_count):
+        lines = []
+        if page == 0:
+            lines.append("Sacred Heart Hospital Discharges for July 4th, 2023")
+            lines.append("Name Epic Id Phone number Attending Physician Date Primary Care Provider Insurance Disposition")
+        for _ in range(rows_per_page):
+            lines.append(discharge_line(row))
+            row += 1
+
+        stream = "BT /F1 8 Tf 10 TL 20 780 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+        stream = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+
+    kids = b" ".join(b"%d 0 R" % ref for ref in page_refs)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_refs))
+
+    with open(path, "wb") as pdf_file:
+        pdf_file.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(pdf_file.tell())
+            pdf_file.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref_offset = pdf_file.tell()
+        pdf_file.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            pdf_file.write(b"%010d 00000 n \n" % offset)
+        pdf_file.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+
+
+def run_benchmark():
+    """Compare sequential and process-pool extraction for each configured page count."""
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else PDF_EXTRACTION_CONFIG["workers"]
+    print(f"Parallel extraction with {workers} workers")
+    print(f"{'pages':>8} {'sequential (s)':>16} {'parallel (s)':>14} {'speedup':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for page_count in PAGE_COUNTS:
+            path = os.path.join(tmp_dir, f"discharges_{page_count}.pdf")
+            write_discharge_pdf(path, page_count)
+
+            start = time.perf_counter()
+            sequential_text = extract_pdf_text(path, workers=1)
+            sequential = time.perf_counter() - start
+
+            start = time.perf_counter()
+            parallel_text = extract_pdf_text(path, workers=workers)
+            parallel = time.perf_counter() - start
+
+            if parallel_text != sequential_text:
+                print(f"Parallel output differs from sequential output at {page_count} pages")
+                sys.exit(1)
+            print(f"{page_count:>8} {sequential:>16.3f} {parallel:>14.3f} {sequential / parallel:>8.1f}x")
+
+    shutdown_extraction_pool()
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,170 @@
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from bench_pdf_extraction import write_discharge_pdf
+
+# Load test: are reviewer GETs still answered promptly while uploads are being ingested?
+# Start the backend against a development database (every upload adds an import), then:
+#   python bench_review_under_upload.py [base_url] [raw_data_id]
+# Run it once against `python app.py` and once against `hypercorn asgi_app:app --bind localhost:5000`
+# to compare the WSGI and ASGI servers.
+BENCH_CONFIG = {
+    "base_url": "http://localhost:5000",
+    "reviewers": 16,  # Threads re-fetching the review payload and the import list
+    "uploaders": 4,  # Threads uploading PDFs and waiting for their ingestion jobs
+    "phase_seconds": 20,  # Length of the idle phase and of the phase with uploads
+    "upload_pages": 150,  # Pages per uploaded PDF (40 discharge rows each)
+    "job_poll_seconds": 0.2,
+}
+
+
+def request(method, url, body=None, headers=None):
+    """Send a request; returns (status, body bytes, latency in milliseconds)."""
+    req = urllib.request.Request(url, data=body, method=method, headers=headers or {})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            data = response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        data = e.read()
+        status = e.code
+    return status, data, (time.perf_counter() - start) * 1000
+
+
+def get_json(url):
+    status, data, _ = request("GET", url)
+    if status != 200:
+        raise RuntimeError(f"GET {url} returned {status}: {data[:200]!r}")
+    return json.loads(data)
+
+
+def multipart_body(fields, filename, content):
+    """Encode form fields plus one PDF under "file" as multipart/form-data."""
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in fields.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    body.write(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'.encode()
+    )
+    body.write(content)
+    body.write(f'\r\n--{boundary}--\r\n'.encode())
+    return body.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+
+def reviewer(base_url, raw_data_id, stop, latencies, errors):
+    """Alternate between the two GETs a reviewer's browser repeats, recording each latency."""
+    urls = [f"{base_url}/review/{raw_data_id}", f"{base_url}/raw-data?limit=50"]
+    i = 0
+    while not stop.is_set():
+        try:
+            status, _, elapsed_ms = request("GET", urls[i % len(urls)])
+        except (urllib.error.URLError, OSError):
+            errors.append(None)
+        else:
+            (latencies if status == 200 else errors).append(elapsed_ms)
+        i += 1
+
+
+def uploader(base_url, import_type_id, template, stop, uploads):
+    """
+    Upload the template PDF again and again, each time with a unique trailing comment
+    so it is not recognised as a duplicate, and wait for each ingestion job to finish.
+    """
+    while not stop.is_set():
+        content = template + f"% {uuid.uuid4()}\n".encode()
+        body, content_type = multipart_body({"import_type_id": import_type_id}, "load-test.pdf", content)
+        status, data, _ = request("POST", f"{base_url}/upload-pdf", body, {"Content-Type": content_type})
+        if status == 503:
+            time.sleep(BENCH_CONFIG["job_poll_seconds"])  # Ingestion queue full
+            continue
+        if status != 202:
+            uploads.append({"state": f"HTTP {status}", "rows": 0})
+            continue
+
+        status_url = base_url + json.loads(data)["status_url"]
+        while True:
+            job = get_json(status_url)
+            if job["state"] in ("succeeded", "failed"):
+                uploads.append({"state": job["state"], "rows": job["counts"].get("rows_inserted", 0)})
+                break
+            time.sleep(BENCH_CONFIG["job_poll_seconds"])
+
+
+def run_phase(name, base_url, raw_data_id, import_type_id=None, template=None):
+    """Run the reviewers (and, given a template PDF, the uploaders) for phase_seconds; print the latencies."""
+    stop = threading.Event()
+    latencies, errors, uploads = [], [], []
+    threads = [
+        threading.Thread(target=reviewer, args=(base_url, raw_data_id, stop, latencies, errors))
+        for _ in range(BENCH_CONFIG["reviewers"])
+    ]
+    if template is not None:
+        threads += [
+            threading.Thread(target=uploader, args=(base_url, import_type_id, template, stop, uploads))
+            for _ in range(BENCH_CONFIG["uploaders"])
+        ]
+    for thread in threads:
+        thread.start()
+    time.sleep(BENCH_CONFIG["phase_seconds"])
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    if len(latencies) < 2:
+        print(f"{name:>10} {len(latencies):>8} {len(errors):>7}   (too few successful requests)")
+        return
+    percentiles = statistics.quantiles(latencies, n=100)
+    succeeded = [upload for upload in uploads if upload["state"] == "succeeded"]
+    print(
+        f"{name:>10} {len(latencies):>8} {len(errors):>7} {len(latencies) / BENCH_CONFIG['phase_seconds']:>8.1f}"
+        f" {percentiles[49]:>8.1f} {percentiles[94]:>8.1f} {percentiles[98]:>8.1f} {max(latencies):>8.1f}"
+        f" {len(succeeded):>8} {sum(upload['rows'] for upload in succeeded):>9}"
+    )
+    failed = len(uploads) - len(succeeded)
+    if failed:
+        print(f"{'':>10} {failed} uploads failed: {sorted({upload['state'] for upload in uploads} - {'succeeded'})}")
+
+
+def run_benchmark():
+    base_url = (sys.argv[1] if len(sys.argv) > 1 else BENCH_CONFIG["base_url"]).rstrip("/")
+    raw_data_id = sys.argv[2] if len(sys.argv) > 2 else None
+    if raw_data_id is None:
+        items = get_json(f"{base_url}/raw-data?limit=1")["items"]
+        if not items:
+            print("No imports to review yet; upload a discharge list first.")
+            sys.exit(1)
+        raw_data_id = items[0]["raw_data_id"]
+    import_type_id = get_json(f"{base_url}/import-types")[0]["id"]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "load-test.pdf")
+        write_discharge_pdf(path, BENCH_CONFIG["upload_pages"])
+        with open(path, "rb") as pdf_file:
+            template = pdf_file.read()
+
+    print(
+        f"{base_url}: {BENCH_CONFIG['reviewers']} reviewers on raw_data_id {raw_data_id}, "
+        f"{BENCH_CONFIG['uploaders']} uploaders of {BENCH_CONFIG['upload_pages']}-page PDFs, "
+        f"{BENCH_CONFIG['phase_seconds']} s per phase"
+    )
+    print(
+        f"{'phase':>10} {'requests':>8} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        f" {'max ms':>8} {'uploads':>8} {'rows':>9}"
+    )
+    run_phase("idle", base_url, raw_data_id)
+    run_phase("uploading", base_url, raw_data_id, import_type_id, template)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,88 @@
+import logging
+import sys
+import time
+import psycopg
+from db import DB_CONFIG
+from api_common import copy_temporary_discharge_rows, session_user_id
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Row counts to benchmark
+ROW_COUNTS = [100, 10_000, 100_000]
+
+
+def make_records(count):
+    """Build synthetic records shaped like the output of parse_text_to_structured_data."""
+    return [
+        {
+            "name": f"Patient {i}",
+            "epic_id": f"EP{100000 + i}",
+            "phone_number": f"404-555-{i % 10000:04d}",
+            "attending_physician": "Dr. Smith",
+            "date": "01-15-2024",
+            "primary_care_provider": "Dr. Jones",
+            "insurance": "Medicare",
+            "disposition": "Home",
+            "hospital": "Sacred Heart Hospital",
+        }
+        for i in range(count)
+    ]
+
+
+def insert_row_by_row(cursor, records):
+    """The previous insert path: one INSERT statement per parsed record."""
+    for record in records:
+        cursor.execute(
+            """
+            INSERT INTO TemporaryDischarge (
+                name, epic_id, phone_number, attending_physician, date,
+                primary_care_provider, insurance, disposition, raw_data_id,
+                status, created_by, updated_by, hospital_name
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, 'Pending', %s, %s, %s);
+            """,
+            (
+                record["name"], record["epic_id"], record["phone_number"],
+                record["attending_physician"], record["date"], record["primary_care_provider"],
+                record["insurance"], record["disposition"], None,
+                session_user_id, session_user_id, record["hospital"]
+            ),
+        )
+
+
+def insert_with_copy(cursor, records):
+    """The current insert path: a single COPY FROM STDIN."""
+    copy_temporary_discharge_rows(cursor, records, None)
+
+
+def time_insert(insert_fn, records):
+    """
+    Time one insert strategy inside a transaction that is rolled back afterwards,
+    so the benchmark leaves no rows behind.
+    """
+    with psycopg.connect(**DB_CONFIG) as conn:
+        with conn.cursor() as cursor:
+            start = time.perf_counter()
+            insert_fn(cursor, records)
+            elapsed = time.perf_counter() - start
+        conn.rollback()
+    return elapsed
+
+
+def run_benchmark():
+    """Compare row-by-row INSERTs with COPY for each configured row count."""
+    try:
+        print(f"{'rows':>10} {'row-by-row (s)':>16} {'copy (s)':>10} {'speedup':>9}")
+        for count in ROW_COUNTS:
+            records = make_records(count)
+            row_by_row = time_insert(insert_row_by_row, records)
+            copy = time_insert(insert_with_copy, records)
+            print(f"{count:>10} {row_by_row:>16.3f} {copy:>10.3f} {row_by_row / copy:>8.1f}x")
+    except psycopg.OperationalError as e:
+        logging.error(f"Operational error running benchmark: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,53 @@
+import random
+import time
+from discharge_parser import DISPOSITION_LIST, INSURANCE_LIST
+from vocabulary_matcher import VocabularyMatcher
+
+# Vocabulary sizes to benchmark
+VOCABULARY_SIZES = [len(INSURANCE_LIST), 100, 500, 1000]
+DETAIL_COUNT = 100_000
+
+
+def make_vocabulary(rng, size):
+    """The real insurance list padded with synthetic payer names up to size terms."""
+    terms = list(INSURANCE_LIST)
+    while len(terms) < size:
+        terms.append(f"{rng.choice(['Blue', 'First', 'United', 'Pacific', 'Liberty'])} Health Plan {len(terms)}")
+    return terms
+
+
+def list_scan(terms, text):
+    """The previous lookup: first term in list order that is a substring."""
+    for term in terms:
+        if term in text:
+            return term
+    return None
+
+
+def run_benchmark():
+    """Time list scanning against the automaton as the vocabulary grows."""
+    rng = random.Random(42)
+    print(f"{'terms':>8} {'list scan (s)':>15} {'automaton (s)':>15}")
+    for size in VOCABULARY_SIZES:
+        terms = make_vocabulary(rng, size)
+        matcher = VocabularyMatcher(terms)
+        details = [
+            f"Bailey, Miranda MD {rng.choice(terms)} {rng.choice(DISPOSITION_LIST)}"
+            for _ in range(DETAIL_COUNT)
+        ]
+
+        start = time.perf_counter()
+        for text in details:
+            list_scan(terms, text)
+        scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for text in details:
+            matcher.find_longest(text)
+        automaton = time.perf_counter() - start
+
+        print(f"{size:>8} {scan:>15.3f} {automaton:>15.3f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
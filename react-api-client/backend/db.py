@@ -0,0 +1,158 @@
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from threading import Lock
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Database connection configuration
+DB_CONFIG = {
+    "dbname": "my_database",
+    "user": "app_user",
+    "password": "securepassword",
+    "host": "localhost",
+    "port": "5432",
+}
+
+# Connection pool configuration
+DB_POOL_CONFIG = {
+    "min_size": 2,  # Connections kept open even when idle
+    "max_size": 10,  # Keep well below the server's max_connections
+    "timeout": 30,  # Seconds a request waits for a free connection before failing
+    "max_idle": 300,  # Seconds an idle connection above min_size is kept
+    "max_lifetime": 3600,  # Seconds before a connection is recycled
+}
+
+# Process-wide pool shared by every route. Connections are health-checked on checkout.
+pool = ConnectionPool(
+    kwargs=DB_CONFIG,
+    min_size=DB_POOL_CONFIG["min_size"],
+    max_size=DB_POOL_CONFIG["max_size"],
+    timeout=DB_POOL_CONFIG["timeout"],
+    max_idle=DB_POOL_CONFIG["max_idle"],
+    max_lifetime=DB_POOL_CONFIG["max_lifetime"],
+    check=ConnectionPool.check_connection,
+    name="app-pool",
+    open=False,
+)
+
+# Pool of psycopg.AsyncConnection used by the ASGI app (asgi_app.py). It is bound to an
+# event loop, so it is created by open_async_pool() on the loop that serves requests.
+async_pool = None
+
+# Checkout latency counters (milliseconds)
+_checkout_stats_lock = Lock()
+_checkout_stats = {"checkouts": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+
+def open_pool():
+    """
+    Open the shared pool. Connections are established in the background so the
+    app can start before the database is reachable.
+    """
+    pool.open(wait=False)
+    logger.info(
+        f"Database pool opened (min_size={DB_POOL_CONFIG['min_size']}, max_size={DB_POOL_CONFIG['max_size']})."
+    )
+
+
+def close_pool():
+    """Close the shared pool and all of its connections."""
+    pool.close()
+    logger.info("Database pool closed.")
+
+
+async def open_async_pool():
+    """
+    Create and open the async pool on the running event loop, sized by DB_POOL_CONFIG
+    like the sync pool. As with open_pool(), connections are established in the background.
+    """
+    global async_pool
+    async_pool = AsyncConnectionPool(
+        kwargs=DB_CONFIG,
+        min_size=DB_POOL_CONFIG["min_size"],
+        max_size=DB_POOL_CONFIG["max_size"],
+        timeout=DB_POOL_CONFIG["timeout"],
+        max_idle=DB_POOL_CONFIG["max_idle"],
+        max_lifetime=DB_POOL_CONFIG["max_lifetime"],
+        check=AsyncConnectionPool.check_connection,
+        name="app-async-pool",
+        open=False,
+    )
+    await async_pool.open(wait=False)
+    logger.info(
+        f"Async database pool opened (min_size={DB_POOL_CONFIG['min_size']}, max_size={DB_POOL_CONFIG['max_size']})."
+    )
+
+
+async def close_async_pool():
+    """Close the async pool and all of its connections."""
+    if async_pool is not None:
+        await async_pool.close()
+        logger.info("Async database pool closed.")
+
+
+def _record_checkout(start):
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    with _checkout_stats_lock:
+        _checkout_stats["checkouts"] += 1
+        _checkout_stats["total_ms"] += elapsed_ms
+        _checkout_stats["max_ms"] = max(_checkout_stats["max_ms"], elapsed_ms)
+
+
+@contextmanager
+def get_connection():
+    """
+    Check a connection out of the shared pool for the duration of a request.
+    The transaction is committed on a clean exit and rolled back on error,
+    the same as `with psycopg.connect(...)`.
+    """
+    start = time.perf_counter()
+    with pool.connection() as conn:
+        _record_checkout(start)
+        yield conn
+
+
+@asynccontextmanager
+async def get_async_connection():
+    """
+    The async counterpart of get_connection(): check a psycopg.AsyncConnection out of
+    the async pool, committing on a clean exit and rolling back on error.
+    """
+    start = time.perf_counter()
+    async with async_pool.connection() as conn:
+        _record_checkout(start)
+        yield conn
+
+
+def get_pool_stats(connection_pool=None):
+    """
+    Return a snapshot of pool usage: size, in-use and waiting counts, and checkout latency.
+    Reports the sync pool unless connection_pool (e.g. async_pool) is given.
+    """
+    if connection_pool is None:
+        connection_pool = pool
+    stats = connection_pool.get_stats()
+    pool_size = stats.get("pool_size", 0)
+    pool_available = stats.get("pool_available", 0)
+
+    with _checkout_stats_lock:
+        checkouts = _checkout_stats["checkouts"]
+        total_ms = _checkout_stats["total_ms"]
+        max_ms = _checkout_stats["max_ms"]
+
+    return {
+        "min_size": connection_pool.min_size,
+        "max_size": connection_pool.max_size,
+        "pool_size": pool_size,
+        "available": pool_available,
+        "in_use": pool_size - pool_available,
+        "waiting": stats.get("requests_waiting", 0),
+        "requests_queued": stats.get("requests_queued", 0),
+        "requests_errors": stats.get("requests_errors", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+        "checkouts": checkouts,
+        "checkout_avg_ms": round(total_ms / checkouts, 3) if checkouts else 0.0,
+        "checkout_max_ms": round(max_ms, 3),
+    }
@@ -0,0 +1,213 @@
+import logging
+import re
+from vocabulary_matcher import VocabularyMatcher
+
+logger = logging.getLogger(__name__)
+
+# Predefined lists for insurance and disposition types
+DISPOSITION_LIST = [
+    "Home", "HHS", "SNF", "Home with Follow-up", "Home Health Care (HHC)", "Rehabilitation Facility (Rehab)",
+    "Hospice", "Acute Care Hospital", "Observation", "ICU", "ICU Stepdown", "Psychiatric Facility",
+    "Transfer to Another Hospital", "Emergency Department (ED)", "No Follow-Up Needed", "AMA (Against Medical Advice)"
+]
+
+INSURANCE_LIST = [
+    "BCBS", "Aetna Health", "Self Pay", "Humana Health", "Medicare", "Medicaid", "United Healthcare",
+    "Cigna", "Anthem", "Tricare", "Blue Shield", "Kaiser Permanente", "No Insurance"
+]
+
+# Vocabulary automatons, built once at import time. Add new payers and dispositions
+# to the lists above; lookup cost does not grow with the list size.
+INSURANCE_MATCHER = VocabularyMatcher(INSURANCE_LIST)
+DISPOSITION_MATCHER = VocabularyMatcher(DISPOSITION_LIST)
+
+# Patterns are compiled once at import time
+PHONE_NUMBER_PATTERN = r"\(?\d{3}\)?[-\s]?\d{3}[-\s]?\d{4}"
+PHONE_NUMBER_RE = re.compile(PHONE_NUMBER_PATTERN)
+EPIC_ID_RE = re.compile(r"EP\d+")
+DATE_RE = re.compile(r"\d{2}-\d{2}-\d{4}")
+# Phone number following an Epic Id (make dashes and parentheses optional)
+EPIC_PHONE_RE = re.compile(r"EP\d+\s+(\(?\d{3}\)?[-\s]?\d{3}[-\s]?\d{4}|\d{10})")
+# Phone number at the start of the whitespace run that follows the Epic Id
+LEADING_PHONE_RE = re.compile(r"\s+(\(?\d{3}\)?[-\s]?\d{3}[-\s]?\d{4}|\d{10})")
+
+# A well-formed row in one match:
+#   <name> <epic id> <attending physician, possibly led by a phone number> <date><remaining details>
+ROW_RE = re.compile(
+    r"(?P<name>.*?)(?P<epic_id>\bEP\d+)\s(?P<middle>.*?)\s(?P<date>\d{2}-\d{2}-\d{4})(?P<rest>.*)"
+)
+
+
+def remove_phone_number(text):
+    """
+    Remove any phone number from a given string.
+    Matches phone numbers in formats like:
+    - 404-727-1234
+    - (404) 727-1234
+    - 404 727 1234
+    - 4047271234
+    """
+    # Replace phone number with an empty string
+    return PHONE_NUMBER_RE.sub("", text).strip()
+
+
+def parse_text_to_structured_data(text):
+    """
+    Parse extracted text into structured JSON data based on the table format.
+    """
+    data = list(iter_structured_data(text.split("\n")))
+    logger.info(f"Total records parsed: {len(data)}")
+    return data
+
+
+def iter_structured_data(lines):
+    """
+    Lazily parse lines of extracted text into structured records, yielding each
+    record as soon as its line arrives.
+    The first non-empty line is the title and the line after it is the header.
+    """
+    lines = iter(lines)
+
+    # The first line is the title
+    title = next((line.strip() for line in lines if line.strip()), None)
+    if title is None:
+        return
+
+    #Get hospital name
+    hospital_name = title.split("Discharges")[0].strip()
+
+    # The second line is the header; we don't need to parse it
+    next(lines, None)
+
+    # Process each row of the table (starting from the 3rd line)
+    for line in lines:
+        entry = parse_discharge_line(line, hospital_name)
+        if entry:
+            yield entry
+
+
+def _match_vocabulary(remaining_details):
+    """
+    Pick the insurance and disposition out of the text after the date and return
+    (insurance, disposition, primary_care_provider). The longest matching term wins,
+    so "Home with Follow-up" is found rather than "Home".
+    """
+    insurance = INSURANCE_MATCHER.find_longest(remaining_details) or "Unknown"
+    if insurance != "Unknown":
+        remaining_details = remaining_details.replace(insurance, "").strip()
+
+    disposition = DISPOSITION_MATCHER.find_longest(remaining_details) or "Unknown"
+    if disposition != "Unknown":
+        remaining_details = remaining_details.replace(disposition, "").strip()
+
+    # Whatever is left after the date is the Primary Care Provider
+    return insurance, disposition, remaining_details.strip()
+
+
+def parse_discharge_line(line, hospital_name):
+    """
+    Parse one row of the discharge table. Returns None for lines that are not discharge rows.
+
+    Well-formed rows are split by a single precompiled ROW_RE match. Rows the fast
+    path cannot prove it reads the same way as the field-by-field parser (an "EP"
+    in the name, a date before the discharge date, no phone right after the Epic
+    Id, ...) go through _parse_discharge_line_fallback instead.
+    """
+    line = line.strip()
+
+    # Skip empty lines
+    if not line:
+        return None
+
+    row = ROW_RE.match(line)
+    if row is None:
+        return _parse_discharge_line_fallback(line, hospital_name)
+
+    name = row.group("name")
+    date_start = row.start("date")
+    # The Epic Id must be the first one on the line and the date the first date
+    if "EP" in name or DATE_RE.search(line, 0, date_start - 1):
+        return _parse_discharge_line_fallback(line, hospital_name)
+
+    epic_id_end = row.end("epic_id")
+    phone_match = LEADING_PHONE_RE.match(line, epic_id_end)
+    if phone_match is None:
+        # A phone number may still follow a later "EP..." token
+        phone_match = EPIC_PHONE_RE.search(line, epic_id_end)
+    phone_number = phone_match.group(1) if phone_match else ""
+
+    # Details end at the next repeat of the date, if any
+    date = row.group("date")
+    remaining_details = row.group("rest")
+    repeat = remaining_details.find(date)
+    if repeat >= 0:
+        remaining_details = remaining_details[:repeat]
+    remaining_details = remaining_details.strip()
+
+    # Remove the phone number from the remaining details (if it's there)
+    if phone_number:
+        remaining_details = remaining_details.replace(phone_number, "").strip()
+
+    insurance, disposition, primary_care_provider = _match_vocabulary(remaining_details)
+
+    return {
+        "name": name.strip(),
+        "epic_id": row.group("epic_id"),
+        "phone_number": phone_number,
+        "attending_physician": remove_phone_number(row.group("middle").strip()),
+        "date": date,
+        "primary_care_provider": primary_care_provider,
+        "insurance": insurance,
+        "disposition": disposition,
+        "hospital": hospital_name
+    }
+
+
+def _parse_discharge_line_fallback(line, hospital_name):
+    """
+    Field-by-field parser for rows that do not fit ROW_RE. This is the original
+    field extraction logic and is the reference the fast path must agree with.
+    """
+    # Extract Epic Id (EP followed by numbers)
+    epic_id_match = EPIC_ID_RE.search(line)
+    date_match = DATE_RE.search(line)
+
+    if not (epic_id_match and date_match):
+        return None
+
+    # Match for phone numbers with or without dashes/parentheses
+    phone_match = EPIC_PHONE_RE.search(line)
+
+    epic_id = epic_id_match.group(0)
+    date = date_match.group(0)
+    phone_number = phone_match.group(1) if phone_match else ""
+
+    # Extract the part before the epic id as the name
+    name = line.split(epic_id)[0].strip()
+
+    # Extract the part after the date as the remaining details
+    remaining_details = line.split(date)[1].strip()
+
+    # Remove the phone number from the remaining details (if it's there)
+    if phone_number:
+        remaining_details = remaining_details.replace(phone_number, "").strip()
+
+    insurance, disposition, primary_care_provider = _match_vocabulary(remaining_details)
+
+    # Extract the attending physician from the middle part (between epic_id and date), excluding the phone number
+    attending_physician = ""
+    attending_physician_match = re.search(r"(?<=\b" + re.escape(epic_id) + r"\s)(.*?)(?=\s" + re.escape(date) + r")", line)
+    if attending_physician_match:
+        attending_physician = remove_phone_number(attending_physician_match.group(0).strip())
+
+    return {
+        "name": name,
+        "epic_id": epic_id,
+        "phone_number": phone_number,
+        "attending_physician": attending_physician,
+        "date": date,
+        "primary_care_provider": primary_care_provider,
+        "insurance": insurance,
+        "disposition": disposition,
+        "hospital": hospital_name
+    }
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import zlib
+from db import get_connection, get_async_connection
+
+logger = logging.getLogger(__name__)
+
+# Raw document storage configuration
+DOCUMENT_STORE_CONFIG = {
+    "compression_level": 6,  # zlib level used when storing new documents
+    "read_chunk_size": 256 * 1024,  # Stored bytes fetched per round trip when streaming a document
+}
+
+COMPRESSION_ZLIB = "zlib"
+COMPRESSION_NONE = "none"  # Used when zlib does not make the document smaller
+
+
+class StoredDocumentInfo:
+    """
+    Metadata of a stored document: its hash, original size, stored (compressed) size,
+    compression and content type.
+    """
+
+    def __init__(self, content_hash, size, stored_size, compression, content_type):
+        self.content_hash = content_hash
+        self.size = size
+        self.stored_size = stored_size
+        self.compression = compression
+        self.content_type = content_type
+
+
+def _compress_document(document):
+    """
+    Compress an UploadedDocument chunk by chunk. Returns (stored_bytes, compression);
+    the original bytes are kept when compressing does not save space.
+    """
+    compressor = zlib.compressobj(DOCUMENT_STORE_CONFIG["compression_level"])
+    parts = [compressor.compress(chunk) for chunk in document.iter_chunks()]
+    parts.append(compressor.flush())
+    compressed_size = sum(len(part) for part in parts)
+
+    if compressed_size >= document.size:
+        return document.read_bytes(), COMPRESSION_NONE
+    return b''.join(parts), COMPRESSION_ZLIB
+
+
+EXISTS_SQL = "SELECT 1 FROM RawDocument WHERE content_hash = %s"
+
+INSERT_SQL = """
+    INSERT INTO RawDocument (content_hash, content_size, stored_size, compression, content_type, stored_content)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON CONFLICT (content_hash) DO NOTHING;
+"""
+
+INFO_SQL = """
+    SELECT content_hash, content_size, stored_size, compression, content_type
+    FROM RawDocument
+    WHERE content_hash = %s
+"""
+
+# stored_content uses STORAGE EXTERNAL, so substring only reads the TOAST chunks it needs
+READ_CHUNK_SQL = "SELECT substring(stored_content FROM %s::int FOR %s::int) FROM RawDocument WHERE content_hash = %s"
+
+
+def _log_stored(document, stored_content, compression):
+    logger.info(
+        f"Stored document {document.content_hash}: {document.size} bytes as "
+        f"{len(stored_content)} bytes ({compression})."
+    )
+
+
+def store_document(cursor, document, content_type="application/pdf"):
+    """
+    Store an UploadedDocument in RawDocument under its content hash, in the caller's
+    transaction. Content that is already stored is not compressed or written again.
+    Returns True if a new document was written.
+    """
+    cursor.execute(EXISTS_SQL, (document.content_hash,))
+    if cursor.fetchone() is not None:
+        logger.info(f"Document {document.content_hash} is already stored.")
+        return False
+
+    stored_content, compression = _compress_document(document)
+    cursor.execute(
+        INSERT_SQL,
+        (document.content_hash, document.size, len(stored_content), compression, content_type, stored_content)
+    )
+    _log_stored(document, stored_content, compression)
+    return cursor.rowcount == 1
+
+
+async def store_document_async(cursor, document, content_type="application/pdf"):
+    """
+    The async counterpart of store_document(), on a psycopg.AsyncCursor. Compression
+    runs in a worker thread so it does not hold up the event loop.
+    """
+    await cursor.execute(EXISTS_SQL, (document.content_hash,))
+    if await cursor.fetchone() is not None:
+        logger.info(f"Document {document.content_hash} is already stored.")
+        return False
+
+    stored_content, compression = await asyncio.to_thread(_compress_document, document)
+    await cursor.execute(
+        INSERT_SQL,
+        (document.content_hash, document.size, len(stored_content), compression, content_type, stored_content)
+    )
+    _log_stored(document, stored_content, compression)
+    return cursor.rowcount == 1
+
+
+def get_document_info(cursor, content_hash):
+    """
+    Return the StoredDocumentInfo for content_hash, or None. Does not read the content.
+    """
+    cursor.execute(INFO_SQL, (content_hash,))
+    row = cursor.fetchone()
+    return StoredDocumentInfo(*row) if row else None
+
+
+async def get_document_info_async(cursor, content_hash):
+    """The async counterpart of get_document_info(), on a psycopg.AsyncCursor."""
+    await cursor.execute(INFO_SQL, (content_hash,))
+    row = await cursor.fetchone()
+    return StoredDocumentInfo(*row) if row else None
+
+
+class _StoredContentReader:
+    """
+    Reads the original bytes [start, end) of a stored document one stored chunk at a
+    time: next_read() gives the substring to fetch next and feed() takes the fetched
+    chunk and returns the part of it to send. Compressed documents are decompressed
+    from the beginning and reading stops as soon as `end` is reached.
+    """
+
+    def __init__(self, info, start, end, chunk_size):
+        self.chunk_size = chunk_size or DOCUMENT_STORE_CONFIG["read_chunk_size"]
+        self.start = start
+        self.end = info.size if end is None else min(end, info.size)
+        self.decompressor = zlib.decompressobj() if info.compression == COMPRESSION_ZLIB else None
+        # Uncompressed content can be read from the requested offset directly
+        self.offset, self.stop = (0, info.stored_size) if self.decompressor else (start, self.end)
+        self.position = self.offset  # Original-document offset of the next decompressed byte
+
+    def next_read(self):
+        """Return the (1-based offset, length) of the next stored chunk, or None when done."""
+        if self.start >= self.end or self.offset >= self.stop or self.position >= self.end:
+            return None
+        return self.offset + 1, min(self.chunk_size, self.stop - self.offset)
+
+    def feed(self, chunk):
+        """Take the stored chunk just fetched; return its bytes inside [start, end)."""
+        self.offset += self.chunk_size
+        if self.decompressor:
+            chunk = self.decompressor.decompress(chunk)
+            if self.offset >= self.stop:
+                chunk += self.decompressor.flush()
+
+        chunk_start = self.position
+        self.position += len(chunk)
+        if self.position > self.start and chunk_start < self.end:
+            return chunk[max(self.start - chunk_start, 0):self.end - chunk_start]
+        return b''
+
+
+def iter_stored_document(info, start=0, end=None, chunk_size=None):
+    """
+    Yield the original bytes [start, end) of the document described by info.
+    The stored content is fetched chunk_size bytes per query on a connection held
+    only while iterating, so neither the database nor this process holds the whole
+    document at once. Compressed documents are decompressed from the beginning and
+    reading stops as soon as `end` is reached.
+    """
+    reader = _StoredContentReader(info, start, end, chunk_size)
+    if reader.next_read() is None:
+        return
+
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            while (read := reader.next_read()) is not None:
+                cursor.execute(READ_CHUNK_SQL, (*read, info.content_hash))
+                piece = reader.feed(cursor.fetchone()[0])
+                if piece:
+                    yield piece
+
+
+async def aiter_stored_document(info, start=0, end=None, chunk_size=None):
+    """
+    The async counterpart of iter_stored_document(), reading on a connection from the
+    async pool. Decompression runs in a worker thread.
+    """
+    reader = _StoredContentReader(info, start, end, chunk_size)
+    if reader.next_read() is None:
+        return
+
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cursor:
+            while (read := reader.next_read()) is not None:
+                await cursor.execute(READ_CHUNK_SQL, (*read, info.content_hash))
+                row = await cursor.fetchone()
+                piece = await asyncio.to_thread(reader.feed, row[0])
+                if piece:
+                    yield piece
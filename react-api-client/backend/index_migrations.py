@@ -0,0 +1,174 @@
+import logging
+import sys
+import psycopg
+from psycopg import sql
+from db import DB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Versioned index migrations. Each index is (name, table, column list); "unique" builds
+# them as unique indexes and "drop_indexes" lists indexes they make redundant. Append
+# new versions; never edit one that may already have been applied somewhere.
+INDEX_MIGRATIONS = [
+    {
+        "version": 1,
+        "description": "Hot lookup indexes and audit foreign key indexes",
+        "indexes": [
+            # Enrichment rows of a discharge (review, edit, approval, enrichment upsert)
+            ("idx_temporaryenrichmentdata_tempdischarge_type", "TemporaryEnrichmentData", "temp_discharge_id, enrichment_type_id"),
+            # Natural-key lookups in f_approve_discharge (Epic.epic_identifier already has a unique index)
+            ("idx_patient_full_name", "Patient", "full_name"),
+            ("idx_provider_name", "Provider", "name"),
+            ("idx_insurance_insurance_name", "Insurance", "insurance_name"),
+            ("idx_hospital_hospital_name", "Hospital", "hospital_name"),
+            ("idx_providerprovidertype_provider_type", "ProviderProviderType", "provider_id, provider_type_id"),
+            ("idx_dischargeprovider_discharge_ppt", "DischargeProvider", "discharge_id, provider_provider_type_id"),
+            ("idx_patientphone_patient_phone", "PatientPhone", "patient_id, phone_number"),
+            ("idx_epichospital_epic_hospital", "EpicHospital", "epic_id, hospital_id"),
+            ("idx_epicinsurance_epic", "EpicInsurance", "epic_id"),
+            ("idx_discharge_epic", "Discharge", "epic_id"),
+            # Audit tables: lookups by audited row and the FK checks on parent deletes
+            ("idx_temporarydischargeaudit_temp_discharge_id", "TemporaryDischargeAudit", "temp_discharge_id"),
+            ("idx_temporarydischargeaudit_changed_by", "TemporaryDischargeAudit", "changed_by"),
+            ("idx_temporaryenrichmentdataaudit_enrichment_data_id", "TemporaryEnrichmentDataAudit", "enrichment_data_id"),
+            ("idx_temporaryenrichmentdataaudit_changed_by", "TemporaryEnrichmentDataAudit", "changed_by"),
+            ("idx_rawdataingestedaudit_raw_data_id", "RawDataIngestedAudit", "raw_data_id"),
+            ("idx_rawdataingestedaudit_action_user", "RawDataIngestedAudit", "action_user"),
+        ],
+    },
+    {
+        "version": 2,
+        "description": "Unique natural keys for set-based approval",
+        # Conflict targets of the upserts in f_approve_discharges. On an existing database,
+        # duplicates created by earlier approvals must be merged first or the build fails.
+        "unique": True,
+        "indexes": [
+            ("uq_patient_full_name", "Patient", "full_name"),
+            ("uq_provider_name", "Provider", "name"),
+            ("uq_insurance_insurance_name", "Insurance", "insurance_name"),
+            ("uq_hospital_hospital_name", "Hospital", "hospital_name"),
+            ("uq_providerprovidertype_provider_type", "ProviderProviderType", "provider_id, provider_type_id"),
+            ("uq_dischargeprovider_discharge_ppt", "DischargeProvider", "discharge_id, provider_provider_type_id"),
+            ("uq_patientphone_patient_phone", "PatientPhone", "patient_id, phone_number"),
+            ("uq_epicinsurance_epic_insurance", "EpicInsurance", "epic_id, insurance_id"),
+            ("uq_epichospital_epic_hospital", "EpicHospital", "epic_id, hospital_id"),
+        ],
+        "drop_indexes": [
+            "idx_patient_full_name",
+            "idx_provider_name",
+            "idx_insurance_insurance_name",
+            "idx_hospital_hospital_name",
+            "idx_providerprovidertype_provider_type",
+            "idx_dischargeprovider_discharge_ppt",
+            "idx_patientphone_patient_phone",
+            "idx_epicinsurance_epic",
+            "idx_epichospital_epic_hospital",
+        ],
+    },
+    {
+        "version": 3,
+        "description": "One enrichment value per discharge and enrichment type",
+        # Conflict target of the enrichment upsert in update_discharge
+        "unique": True,
+        "indexes": [
+            ("uq_temporaryenrichmentdata_tempdischarge_type", "TemporaryEnrichmentData", "temp_discharge_id, enrichment_type_id"),
+        ],
+        "drop_indexes": [
+            "idx_temporaryenrichmentdata_tempdischarge_type",
+        ],
+    },
+]
+
+SCHEMA_MIGRATION_SQL = """
+CREATE TABLE IF NOT EXISTS SchemaMigration (
+    version INTEGER,
+    description VARCHAR NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT pk_schemamigration PRIMARY KEY (version)
+);
+"""
+
+
+def _create_index_statement(name, table, columns, concurrently, unique=False):
+    return sql.SQL("CREATE {unique}INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({columns})").format(
+        unique=sql.SQL("UNIQUE " if unique else ""),
+        concurrently=sql.SQL("CONCURRENTLY " if concurrently else ""),
+        name=sql.Identifier(name.lower()),
+        table=sql.Identifier(table.lower()),
+        columns=sql.SQL(", ").join(sql.Identifier(column.strip()) for column in columns.split(",")),
+    )
+
+
+def _drop_invalid_index(cursor, name):
+    """
+    Drop an index left INVALID by an interrupted CREATE INDEX CONCURRENTLY, since
+    IF NOT EXISTS would otherwise skip it. Returns True if one was dropped.
+    """
+    cursor.execute(
+        """
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s AND NOT i.indisvalid
+        """,
+        (name.lower(),)
+    )
+    if cursor.fetchone() is None:
+        return False
+    logger.warning(f"Dropping invalid index {name} left by an interrupted build.")
+    cursor.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {name}").format(name=sql.Identifier(name.lower())))
+    return True
+
+
+def apply_index_migrations(conn, concurrently=True):
+    """
+    Apply the INDEX_MIGRATIONS not yet recorded in SchemaMigration, in version order.
+
+    With concurrently=True (for a live database) indexes are built with
+    CREATE INDEX CONCURRENTLY, which does not block writes; conn must then be in
+    autocommit mode, since concurrent builds cannot run inside a transaction.
+    With concurrently=False (init_db.py) everything runs in the caller's transaction.
+    Returns the list of versions applied.
+    """
+    if concurrently and not conn.autocommit:
+        raise ValueError("Concurrent index builds need an autocommit connection")
+
+    applied = []
+    with conn.cursor() as cursor:
+        cursor.execute(SCHEMA_MIGRATION_SQL)
+        cursor.execute("SELECT version FROM SchemaMigration")
+        done = {row[0] for row in cursor.fetchall()}
+
+        for migration in sorted(INDEX_MIGRATIONS, key=lambda m: m["version"]):
+            if migration["version"] in done:
+                continue
+            logger.info(f"Applying index migration {migration['version']}: {migration['description']}")
+            for name, table, columns in migration["indexes"]:
+                if concurrently:
+                    _drop_invalid_index(cursor, name)
+                cursor.execute(_create_index_statement(name, table, columns, concurrently, migration.get("unique", False)))
+                logger.info(f"Index {name} on {table} ({columns}) is in place.")
+            for name in migration.get("drop_indexes", []):
+                cursor.execute(sql.SQL("DROP INDEX {concurrently}IF EXISTS {name}").format(
+                    concurrently=sql.SQL("CONCURRENTLY " if concurrently else ""),
+                    name=sql.Identifier(name.lower()),
+                ))
+                logger.info(f"Index {name} dropped.")
+            cursor.execute(
+                "INSERT INTO SchemaMigration (version, description) VALUES (%s, %s)",
+                (migration["version"], migration["description"])
+            )
+            applied.append(migration["version"])
+
+    return applied
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        with psycopg.connect(**DB_CONFIG, autocommit=True) as connection:
+            versions = apply_index_migrations(connection, concurrently=True)
+    except Exception as e:
+        logger.error(f"Index migration failed: {e}")
+        sys.exit(1)
+    print(f"Applied index migrations: {versions}" if versions else "Indexes are up to date.")
@@ -1,6 +1,8 @@
 import psycopg
 from psycopg import sql
 import sys
+from index_migrations import apply_index_migrations
+from audit_partitions import create_audit_partitions
 
 # Configuration
 SUPERUSER_DB = "postgres"
@@ -26,11 +28,39 @@ ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL PRIVILEGES ON TABLES TO app_
 ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL PRIVILEGES ON SEQUENCES TO app_user;
 """
 
+# audit_partitions.py runs as the application user: creating, detaching and dropping
+# partitions needs CREATE on the schema and ownership of the audit tables and their partitions
+AUDIT_OWNERSHIP_SQL = """
+GRANT USAGE, CREATE ON SCHEMA public TO app_user;
+
+DO $$
+DECLARE
+    tv_table REGCLASS;
+BEGIN
+    FOR tv_table IN
+        SELECT c.oid::REGCLASS
+        FROM pg_class c
+        WHERE c.oid IN ('TemporaryDischargeAudit'::REGCLASS, 'TemporaryEnrichmentDataAudit'::REGCLASS, 'RawDataIngestedAudit'::REGCLASS)
+           OR c.oid IN (
+               SELECT i.inhrelid
+               FROM pg_inherits i
+               WHERE i.inhparent IN ('TemporaryDischargeAudit'::REGCLASS, 'TemporaryEnrichmentDataAudit'::REGCLASS, 'RawDataIngestedAudit'::REGCLASS)
+           )
+    LOOP
+        EXECUTE format('ALTER TABLE %s OWNER TO app_user', tv_table);
+    END LOOP;
+END;
+$$;
+"""
+
 # SQL for schema and table creation with UUID defaults
 SCHEMA_SQL = """
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Enable trigram indexes (substring search on file names)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- AppUser Table
 CREATE TABLE IF NOT EXISTS AppUser (
     app_user_id UUID DEFAULT uuid_generate_v4(),
@@ -107,17 +137,37 @@ CREATE TABLE IF NOT EXISTS ImportType (
     CONSTRAINT pk_importtype PRIMARY KEY (import_type_id)
 );
 
+-- RawDocument Table: uploaded files, stored once per content hash
+CREATE TABLE IF NOT EXISTS RawDocument (
+    content_hash VARCHAR(64),  -- SHA-256 of the original file
+    content_size BIGINT NOT NULL,  -- Size of the original file in bytes
+    stored_size BIGINT NOT NULL,  -- Size of stored_content in bytes
+    compression VARCHAR(10) NOT NULL,  -- 'zlib' or 'none'
+    content_type VARCHAR NOT NULL DEFAULT 'application/pdf',
+    stored_content BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT pk_rawdocument PRIMARY KEY (content_hash)
+);
+
+-- Content is compressed by the application; skip TOAST compression so substring() reads only the chunks it needs
+ALTER TABLE RawDocument ALTER COLUMN stored_content SET STORAGE EXTERNAL;
+
 -- RawDataIngested Table
 CREATE TABLE IF NOT EXISTS RawDataIngested (
     raw_data_id UUID DEFAULT uuid_generate_v4(),
     source_file_name VARCHAR NOT NULL,
-    raw_content TEXT,
+    content_hash VARCHAR(64) NOT NULL,  -- SHA-256 of the uploaded file; the RawDocument holding its content
+    content_size BIGINT NOT NULL,  -- Size of the uploaded file in bytes
+    import_failed BOOLEAN NOT NULL DEFAULT FALSE,  -- Set when ingestion fails so the file can be uploaded again
     import_type_id UUID,
     created_by UUID,
     updated_by UUID,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT pk_rawdataingested PRIMARY KEY (raw_data_id),
+    CONSTRAINT fk_rawdataingested_rawdocument FOREIGN KEY (content_hash) 
+        REFERENCES RawDocument(content_hash) 
+        ON DELETE RESTRICT,
     CONSTRAINT fk_rawdataingested_importtype FOREIGN KEY (import_type_id) 
         REFERENCES ImportType(import_type_id) 
         ON DELETE SET NULL,
@@ -129,6 +179,21 @@ CREATE TABLE IF NOT EXISTS RawDataIngested (
         ON DELETE SET NULL
 );
 
+-- A document can only be imported once per import type; failed imports do not count
+CREATE UNIQUE INDEX IF NOT EXISTS uq_rawdataingested_content_hash
+    ON RawDataIngested (content_hash, import_type_id)
+    WHERE NOT import_failed;
+
+-- Keyset pagination of the file list, newest first, overall and per import type
+CREATE INDEX IF NOT EXISTS idx_rawdataingested_created_at_id
+    ON RawDataIngested (created_at DESC, raw_data_id DESC);
+CREATE INDEX IF NOT EXISTS idx_rawdataingested_importtype_created_at_id
+    ON RawDataIngested (import_type_id, created_at DESC, raw_data_id DESC);
+
+-- File name search (ILIKE '%...%') in the file list
+CREATE INDEX IF NOT EXISTS idx_rawdataingested_source_file_name_trgm
+    ON RawDataIngested USING gin (source_file_name gin_trgm_ops);
+
 -- Epic Table
 CREATE TABLE IF NOT EXISTS Epic (
     epic_id UUID DEFAULT uuid_generate_v4(),
@@ -314,14 +379,62 @@ CREATE TABLE IF NOT EXISTS TemporaryDischarge (
         ON DELETE SET NULL
 );
 
+-- Discharges of one import (review page, summary backfill)
+CREATE INDEX IF NOT EXISTS idx_temporarydischarge_raw_data_id_status
+    ON TemporaryDischarge (raw_data_id, status);
+
+-- RawDataImportSummary Table: per-import discharge counts and status for the file list. A row
+-- is created with each RawDataIngested row and kept up to date by the statement-level
+-- triggers on TemporaryDischarge
+CREATE TABLE IF NOT EXISTS RawDataImportSummary (
+    raw_data_id UUID,
+    import_created_at TIMESTAMP,  -- RawDataIngested.created_at, the file list's sort key
+    total_count INTEGER NOT NULL DEFAULT 0,
+    pending_count INTEGER NOT NULL DEFAULT 0,  -- Neither approved nor rejected
+    approved_count INTEGER NOT NULL DEFAULT 0,
+    rejected_count INTEGER NOT NULL DEFAULT 0,
+    status VARCHAR(50) GENERATED ALWAYS AS (
+        CASE
+            WHEN total_count = 0 THEN 'No discharge records found'
+            WHEN approved_count = total_count THEN 'All records reviewed'
+            ELSE 'Records still pending review'
+        END
+    ) STORED,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT pk_rawdataimportsummary PRIMARY KEY (raw_data_id),
+    CONSTRAINT fk_rawdataimportsummary_rawdata FOREIGN KEY (raw_data_id) 
+        REFERENCES RawDataIngested(raw_data_id) 
+        ON DELETE CASCADE
+);
+
+-- File list filtered by status (GET /raw-data?status=...), newest first
+CREATE INDEX IF NOT EXISTS idx_rawdataimportsummary_status_created_at_id
+    ON RawDataImportSummary (status, import_created_at DESC, raw_data_id DESC);
+
+-- Backfill summaries for imports loaded before the summary triggers existed
+INSERT INTO RawDataImportSummary (raw_data_id, import_created_at, total_count, pending_count, approved_count, rejected_count)
+SELECT
+    r.raw_data_id,
+    r.created_at,
+    COUNT(td.raw_data_id),
+    COUNT(td.raw_data_id) FILTER (WHERE td.status IS NULL OR td.status NOT IN ('Approved', 'Rejected')),
+    COUNT(td.raw_data_id) FILTER (WHERE td.status = 'Approved'),
+    COUNT(td.raw_data_id) FILTER (WHERE td.status = 'Rejected')
+FROM RawDataIngested r
+LEFT JOIN TemporaryDischarge td ON td.raw_data_id = r.raw_data_id
+GROUP BY r.raw_data_id, r.created_at
+ON CONFLICT (raw_data_id) DO NOTHING;
+
 -- EnrichmentType Table
 CREATE TABLE IF NOT EXISTS EnrichmentType (
     enrichment_type_id UUID DEFAULT uuid_generate_v4(),
     type_name VARCHAR NOT NULL,
     description TEXT,
+    value_type VARCHAR NOT NULL DEFAULT 'text',  -- 'text' or 'boolean' ('true'/'false' values)
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    CONSTRAINT pk_enrichmenttype PRIMARY KEY (enrichment_type_id)
+    CONSTRAINT pk_enrichmenttype PRIMARY KEY (enrichment_type_id),
+    CONSTRAINT ck_enrichmenttype_value_type CHECK (value_type IN ('text', 'boolean'))
 );
 
 -- TemporaryEnrichmentData Table
@@ -354,6 +467,10 @@ CREATE TABLE IF NOT EXISTS TemporaryEnrichmentData (
         ON DELETE SET NULL
 );
 
+-- Audit tables are range-partitioned by month on their timestamp. audit_partitions.py creates
+-- the upcoming monthly partitions and detaches and archives expired ones; the default
+-- partition holds any row written before its month's partition exists.
+
 -- TemporaryDischargeAudit Table
 CREATE TABLE IF NOT EXISTS TemporaryDischargeAudit (
     temporary_discharge_audit_id UUID DEFAULT uuid_generate_v4(),
@@ -363,14 +480,16 @@ CREATE TABLE IF NOT EXISTS TemporaryDischargeAudit (
     change_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     previous_value JSONB,
     new_value JSONB,
-    CONSTRAINT pk_temporarydischargeaudit PRIMARY KEY (temporary_discharge_audit_id),
+    CONSTRAINT pk_temporarydischargeaudit PRIMARY KEY (temporary_discharge_audit_id, change_timestamp),
     CONSTRAINT fk_temporarydischargeaudit_tempdischarge FOREIGN KEY (temp_discharge_id) 
         REFERENCES TemporaryDischarge(temp_discharge_id) 
         ON DELETE CASCADE,
     CONSTRAINT fk_temporarydischargeaudit_changedby FOREIGN KEY (changed_by) 
         REFERENCES AppUser(app_user_id) 
         ON DELETE RESTRICT
-);
+) PARTITION BY RANGE (change_timestamp);
+
+CREATE TABLE IF NOT EXISTS TemporaryDischargeAudit_default PARTITION OF TemporaryDischargeAudit DEFAULT;
 
 -- TemporaryEnrichmentDataAudit Table
 CREATE TABLE IF NOT EXISTS TemporaryEnrichmentDataAudit (
@@ -381,14 +500,16 @@ CREATE TABLE IF NOT EXISTS TemporaryEnrichmentDataAudit (
     change_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     previous_value JSONB,
     new_value JSONB,
-    CONSTRAINT pk_temporaryenrichmentdataaudit PRIMARY KEY (temporary_enrichment_data_audit_id),
+    CONSTRAINT pk_temporaryenrichmentdataaudit PRIMARY KEY (temporary_enrichment_data_audit_id, change_timestamp),
     CONSTRAINT fk_temporaryenrichmentdataaudit_enrichmentdata FOREIGN KEY (enrichment_data_id) 
         REFERENCES TemporaryEnrichmentData(enrichment_data_id) 
         ON DELETE CASCADE,
     CONSTRAINT fk_temporaryenrichmentdataaudit_changedby FOREIGN KEY (changed_by) 
         REFERENCES AppUser(app_user_id) 
         ON DELETE RESTRICT
-);
+) PARTITION BY RANGE (change_timestamp);
+
+CREATE TABLE IF NOT EXISTS TemporaryEnrichmentDataAudit_default PARTITION OF TemporaryEnrichmentDataAudit DEFAULT;
 
 -- RawDataIngestedAudit Table
 CREATE TABLE IF NOT EXISTS RawDataIngestedAudit (
@@ -399,14 +520,16 @@ CREATE TABLE IF NOT EXISTS RawDataIngestedAudit (
     action_user UUID NOT NULL,  -- User who made the change
     original_data JSONB,  -- Original data (if it's an update or delete)
     new_data JSONB,  -- New data (if it's an insert or update)
-    CONSTRAINT pk_rawdataingestedaudit PRIMARY KEY (raw_data_ingested_audit_id),
+    CONSTRAINT pk_rawdataingestedaudit PRIMARY KEY (raw_data_ingested_audit_id, action_timestamp),
     CONSTRAINT fk_rawdataingestedaudit_rawdata FOREIGN KEY (raw_data_id) 
         REFERENCES RawDataIngested(raw_data_id) 
         ON DELETE SET NULL,
     CONSTRAINT fk_rawdataingestedaudit_actionuser FOREIGN KEY (action_user) 
         REFERENCES AppUser(app_user_id) 
         ON DELETE RESTRICT
-);
+) PARTITION BY RANGE (action_timestamp);
+
+CREATE TABLE IF NOT EXISTS RawDataIngestedAudit_default PARTITION OF RawDataIngestedAudit DEFAULT;
 
 
 """
@@ -428,12 +551,12 @@ VALUES
 
 -- Seed data for EnrichmentType
 -- Seed script to populate EnrichmentType table with explicit UUIDs
-INSERT INTO EnrichmentType (enrichment_type_id, type_name, description)
+INSERT INTO EnrichmentType (enrichment_type_id, type_name, description, value_type)
 VALUES 
-    ('eeb9f5b4-15e3-4ac2-a4b4-5c7c7f92b717', 'Phone Validation Status', 'Indicates the status of phone validation for a given record.'),
-    ('add1ed02-dc4e-460a-b3e1-9b9a160ab2b2', 'Phone Type', 'Specifies the type of phone number (e.g., mobile, landline, etc.).'),
-    ('c8f7629d-38ec-4506-93b8-c2a9a08b3b65', 'Insurance Verified', 'Indicates whether the insurance status has been verified.'),
-    ('2a8760cb-505b-4c6f-a0b0-2a4d87fe8850', 'Provider Verified', 'Indicates whether the provider has been verified.');
+    ('eeb9f5b4-15e3-4ac2-a4b4-5c7c7f92b717', 'Phone Validation Status', 'Indicates the status of phone validation for a given record.', 'text'),
+    ('add1ed02-dc4e-460a-b3e1-9b9a160ab2b2', 'Phone Type', 'Specifies the type of phone number (e.g., mobile, landline, etc.).', 'text'),
+    ('c8f7629d-38ec-4506-93b8-c2a9a08b3b65', 'Insurance Verified', 'Indicates whether the insurance status has been verified.', 'boolean'),
+    ('2a8760cb-505b-4c6f-a0b0-2a4d87fe8850', 'Provider Verified', 'Indicates whether the provider has been verified.', 'boolean');
 
 -- Seed data for ProviderType
 INSERT INTO ProviderType (provider_type_id, type_name, created_at, updated_at)
@@ -444,295 +567,493 @@ VALUES
 """
 
 TRIGGERS_SQL = """
+-- Changed columns of an updated row, as {column: old value} and {column: new value}.
+-- updated_at is left out: touch_updated_at changes it on every update. Both are NULL
+-- when nothing else changed. The audited tables keep no file content (uploads are stored
+-- once in RawDocument and referenced by content_hash), so no large column is ever copied.
+CREATE OR REPLACE FUNCTION audit_changed_columns(old_row JSONB, new_row JSONB, OUT previous_value JSONB, OUT new_value JSONB)
+AS $$
+    SELECT jsonb_object_agg(n.key, o.value), jsonb_object_agg(n.key, n.value)
+    FROM jsonb_each(new_row) n
+    JOIN jsonb_each(old_row) o ON o.key = n.key
+    WHERE n.value IS DISTINCT FROM o.value
+      AND n.key <> 'updated_at';
+$$ LANGUAGE sql IMMUTABLE;
+
 -- Create Trigger Function for TemporaryDischargeAudit
+-- Statement-level: one call per COPY batch or approval, reading the changed rows from the transition tables
 CREATE OR REPLACE FUNCTION log_temporary_discharge_audit() 
 RETURNS TRIGGER AS $$
 BEGIN
-    IF (TG_OP = 'DELETE') THEN
-        INSERT INTO TemporaryDischargeAudit (temp_discharge_id, action, changed_by, change_timestamp, previous_value)
-        VALUES (OLD.temp_discharge_id, 'DELETE', OLD.updated_by, CURRENT_TIMESTAMP, row_to_json(OLD)::jsonb);
-        RETURN OLD;
-    ELSIF (TG_OP = 'INSERT') THEN
+    IF (TG_OP = 'INSERT') THEN
         INSERT INTO TemporaryDischargeAudit (temp_discharge_id, action, changed_by, change_timestamp, new_value)
-        VALUES (NEW.temp_discharge_id, 'INSERT', NEW.updated_by, CURRENT_TIMESTAMP, row_to_json(NEW)::jsonb);
-        RETURN NEW;
+        SELECT n.temp_discharge_id, 'INSERT', n.updated_by, CURRENT_TIMESTAMP, to_jsonb(n)
+        FROM new_rows n;
     ELSIF (TG_OP = 'UPDATE') THEN
+        -- Only the changed columns are stored; rows with no real change are not audited
         INSERT INTO TemporaryDischargeAudit (temp_discharge_id, action, changed_by, change_timestamp, previous_value, new_value)
-        VALUES (NEW.temp_discharge_id, 'UPDATE', NEW.updated_by, CURRENT_TIMESTAMP, row_to_json(OLD)::jsonb, row_to_json(NEW)::jsonb);
-        RETURN NEW;
+        SELECT n.temp_discharge_id, 'UPDATE', n.updated_by, CURRENT_TIMESTAMP, d.previous_value, d.new_value
+        FROM new_rows n
+        JOIN old_rows o ON o.temp_discharge_id = n.temp_discharge_id
+        CROSS JOIN LATERAL audit_changed_columns(to_jsonb(o), to_jsonb(n)) d
+        WHERE d.new_value IS NOT NULL;
+    ELSIF (TG_OP = 'DELETE') THEN
+        INSERT INTO TemporaryDischargeAudit (temp_discharge_id, action, changed_by, change_timestamp, previous_value)
+        SELECT o.temp_discharge_id, 'DELETE', o.updated_by, CURRENT_TIMESTAMP, to_jsonb(o)
+        FROM old_rows o;
     END IF;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
--- Create Trigger for TemporaryDischarge Table
-CREATE TRIGGER trigger_temporary_discharge_audit
-AFTER INSERT OR UPDATE OR DELETE ON TemporaryDischarge
-FOR EACH ROW EXECUTE FUNCTION log_temporary_discharge_audit();
+-- Create Triggers for TemporaryDischarge Table (one per event: transition tables differ)
+CREATE TRIGGER trigger_temporary_discharge_audit_insert
+AFTER INSERT ON TemporaryDischarge
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION log_temporary_discharge_audit();
+
+CREATE TRIGGER trigger_temporary_discharge_audit_update
+AFTER UPDATE ON TemporaryDischarge
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION log_temporary_discharge_audit();
+
+CREATE TRIGGER trigger_temporary_discharge_audit_delete
+AFTER DELETE ON TemporaryDischarge
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION log_temporary_discharge_audit();
 
 -- Create Trigger Function for TemporaryEnrichmentDataAudit
 CREATE OR REPLACE FUNCTION log_temporary_enrichment_data_audit() 
 RETURNS TRIGGER AS $$
 BEGIN
-    IF (TG_OP = 'DELETE') THEN
-        INSERT INTO TemporaryEnrichmentDataAudit (enrichment_data_id, action, changed_by, change_timestamp, previous_value)
-        VALUES (OLD.enrichment_data_id, 'DELETE', OLD.updated_by, CURRENT_TIMESTAMP, row_to_json(OLD)::jsonb);
-        RETURN OLD;
-    ELSIF (TG_OP = 'INSERT') THEN
+    IF (TG_OP = 'INSERT') THEN
         INSERT INTO TemporaryEnrichmentDataAudit (enrichment_data_id, action, changed_by, change_timestamp, new_value)
-        VALUES (NEW.enrichment_data_id, 'INSERT', NEW.updated_by, CURRENT_TIMESTAMP, row_to_json(NEW)::jsonb);
-        RETURN NEW;
+        SELECT n.enrichment_data_id, 'INSERT', n.updated_by, CURRENT_TIMESTAMP, to_jsonb(n)
+        FROM new_rows n;
     ELSIF (TG_OP = 'UPDATE') THEN
         INSERT INTO TemporaryEnrichmentDataAudit (enrichment_data_id, action, changed_by, change_timestamp, previous_value, new_value)
-        VALUES (NEW.enrichment_data_id, 'UPDATE', NEW.updated_by, CURRENT_TIMESTAMP, row_to_json(OLD)::jsonb, row_to_json(NEW)::jsonb);
-        RETURN NEW;
+        SELECT n.enrichment_data_id, 'UPDATE', n.updated_by, CURRENT_TIMESTAMP, d.previous_value, d.new_value
+        FROM new_rows n
+        JOIN old_rows o ON o.enrichment_data_id = n.enrichment_data_id
+        CROSS JOIN LATERAL audit_changed_columns(to_jsonb(o), to_jsonb(n)) d
+        WHERE d.new_value IS NOT NULL;
+    ELSIF (TG_OP = 'DELETE') THEN
+        INSERT INTO TemporaryEnrichmentDataAudit (enrichment_data_id, action, changed_by, change_timestamp, previous_value)
+        SELECT o.enrichment_data_id, 'DELETE', o.updated_by, CURRENT_TIMESTAMP, to_jsonb(o)
+        FROM old_rows o;
     END IF;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
--- Create Trigger for TemporaryEnrichmentData Table
-CREATE TRIGGER trigger_temporary_enrichment_data_audit
-AFTER INSERT OR UPDATE OR DELETE ON TemporaryEnrichmentData
-FOR EACH ROW EXECUTE FUNCTION log_temporary_enrichment_data_audit();
+-- Create Triggers for TemporaryEnrichmentData Table
+CREATE TRIGGER trigger_temporary_enrichment_data_audit_insert
+AFTER INSERT ON TemporaryEnrichmentData
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION log_temporary_enrichment_data_audit();
+
+CREATE TRIGGER trigger_temporary_enrichment_data_audit_update
+AFTER UPDATE ON TemporaryEnrichmentData
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION log_temporary_enrichment_data_audit();
+
+CREATE TRIGGER trigger_temporary_enrichment_data_audit_delete
+AFTER DELETE ON TemporaryEnrichmentData
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION log_temporary_enrichment_data_audit();
 
 -- Create Trigger Function for RawDataIngestedAudit
 CREATE OR REPLACE FUNCTION log_raw_data_ingested_audit() 
 RETURNS TRIGGER AS $$
 BEGIN
-    IF (TG_OP = 'DELETE') THEN
-        INSERT INTO RawDataIngestedAudit (raw_data_ingested_audit_id, raw_data_id, action_type, action_timestamp, action_user, original_data)
-        VALUES (uuid_generate_v4(), OLD.raw_data_id, 'DELETE', CURRENT_TIMESTAMP, OLD.updated_by, row_to_json(OLD)::jsonb);
-        RETURN OLD;
-    ELSIF (TG_OP = 'INSERT') THEN
-        INSERT INTO RawDataIngestedAudit (raw_data_ingested_audit_id, raw_data_id, action_type, action_timestamp, action_user, new_data)
-        VALUES (uuid_generate_v4(), NEW.raw_data_id, 'INSERT', CURRENT_TIMESTAMP, NEW.updated_by, row_to_json(NEW)::jsonb);
-        RETURN NEW;
+    IF (TG_OP = 'INSERT') THEN
+        INSERT INTO RawDataIngestedAudit (raw_data_id, action_type, action_timestamp, action_user, new_data)
+        SELECT n.raw_data_id, 'INSERT', CURRENT_TIMESTAMP, n.updated_by, to_jsonb(n)
+        FROM new_rows n;
     ELSIF (TG_OP = 'UPDATE') THEN
-        INSERT INTO RawDataIngestedAudit (raw_data_ingested_audit_id, raw_data_id, action_type, action_timestamp, action_user, original_data, new_data)
-        VALUES (uuid_generate_v4(), NEW.raw_data_id, 'UPDATE', CURRENT_TIMESTAMP, NEW.updated_by, row_to_json(OLD)::jsonb, row_to_json(NEW)::jsonb);
-        RETURN NEW;
+        INSERT INTO RawDataIngestedAudit (raw_data_id, action_type, action_timestamp, action_user, original_data, new_data)
+        SELECT n.raw_data_id, 'UPDATE', CURRENT_TIMESTAMP, n.updated_by, d.previous_value, d.new_value
+        FROM new_rows n
+        JOIN old_rows o ON o.raw_data_id = n.raw_data_id
+        CROSS JOIN LATERAL audit_changed_columns(to_jsonb(o), to_jsonb(n)) d
+        WHERE d.new_value IS NOT NULL;
+    ELSIF (TG_OP = 'DELETE') THEN
+        INSERT INTO RawDataIngestedAudit (raw_data_id, action_type, action_timestamp, action_user, original_data)
+        SELECT o.raw_data_id, 'DELETE', CURRENT_TIMESTAMP, o.updated_by, to_jsonb(o)
+        FROM old_rows o;
     END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create Triggers for RawDataIngested Table
+CREATE TRIGGER trigger_raw_data_ingested_audit_insert
+AFTER INSERT ON RawDataIngested
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION log_raw_data_ingested_audit();
+
+CREATE TRIGGER trigger_raw_data_ingested_audit_update
+AFTER UPDATE ON RawDataIngested
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION log_raw_data_ingested_audit();
+
+CREATE TRIGGER trigger_raw_data_ingested_audit_delete
+AFTER DELETE ON RawDataIngested
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION log_raw_data_ingested_audit();
+
+-- Create Trigger Function for new RawDataImportSummary rows
+-- Every import gets a summary row, so the status filter never has to look for missing ones
+CREATE OR REPLACE FUNCTION create_raw_data_import_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO RawDataImportSummary (raw_data_id, import_created_at)
+    SELECT raw_data_id, created_at FROM new_rows
+    ON CONFLICT (raw_data_id) DO NOTHING;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
--- Create Trigger for RawDataIngested Table
-CREATE TRIGGER trigger_raw_data_ingested_audit
-AFTER INSERT OR UPDATE OR DELETE ON RawDataIngested
-FOR EACH ROW EXECUTE FUNCTION log_raw_data_ingested_audit();
+CREATE TRIGGER trigger_raw_data_ingested_summary_insert
+AFTER INSERT ON RawDataIngested
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION create_raw_data_import_summary();
+
+-- Create Trigger Function for RawDataImportSummary
+-- Statement-level, so a COPY batch, an approval or a rejection applies one delta per import
+CREATE OR REPLACE FUNCTION maintain_raw_data_import_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (TG_OP = 'INSERT') THEN
+        INSERT INTO RawDataImportSummary AS s (raw_data_id, import_created_at, total_count, pending_count, approved_count, rejected_count, updated_at)
+        SELECT
+            c.raw_data_id,
+            r.created_at,
+            SUM(c.delta),
+            COALESCE(SUM(c.delta) FILTER (WHERE c.status IS NULL OR c.status NOT IN ('Approved', 'Rejected')), 0),
+            COALESCE(SUM(c.delta) FILTER (WHERE c.status = 'Approved'), 0),
+            COALESCE(SUM(c.delta) FILTER (WHERE c.status = 'Rejected'), 0),
+            CURRENT_TIMESTAMP
+        FROM (SELECT raw_data_id, status, 1 AS delta FROM new_rows) c
+        JOIN RawDataIngested r ON r.raw_data_id = c.raw_data_id
+        GROUP BY c.raw_data_id, r.created_at
+        HAVING bool_or(c.delta <> 0)
+        ON CONFLICT (raw_data_id) DO UPDATE SET
+            total_count = s.total_count + EXCLUDED.total_count,
+            pending_count = s.pending_count + EXCLUDED.pending_count,
+            approved_count = s.approved_count + EXCLUDED.approved_count,
+            rejected_count = s.rejected_count + EXCLUDED.rejected_count,
+            updated_at = EXCLUDED.updated_at;
+    ELSIF (TG_OP = 'UPDATE') THEN
+        -- Rows whose status and raw_data_id did not change cancel out
+        INSERT INTO RawDataImportSummary AS s (raw_data_id, import_created_at, total_count, pending_count, approved_count, rejected_count, updated_at)
+        SELECT
+            c.raw_data_id,
+            r.created_at,
+            SUM(c.delta),
+            COALESCE(SUM(c.delta) FILTER (WHERE c.status IS NULL OR c.status NOT IN ('Approved', 'Rejected')), 0),
+            COALESCE(SUM(c.delta) FILTER (WHERE c.status = 'Approved'), 0),
+            COALESCE(SUM(c.delta) FILTER (WHERE c.status = 'Rejected'), 0),
+            CURRENT_TIMESTAMP
+        FROM (
+            SELECT raw_data_id, status, SUM(delta) AS delta
+            FROM (
+                SELECT raw_data_id, status, 1 AS delta FROM new_rows
+                UNION ALL
+                SELECT raw_data_id, status, -1 AS delta FROM old_rows
+            ) moved
+            GROUP BY raw_data_id, status
+        ) c
+        JOIN RawDataIngested r ON r.raw_data_id = c.raw_data_id
+        GROUP BY c.raw_data_id, r.created_at
+        HAVING bool_or(c.delta <> 0)
+        ON CONFLICT (raw_data_id) DO UPDATE SET
+            total_count = s.total_count + EXCLUDED.total_count,
+            pending_count = s.pending_count + EXCLUDED.pending_count,
+            approved_count = s.approved_count + EXCLUDED.approved_count,
+            rejected_count = s.rejected_count + EXCLUDED.rejected_count,
+            updated_at = EXCLUDED.updated_at;
+    ELSIF (TG_OP = 'DELETE') THEN
+        INSERT INTO RawDataImportSummary AS s (raw_data_id, import_created_at, total_count, pending_count, approved_count, rejected_count, updated_at)
+        SELECT
+            c.raw_data_id,
+            r.created_at,
+            SUM(c.delta),
+            COALESCE(SUM(c.delta) FILTER (WHERE c.status IS NULL OR c.status NOT IN ('Approved', 'Rejected')), 0),
+            COALESCE(SUM(c.delta) FILTER (WHERE c.status = 'Approved'), 0),
+            COALESCE(SUM(c.delta) FILTER (WHERE c.status = 'Rejected'), 0),
+            CURRENT_TIMESTAMP
+        FROM (SELECT raw_data_id, status, -1 AS delta FROM old_rows) c
+        JOIN RawDataIngested r ON r.raw_data_id = c.raw_data_id
+        GROUP BY c.raw_data_id, r.created_at
+        HAVING bool_or(c.delta <> 0)
+        ON CONFLICT (raw_data_id) DO UPDATE SET
+            total_count = s.total_count + EXCLUDED.total_count,
+            pending_count = s.pending_count + EXCLUDED.pending_count,
+            approved_count = s.approved_count + EXCLUDED.approved_count,
+            rejected_count = s.rejected_count + EXCLUDED.rejected_count,
+            updated_at = EXCLUDED.updated_at;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create Triggers for TemporaryDischarge Table (one per event: transition tables differ)
+CREATE TRIGGER trigger_temporary_discharge_summary_insert
+AFTER INSERT ON TemporaryDischarge
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION maintain_raw_data_import_summary();
+
+CREATE TRIGGER trigger_temporary_discharge_summary_update
+AFTER UPDATE ON TemporaryDischarge
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION maintain_raw_data_import_summary();
+
+CREATE TRIGGER trigger_temporary_discharge_summary_delete
+AFTER DELETE ON TemporaryDischarge
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION maintain_raw_data_import_summary();
+
+-- Keep updated_at current on every update, whichever code path makes it
+-- (the review and discharge endpoints derive their ETags from it)
+CREATE OR REPLACE FUNCTION touch_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_raw_data_ingested_touch_updated_at
+BEFORE UPDATE ON RawDataIngested
+FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+CREATE TRIGGER trigger_temporary_discharge_touch_updated_at
+BEFORE UPDATE ON TemporaryDischarge
+FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+CREATE TRIGGER trigger_temporary_enrichment_data_touch_updated_at
+BEFORE UPDATE ON TemporaryEnrichmentData
+FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
 
 """
 
 PROCEDURE_SQL = """
-CREATE OR REPLACE FUNCTION f_approve_discharge(i_temp_discharge_id UUID)
-RETURNS VOID AS $$
-DECLARE
-    tv_patient_id UUID;
-    tv_epic_id UUID; -- To store the generated UUID from Epic
-    tv_raw_epic_id VARCHAR; -- To store the raw epic_id from TemporaryDischarge
-    tv_phone_number VARCHAR;
-    tv_phone_validation_status VARCHAR;
-    tv_phone_type VARCHAR;
-    tv_insurance_name VARCHAR;
-    tv_insurance_verified BOOLEAN;
-    tv_attending_physician VARCHAR;
-    tv_primary_care_provider VARCHAR;
-    tv_provider_verified BOOLEAN;
-    tv_hospital_name VARCHAR;
-    tv_discharge_id UUID;
-    tv_provider_id UUID;
-    tv_provider_provider_type_id UUID;
-    tv_insurance_id UUID;
-    tv_hospital_id UUID;
-    tv_provider_type_id UUID;
-    tv_full_name VARCHAR;
-    tv_disposition VARCHAR;
-    tv_discharge_date DATE;
-    tv_provider_name VARCHAR; -- To use in the loop
-    tv_enrichment_record RECORD; -- To hold enrichment data
+-- One discharge of an approval batch, with its enrichment values pivoted into columns.
+-- Approvals keep their batch in an array of these rather than in temporary tables, so
+-- approving does not create catalog entries on every call.
+DO $$
 BEGIN
-    -- Fetch discharge data from TemporaryDischarge
-    SELECT td.name, td.epic_id, td.date, td.phone_number,
-           td.insurance, td.attending_physician, td.primary_care_provider,
-           td.hospital_name, td.disposition
-    INTO tv_full_name, tv_raw_epic_id, tv_discharge_date, tv_phone_number,
-         tv_insurance_name, tv_attending_physician, tv_primary_care_provider, tv_hospital_name, tv_disposition
+    CREATE TYPE approval_batch_row AS (
+        temp_discharge_id UUID,
+        discharge_id UUID,
+        full_name TEXT,
+        epic_identifier TEXT,
+        discharge_date DATE,
+        disposition TEXT,
+        phone_number TEXT,
+        insurance_name TEXT,
+        attending_physician TEXT,
+        primary_care_provider TEXT,
+        hospital_name TEXT,
+        phone_validation_status TEXT,
+        phone_type TEXT,
+        insurance_verified BOOLEAN
+    );
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+-- The approval rows for the given TemporaryDischarge ids, each with a new discharge_id.
+-- Blank optional fields become NULL. The caller locks the rows first.
+CREATE OR REPLACE FUNCTION f_approval_batch_rows(i_temp_discharge_ids UUID[])
+RETURNS SETOF approval_batch_row AS $$
+    SELECT td.temp_discharge_id,
+           uuid_generate_v4(),
+           td.name,
+           td.epic_id,
+           td.date::DATE,
+           td.disposition,
+           CASE WHEN TRIM(td.phone_number) <> '' THEN td.phone_number END,
+           CASE WHEN TRIM(td.insurance) <> '' THEN td.insurance END,
+           CASE WHEN TRIM(td.attending_physician) <> '' THEN td.attending_physician END,
+           CASE WHEN TRIM(td.primary_care_provider) <> '' THEN td.primary_care_provider END,
+           CASE WHEN TRIM(td.hospital_name) <> '' THEN td.hospital_name END,
+           e.phone_validation_status,
+           e.phone_type,
+           e.insurance_verified
     FROM TemporaryDischarge td
-    WHERE td.temp_discharge_id = i_temp_discharge_id;
-
-    IF NOT FOUND THEN
-        RAISE EXCEPTION 'Discharge not found for ID: %', i_temp_discharge_id;
-    END IF;
-
-    -- Fetch enrichment data from TemporaryEnrichmentData
-    FOR tv_enrichment_record IN
-        SELECT ted.enrichment_type_id, ted.enrichment_value
+    LEFT JOIN LATERAL (
+        SELECT max(ted.enrichment_value) FILTER (WHERE ted.enrichment_type_id = 'eeb9f5b4-15e3-4ac2-a4b4-5c7c7f92b717') AS phone_validation_status,
+               max(ted.enrichment_value) FILTER (WHERE ted.enrichment_type_id = 'add1ed02-dc4e-460a-b3e1-9b9a160ab2b2') AS phone_type,
+               bool_or(ted.enrichment_value::BOOLEAN) FILTER (WHERE ted.enrichment_type_id = 'c8f7629d-38ec-4506-93b8-c2a9a08b3b65') AS insurance_verified
         FROM TemporaryEnrichmentData ted
-        WHERE ted.temp_discharge_id = i_temp_discharge_id
-    LOOP
-        IF tv_enrichment_record.enrichment_type_id = 'eeb9f5b4-15e3-4ac2-a4b4-5c7c7f92b717' THEN
-            -- Phone Validation Status
-            tv_phone_validation_status := tv_enrichment_record.enrichment_value;
-        ELSIF tv_enrichment_record.enrichment_type_id = 'add1ed02-dc4e-460a-b3e1-9b9a160ab2b2' THEN
-            -- Phone Type
-            tv_phone_type := tv_enrichment_record.enrichment_value;
-        ELSIF tv_enrichment_record.enrichment_type_id = 'c8f7629d-38ec-4506-93b8-c2a9a08b3b65' THEN
-            -- Insurance Verified
-            tv_insurance_verified := tv_enrichment_record.enrichment_value::BOOLEAN;
-        ELSIF tv_enrichment_record.enrichment_type_id = '2a8760cb-505b-4c6f-a0b0-2a4d87fe8850' THEN
-            -- Provider Verified
-            tv_provider_verified := tv_enrichment_record.enrichment_value::BOOLEAN;
-        END IF;
-    END LOOP;
+        WHERE ted.temp_discharge_id = td.temp_discharge_id
+    ) e ON TRUE
+    WHERE td.temp_discharge_id = ANY(i_temp_discharge_ids);
+$$ LANGUAGE sql;
+
+-- Move a batch of locked approval rows into the normalized tables and mark them Approved.
+-- Each step is one INSERT ... SELECT over unnest(i_batch). Patients, Epic ids, providers,
+-- insurances, hospitals and their links are upserted against their unique keys (index
+-- migration 2), so concurrent approvals cannot create duplicates. The generated keys are
+-- looked up again by the next statement rather than taken from RETURNING, so rows that a
+-- concurrent approval committed (and ON CONFLICT skipped) are found as well.
+CREATE OR REPLACE FUNCTION f_approve_discharge_rows(i_batch approval_batch_row[])
+RETURNS VOID AS $$
+DECLARE
+    v_provider_discharge_ids UUID[];
+    v_provider_names TEXT[];
+    v_provider_type_ids UUID[];
+BEGIN
+    -- Patients, matched by full name
+    INSERT INTO Patient (full_name, created_at, updated_at)
+    SELECT DISTINCT b.full_name, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM unnest(i_batch) b
+    ON CONFLICT (full_name) DO NOTHING;
+
+    -- Epic identifiers; one that already exists keeps its patient
+    INSERT INTO Epic (epic_identifier, patient_id, created_at, updated_at)
+    SELECT DISTINCT ON (b.epic_identifier) b.epic_identifier, p.patient_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM unnest(i_batch) b
+    JOIN Patient p ON p.full_name = b.full_name
+    ORDER BY b.epic_identifier
+    ON CONFLICT (epic_identifier) DO NOTHING;
+
+    INSERT INTO Discharge (discharge_id, epic_id, discharge_date, disposition, created_at, updated_at)
+    SELECT b.discharge_id, e.epic_id, b.discharge_date, b.disposition, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM unnest(i_batch) b
+    JOIN Epic e ON e.epic_identifier = b.epic_identifier;
+
+    -- Providers: the attending physician and the primary care provider of each discharge
+    SELECT array_agg(b.discharge_id), array_agg(p.provider_name), array_agg(p.provider_type_id)
+    INTO v_provider_discharge_ids, v_provider_names, v_provider_type_ids
+    FROM unnest(i_batch) b
+    CROSS JOIN LATERAL (VALUES
+        (b.attending_physician, '47b4d1f9-60fc-4ec4-aab4-7c94b9cd5290'::UUID),  -- Attending
+        (b.primary_care_provider, '7a21f43a-df8e-4f7e-9c4a-c3f8f9e28fe2'::UUID)  -- Primary Care
+    ) AS p (provider_name, provider_type_id)
+    WHERE p.provider_name IS NOT NULL;
+
+    INSERT INTO Provider (name, created_at, updated_at)
+    SELECT DISTINCT bp.provider_name, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM unnest(v_provider_names) AS bp (provider_name)
+    ON CONFLICT (name) DO NOTHING;
+
+    INSERT INTO ProviderProviderType (provider_id, provider_type_id, created_at, updated_at)
+    SELECT DISTINCT pr.provider_id, bp.provider_type_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM unnest(v_provider_names, v_provider_type_ids) AS bp (provider_name, provider_type_id)
+    JOIN Provider pr ON pr.name = bp.provider_name
+    ON CONFLICT (provider_id, provider_type_id) DO NOTHING;
+
+    INSERT INTO DischargeProvider (discharge_id, provider_provider_type_id, created_at, updated_at)
+    SELECT DISTINCT bp.discharge_id, ppt.provider_provider_type_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM unnest(v_provider_discharge_ids, v_provider_names, v_provider_type_ids)
+         AS bp (discharge_id, provider_name, provider_type_id)
+    JOIN Provider pr ON pr.name = bp.provider_name
+    JOIN ProviderProviderType ppt ON ppt.provider_id = pr.provider_id AND ppt.provider_type_id = bp.provider_type_id
+    ON CONFLICT (discharge_id, provider_provider_type_id) DO NOTHING;
+
+    -- Phone numbers; a known number takes the latest validation status and type
+    INSERT INTO PatientPhone (patient_id, phone_number, phone_validation_status, phone_type, created_at, updated_at)
+    SELECT DISTINCT ON (p.patient_id, b.phone_number)
+           p.patient_id, b.phone_number, b.phone_validation_status, b.phone_type, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM unnest(i_batch) b
+    JOIN Patient p ON p.full_name = b.full_name
+    WHERE b.phone_number IS NOT NULL
+    ORDER BY p.patient_id, b.phone_number
+    ON CONFLICT (patient_id, phone_number) DO UPDATE
+    SET phone_validation_status = COALESCE(EXCLUDED.phone_validation_status, PatientPhone.phone_validation_status),
+        phone_type = COALESCE(EXCLUDED.phone_type, PatientPhone.phone_type),
+        updated_at = CURRENT_TIMESTAMP;
+
+    -- Insurances and the Epic id's coverage
+    INSERT INTO Insurance (insurance_name, created_at, updated_at)
+    SELECT DISTINCT b.insurance_name, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM unnest(i_batch) b
+    WHERE b.insurance_name IS NOT NULL
+    ON CONFLICT (insurance_name) DO NOTHING;
+
+    INSERT INTO EpicInsurance (epic_id, insurance_id, insurance_verified, created_at, updated_at)
+    SELECT DISTINCT ON (e.epic_id, i.insurance_id)
+           e.epic_id, i.insurance_id, b.insurance_verified, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM unnest(i_batch) b
+    JOIN Epic e ON e.epic_identifier = b.epic_identifier
+    JOIN Insurance i ON i.insurance_name = b.insurance_name
+    ORDER BY e.epic_id, i.insurance_id
+    ON CONFLICT (epic_id, insurance_id) DO UPDATE
+    SET insurance_verified = COALESCE(EXCLUDED.insurance_verified, EpicInsurance.insurance_verified),
+        updated_at = CURRENT_TIMESTAMP;
+
+    -- Hospitals and the Epic id's hospital links
+    INSERT INTO Hospital (hospital_name, created_at, updated_at)
+    SELECT DISTINCT b.hospital_name, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM unnest(i_batch) b
+    WHERE b.hospital_name IS NOT NULL
+    ON CONFLICT (hospital_name) DO NOTHING;
+
+    INSERT INTO EpicHospital (epic_id, hospital_id, created_at, updated_at)
+    SELECT DISTINCT e.epic_id, h.hospital_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    FROM unnest(i_batch) b
+    JOIN Epic e ON e.epic_identifier = b.epic_identifier
+    JOIN Hospital h ON h.hospital_name = b.hospital_name
+    ON CONFLICT (epic_id, hospital_id) DO NOTHING;
 
-    -- Check for existing Patient
-    SELECT p.patient_id INTO tv_patient_id
-    FROM Patient p
-    WHERE p.full_name = tv_full_name;
+    -- Update the status of TemporaryDischarge
+    UPDATE TemporaryDischarge td
+    SET status = 'Approved'
+    FROM unnest(i_batch) b
+    WHERE td.temp_discharge_id = b.temp_discharge_id;
+END;
+$$ LANGUAGE plpgsql;
 
-    IF NOT FOUND THEN
-        -- Insert new Patient
-        INSERT INTO Patient (full_name, created_at, updated_at)
-        VALUES (tv_full_name, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-        RETURNING patient_id INTO tv_patient_id;
-    END IF;
+-- Approve a batch of TemporaryDischarge rows. Returns the Discharge created for each
+-- approved row; ids that do not exist are ignored.
+CREATE OR REPLACE FUNCTION f_approve_discharges(i_temp_discharge_ids UUID[])
+RETURNS TABLE (approved_temp_discharge_id UUID, new_discharge_id UUID) AS $$
+DECLARE
+    v_batch approval_batch_row[];
+BEGIN
+    -- Lock the rows, in a fixed order so overlapping batches cannot deadlock
+    PERFORM 1
+    FROM TemporaryDischarge td
+    WHERE td.temp_discharge_id = ANY(i_temp_discharge_ids)
+    ORDER BY td.temp_discharge_id
+    FOR UPDATE;
 
-    -- Check if epic_identifier already exists
-    SELECT epic_id INTO tv_epic_id
-    FROM Epic
-    WHERE epic_identifier = tv_raw_epic_id;
+    SELECT array_agg(b)
+    INTO v_batch
+    FROM f_approval_batch_rows(i_temp_discharge_ids) b;
 
-    IF NOT FOUND THEN
-        -- Insert into Epic table with raw_epic_id and retrieve generated epic_id
-        INSERT INTO Epic (epic_identifier, patient_id, created_at, updated_at)
-        VALUES (tv_raw_epic_id, tv_patient_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-        RETURNING epic_id INTO tv_epic_id;
+    IF v_batch IS NULL THEN
+        RETURN;
     END IF;
 
-    -- Insert into Discharge table using the generated epic_id
-    INSERT INTO Discharge (epic_id, discharge_date, disposition, created_at, updated_at)
-    VALUES (tv_epic_id, tv_discharge_date, tv_disposition, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-    RETURNING discharge_id INTO tv_discharge_id;
-
-    -- Handle Providers (Attending Physician and Primary Care Provider)
-    -- Only proceed if at least one provider is present
-    IF (tv_attending_physician IS NOT NULL AND TRIM(tv_attending_physician) <> '') OR
-       (tv_primary_care_provider IS NOT NULL AND TRIM(tv_primary_care_provider) <> '') THEN
-
-        FOR tv_provider_name IN SELECT unnest(ARRAY[
-            CASE WHEN tv_attending_physician IS NOT NULL AND TRIM(tv_attending_physician) <> '' THEN tv_attending_physician ELSE NULL END,
-            CASE WHEN tv_primary_care_provider IS NOT NULL AND TRIM(tv_primary_care_provider) <> '' THEN tv_primary_care_provider ELSE NULL END
-        ])
-        LOOP
-            -- Skip if provider name is NULL or empty
-            IF tv_provider_name IS NULL THEN
-                CONTINUE;
-            END IF;
-
-            -- Check if provider exists
-            SELECT pr.provider_id INTO tv_provider_id
-            FROM Provider pr
-            WHERE pr.name = tv_provider_name;
-
-            IF NOT FOUND THEN
-                -- Insert new Provider
-                INSERT INTO Provider (name, created_at, updated_at)
-                VALUES (tv_provider_name, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                RETURNING provider_id INTO tv_provider_id;
-            END IF;
-
-            -- Handle Provider Type
-            IF tv_provider_name = tv_attending_physician THEN
-                tv_provider_type_id := '47b4d1f9-60fc-4ec4-aab4-7c94b9cd5290';
-            ELSE
-                tv_provider_type_id := '7a21f43a-df8e-4f7e-9c4a-c3f8f9e28fe2';
-            END IF;
-
-            -- Check or insert into ProviderProviderType
-            SELECT ppt.provider_provider_type_id INTO tv_provider_provider_type_id
-            FROM ProviderProviderType ppt
-            WHERE ppt.provider_id = tv_provider_id AND ppt.provider_type_id = tv_provider_type_id;
-
-            IF NOT FOUND THEN
-                INSERT INTO ProviderProviderType (provider_id, provider_type_id, created_at, updated_at)
-                VALUES (tv_provider_id, tv_provider_type_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                RETURNING provider_provider_type_id INTO tv_provider_provider_type_id;
-            END IF;
-
-            -- Insert into DischargeProvider table 
-            IF tv_discharge_id IS NOT NULL THEN
-                -- Check if a matching record already exists in DischargeProvider
-                PERFORM 1
-                FROM DischargeProvider dp
-                WHERE dp.discharge_id = tv_discharge_id AND dp.provider_provider_type_id = tv_provider_provider_type_id;
-
-                IF NOT FOUND THEN
-                    -- Insert into DischargeProvider table only if the record does not exist
-                    INSERT INTO DischargeProvider (discharge_id, provider_provider_type_id, created_at, updated_at)
-                    VALUES (tv_discharge_id, tv_provider_provider_type_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
-                END IF;
-            END IF;
-        END LOOP;
-    END IF;
+    PERFORM f_approve_discharge_rows(v_batch);
 
-    -- Check and insert into PatientPhone only if tv_phone_number is not null or empty
-    IF tv_phone_number IS NOT NULL AND TRIM(tv_phone_number) <> '' THEN
-        PERFORM 1
-        FROM PatientPhone pp
-        WHERE pp.patient_id = tv_patient_id 
-          AND pp.phone_number = tv_phone_number
-          AND pp.phone_validation_status = tv_phone_validation_status
-          AND pp.phone_type = tv_phone_type;
-
-        IF NOT FOUND THEN
-            INSERT INTO PatientPhone (patient_id, phone_number, phone_validation_status, phone_type, created_at, updated_at)
-            VALUES (tv_patient_id, tv_phone_number, tv_phone_validation_status, tv_phone_type, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
-        END IF;
-    END IF;
+    RETURN QUERY
+    SELECT b.temp_discharge_id, b.discharge_id
+    FROM unnest(v_batch) b;
+END;
+$$ LANGUAGE plpgsql;
 
-    -- Insert into Insurance and EpicInsurance only if tv_insurance_name is not null or empty
-    IF tv_insurance_name IS NOT NULL AND TRIM(tv_insurance_name) <> '' THEN
-        SELECT i.insurance_id INTO tv_insurance_id
-        FROM Insurance i
-        WHERE i.insurance_name = tv_insurance_name;
-
-        IF NOT FOUND THEN
-            INSERT INTO Insurance (insurance_name, created_at, updated_at)
-            VALUES (tv_insurance_name, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-            RETURNING insurance_id INTO tv_insurance_id;
-        END IF;
-
-        -- Insert into EpicInsurance if not already present
-        INSERT INTO EpicInsurance (epic_id, insurance_id, insurance_verified, created_at, updated_at)
-        VALUES (tv_epic_id, tv_insurance_id, tv_insurance_verified, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
-    END IF;
+-- Approve a single discharge (see f_approve_discharges)
+CREATE OR REPLACE FUNCTION f_approve_discharge(i_temp_discharge_id UUID)
+RETURNS VOID AS $$
+DECLARE
+    v_row approval_batch_row;
+BEGIN
+    PERFORM 1
+    FROM TemporaryDischarge td
+    WHERE td.temp_discharge_id = i_temp_discharge_id
+    FOR UPDATE;
 
-    -- Insert data into Hospital and EpicHospital only if tv_hospital_name is not null or empty
-    IF tv_hospital_name IS NOT NULL AND TRIM(tv_hospital_name) <> '' THEN
-        SELECT h.hospital_id INTO tv_hospital_id
-        FROM Hospital h
-        WHERE h.hospital_name = tv_hospital_name;
-
-        IF NOT FOUND THEN
-            INSERT INTO Hospital (hospital_name, created_at, updated_at)
-            VALUES (tv_hospital_name, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-            RETURNING hospital_id INTO tv_hospital_id;
-        END IF;
-
-        -- Insert into EpicHospital if not already present
-        PERFORM 1
-        FROM EpicHospital eh
-        WHERE eh.epic_id = tv_epic_id AND eh.hospital_id = tv_hospital_id;
-
-        IF NOT FOUND THEN
-            INSERT INTO EpicHospital (epic_id, hospital_id, created_at, updated_at)
-            VALUES (tv_epic_id, tv_hospital_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
-        END IF;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Discharge not found for ID: %', i_temp_discharge_id;
     END IF;
 
-    -- Update the status of TemporaryDischarge
-    UPDATE TemporaryDischarge
-    SET status = 'Approved'
-    WHERE temp_discharge_id = i_temp_discharge_id;
+    SELECT * INTO v_row FROM f_approval_batch_rows(ARRAY[i_temp_discharge_id]);
 
+    PERFORM f_approve_discharge_rows(ARRAY[v_row]);
 END;
 $$ LANGUAGE plpgsql;
 
@@ -816,6 +1137,14 @@ def create_roles_and_schema():
         print("Creating schema and tables...")
         cursor.execute(SCHEMA_SQL)
 
+        # Create this month's and the upcoming audit partitions
+        print("Creating audit partitions...")
+        create_audit_partitions(connection)
+
+        # Build the lookup indexes (in this transaction; live databases use index_migrations.py)
+        print("Creating indexes...")
+        apply_index_migrations(connection, concurrently=False)
+
         # Create triggers for auditing
         print("Creating triggers for auditing...")
         cursor.execute(TRIGGERS_SQL)
@@ -827,6 +1156,7 @@ def create_roles_and_schema():
         # Grant additional permissions on tables and sequences
         print("Granting permissions on tables and sequences...")
         cursor.execute(GRANT_PERMISSIONS_SQL)
+        cursor.execute(AUDIT_OWNERSHIP_SQL)
 
         # Create Procedures 
         print("Creating stored procedures...")
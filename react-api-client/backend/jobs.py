@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+# Ingestion worker configuration
+JOB_WORKER_CONFIG = {
+    "max_workers": 4,  # Pipelines running at the same time
+    "max_pending": 50,  # Queued + running jobs accepted before new uploads are refused
+    "retention_seconds": 3600,  # How long finished jobs stay queryable
+}
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when the ingestion queue already holds max_pending jobs."""
+
+
+class IngestionJob:
+    """
+    Tracks the state, per-stage timings and row counts of one ingestion run.
+    """
+
+    def __init__(self, description):
+        self.job_id = str(uuid.uuid4())
+        self.description = description
+        self.state = JOB_QUEUED
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self.stages = {}  # Stage name -> duration in milliseconds
+        self.counts = {}  # Counter name -> value (e.g. rows_parsed)
+        self.result = {}  # Values the client needs afterwards (e.g. raw_data_id)
+        self.error = None
+        self._lock = Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a pipeline stage and record its duration, even if it fails."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.stages[name] = elapsed_ms
+
+    def timed_iter(self, name, iterable, count=None):
+        """
+        Yield from iterable, adding the time spent producing each item to stage `name`.
+        Used for streaming stages whose work is interleaved with the stages downstream.
+        If `count` is given, that counter is incremented for each item yielded.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.add_stage_time(name, (time.perf_counter() - start) * 1000)
+            if count:
+                self.add_count(count, 1)
+            yield item
+
+    def add_stage_time(self, name, elapsed_ms):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0) + elapsed_ms
+
+    def set_count(self, name, value):
+        with self._lock:
+            self.counts[name] = value
+
+    def add_count(self, name, value):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def set_result(self, **values):
+        with self._lock:
+            self.result.update(values)
+
+    def is_finished(self):
+        return self.state in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "description": self.description,
+                "state": self.state,
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+                "stages": {name: round(ms, 3) for name, ms in self.stages.items()},
+                "counts": dict(self.counts),
+                "result": dict(self.result),
+                "error": self.error,
+            }
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=JOB_WORKER_CONFIG["max_workers"],
+    thread_name_prefix="ingestion-worker",
+)
+_jobs = {}
+_jobs_lock = Lock()
+
+# Async pipelines (the ASGI app) run as tasks on its event loop. A reference is kept so
+# they are not garbage collected mid-run, and at most max_workers run at the same time.
+_async_tasks = set()
+_async_slots = None
+
+
+def _prune_finished_jobs():
+    """Forget finished jobs older than retention_seconds. Caller holds _jobs_lock."""
+    now = datetime.now(timezone.utc)
+    expired = [
+        job_id for job_id, job in _jobs.items()
+        if job.is_finished() and (now - job.finished_at).total_seconds() > JOB_WORKER_CONFIG["retention_seconds"]
+    ]
+    for job_id in expired:
+        del _jobs[job_id]
+
+
+def _start_job(job):
+    job.state = JOB_RUNNING
+    job.started_at = datetime.now(timezone.utc)
+    logger.info(f"Job {job.job_id} started: {job.description}")
+
+
+def _finish_job(job, error=None):
+    if error is None:
+        state = JOB_SUCCEEDED
+        logger.info(f"Job {job.job_id} succeeded. Stages (ms): {job.stages}")
+    else:
+        job.error = str(error)
+        state = JOB_FAILED
+        logger.error(f"Job {job.job_id} failed: {error}")
+    # finished_at must be set before the state flips, since pruning reads it for finished jobs
+    job.finished_at = datetime.now(timezone.utc)
+    job.state = state
+
+
+def _run_job(job, pipeline, args):
+    _start_job(job)
+    try:
+        pipeline(job, *args)
+    except Exception as e:
+        _finish_job(job, e)
+    else:
+        _finish_job(job)
+
+
+async def _run_async_job(job, pipeline, args):
+    async with _async_slots:
+        _start_job(job)
+        try:
+            await pipeline(job, *args)
+        except Exception as e:
+            _finish_job(job, e)
+        else:
+            _finish_job(job)
+
+
+def _register_job(description):
+    """
+    Create and register a queued job. Raises JobQueueFull if too many jobs are
+    already queued or running.
+    """
+    with _jobs_lock:
+        _prune_finished_jobs()
+        pending = sum(1 for job in _jobs.values() if not job.is_finished())
+        if pending >= JOB_WORKER_CONFIG["max_pending"]:
+            raise JobQueueFull(f"{pending} ingestion jobs are already pending")
+
+        job = IngestionJob(description)
+        _jobs[job.job_id] = job
+        return job
+
+
+def submit_job(description, pipeline, *args):
+    """
+    Queue `pipeline(job, *args)` on the ingestion worker pool and return the new job.
+    Raises JobQueueFull if too many jobs are already queued or running.
+    """
+    job = _register_job(description)
+    _executor.submit(_run_job, job, pipeline, args)
+    logger.info(f"Job {job.job_id} queued: {description}")
+    return job
+
+
+def submit_async_job(description, pipeline, *args):
+    """
+    Schedule the coroutine `pipeline(job, *args)` on the running event loop and return
+    the new job. At most max_workers async pipelines run at a time; the rest wait
+    queued. Raises JobQueueFull like submit_job.
+    """
+    global _async_slots
+    if _async_slots is None:
+        _async_slots = asyncio.Semaphore(JOB_WORKER_CONFIG["max_workers"])
+    job = _register_job(description)
+    task = asyncio.get_running_loop().create_task(_run_async_job(job, pipeline, args))
+    _async_tasks.add(task)
+    task.add_done_callback(_async_tasks.discard)
+    logger.info(f"Job {job.job_id} queued: {description}")
+    return job
+
+
+def get_job(job_id):
+    """Return the job with the given id, or None if it is unknown or has expired."""
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def shutdown_jobs():
+    """Stop accepting jobs and wait for running pipelines to finish."""
+    _executor.shutdown(wait=True)
+
+
+async def shutdown_async_jobs():
+    """Wait for queued and running async pipelines to finish."""
+    if _async_tasks:
+        await asyncio.gather(*_async_tasks, return_exceptions=True)
@@ -0,0 +1,58 @@
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: pip install orjson
+    orjson = None
+
+
+def _default(value):
+    """Encode the database types the JSON encoder does not handle by itself."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, memoryview)):
+        raise TypeError("Binary values are not JSON serializable; serve them from a content endpoint")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps_bytes(obj):
+        # orjson encodes UUID, date, datetime and time itself, in the same ISO format as _default
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(s):
+        return orjson.loads(s)
+else:
+    def dumps_bytes(obj):
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(s):
+        return json.loads(s)
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Flask JSON provider that serializes query results as they come from psycopg:
+    UUID as a string, date/datetime/time in ISO 8601 and Decimal as a string.
+    Uses orjson when it is installed and the standard library otherwise.
+
+    Install with app.json = FastJSONProvider(app); jsonify and request.get_json use it.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype="application/json")
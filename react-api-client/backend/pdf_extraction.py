@@ -0,0 +1,172 @@
+import io
+import logging
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from threading import Lock
+import pdfplumber  # For text extraction
+
+# Kept free of Flask and database imports: worker processes import this module,
+# and on Windows/macOS they are spawned rather than forked.
+
+logger = logging.getLogger(__name__)
+
+# PDF text extraction configuration
+PDF_EXTRACTION_CONFIG = {
+    "workers": os.cpu_count() or 1,  # Worker processes used for parallel extraction
+    "min_pages_for_parallel": 8,  # Smaller documents are extracted in-process
+    "chunks_per_worker": 4,  # More, smaller page ranges balance uneven pages across workers
+}
+
+_executors = {}  # Worker count -> process pool
+_executor_lock = Lock()
+
+
+def _get_executor(workers):
+    """
+    Return the process pool with `workers` workers, starting it on first use. Pools are
+    kept per worker count, so a caller asking for a different size never shuts down a
+    pool that other threads are still submitting to.
+    """
+    with _executor_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            executor = _executors[workers] = ProcessPoolExecutor(max_workers=workers)
+            logger.info(f"Started PDF extraction process pool with {workers} workers.")
+        return executor
+
+
+def shutdown_extraction_pool():
+    """Shut down every extraction process pool that was started."""
+    with _executor_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+
+def open_pdf(source):
+    """
+    Open a PDF with pdfplumber from a file path or from the document's bytes.
+    In-memory documents are read through a BytesIO over the same buffer.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return pdfplumber.open(io.BytesIO(source))
+    return pdfplumber.open(source)
+
+
+def split_page_ranges(page_count, chunk_count):
+    """
+    Split pages [0, page_count) into at most chunk_count contiguous (start, end) ranges.
+    """
+    chunk_count = max(1, min(chunk_count, page_count))
+    base, extra = divmod(page_count, chunk_count)
+    ranges = []
+    start = 0
+    for i in range(chunk_count):
+        end = start + base + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def extract_page_range(source, start, end):
+    """
+    Extract the text of pages [start, end) of a PDF. Runs inside a worker process,
+    so it opens the document itself from a path or bytes. Pages without text come back as None.
+    """
+    page_texts = []
+    with open_pdf(source) as pdf:
+        for i in range(start, end):
+            page = pdf.pages[i]
+            page_texts.append(page.extract_text())
+            page.close()  # Drop the page's cached layout objects
+    return page_texts
+
+
+def iter_pdf_page_texts(source, workers=None, offload=False):
+    """
+    Yield the extracted text of each page, in page order, as soon as it is available.
+    `source` is a file path or the document's bytes.
+
+    Documents with at least min_pages_for_parallel pages are split into page ranges
+    that run across a process pool of `workers` processes (default from
+    PDF_EXTRACTION_CONFIG). Only a window of 2 * workers ranges is in flight at
+    once, so memory use does not grow with the document; a document given as bytes
+    is written once to a temporary file that the workers read. Pass workers=1 to force
+    in-process extraction. With offload=True every document goes through the
+    process pool, however small and whatever the worker count, so no extraction
+    runs in the calling process (the ASGI app's, which its event loop shares).
+    """
+    workers = workers or PDF_EXTRACTION_CONFIG["workers"]
+
+    with open_pdf(source) as pdf:
+        page_count = len(pdf.pages)
+        if not offload and (workers <= 1 or page_count < PDF_EXTRACTION_CONFIG["min_pages_for_parallel"]):
+            for page in pdf.pages:
+                yield page.extract_text()
+                page.close()  # Drop the page's cached layout objects
+            return
+
+    ranges = split_page_ranges(page_count, workers * PDF_EXTRACTION_CONFIG["chunks_per_worker"])
+    logger.info(f"Extracting {page_count} pages in {len(ranges)} ranges across {workers} workers.")
+
+    spool_path = None
+    in_flight = deque()
+    try:
+        # Tasks are pickled to the workers, so an in-memory document is written to disk once
+        # and every task gets the path rather than its own copy of the bytes
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            with tempfile.NamedTemporaryFile(prefix='extract-', suffix='.pdf', delete=False) as spool_file:
+                spool_path = spool_file.name
+                spool_file.write(source)
+            source = spool_path
+
+        executor = _get_executor(workers)
+        remaining_ranges = iter(ranges)
+        in_flight.extend(
+            executor.submit(extract_page_range, source, start, end)
+            for start, end in islice(remaining_ranges, workers * 2)
+        )
+
+        # Consume in submission order so pages come back in document order
+        while in_flight:
+            page_texts = in_flight.popleft().result()
+            next_range = next(remaining_ranges, None)
+            if next_range is not None:
+                in_flight.append(executor.submit(extract_page_range, source, *next_range))
+            yield from page_texts
+    finally:
+        # Stopped early (error or abandoned iterator): ranges not started yet are dropped
+        for future in in_flight:
+            future.cancel()
+        if spool_path:
+            try:
+                os.remove(spool_path)
+            except FileNotFoundError:
+                pass
+
+
+def extract_pdf_page_texts(source, workers=None):
+    """
+    Return the extracted text of every page, in page order.
+    """
+    return list(iter_pdf_page_texts(source, workers))
+
+
+def iter_text_lines(page_texts):
+    """
+    Yield the lines of each page text in turn, skipping pages without text.
+    """
+    for text in page_texts:
+        if text:
+            yield from text.split('\n')
+
+
+def extract_pdf_text(source, workers=None):
+    """
+    Return the text of the whole PDF, one newline-terminated block per page that has text.
+    """
+    return ''.join(text + '\n' for text in iter_pdf_page_texts(source, workers) if text)
@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from threading import Lock
+from db import get_connection, get_async_connection
+
+logger = logging.getLogger(__name__)
+
+# Reference tables change only at deploy time, so they are read once and served from memory
+REFERENCE_DATA_CONFIG = {
+    "ttl_seconds": 300,  # How long a loaded table is served before it is read again
+    "browser_max_age_seconds": 60,  # Cache-Control max-age on the reference data endpoints
+}
+
+ENRICHMENT_VALUE_TEXT = "text"
+ENRICHMENT_VALUE_BOOLEAN = "boolean"
+
+# Table name -> (query, id column). Ids are read as text so request values can be looked up directly.
+REFERENCE_QUERIES = {
+    "import_types": (
+        "SELECT import_type_id::text AS import_type_id, type_name, description FROM ImportType",
+        "import_type_id",
+    ),
+    "enrichment_types": (
+        """
+        SELECT enrichment_type_id::text AS enrichment_type_id, type_name, description, value_type
+        FROM EnrichmentType
+        """,
+        "enrichment_type_id",
+    ),
+}
+
+
+class ReferenceSnapshot:
+    """
+    One loaded copy of a reference table: its rows (dicts, in query order), the
+    same rows indexed by id, and an ETag derived from the content.
+    """
+
+    def __init__(self, rows, id_column):
+        self.rows = rows
+        self.by_id = {row[id_column]: row for row in rows}
+        self.etag = hashlib.sha256(json.dumps(rows, sort_keys=True, default=str).encode()).hexdigest()[:32]
+        self.loaded_at = time.monotonic()
+
+    def is_fresh(self):
+        return time.monotonic() - self.loaded_at < REFERENCE_DATA_CONFIG["ttl_seconds"]
+
+
+_snapshots = {}
+_load_locks = {name: Lock() for name in REFERENCE_QUERIES}
+# asyncio locks are created on first use, on the event loop of the ASGI app
+_async_load_locks = {}
+
+
+def _build_snapshot(name, description, rows):
+    columns = [desc[0] for desc in description]
+    rows = [dict(zip(columns, row)) for row in rows]
+    logger.info(f"Loaded {len(rows)} rows of reference data '{name}'.")
+    return ReferenceSnapshot(rows, REFERENCE_QUERIES[name][1])
+
+
+def _load_snapshot(name):
+    query, _ = REFERENCE_QUERIES[name]
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            return _build_snapshot(name, cursor.description, cursor.fetchall())
+
+
+async def _load_snapshot_async(name):
+    query, _ = REFERENCE_QUERIES[name]
+    async with get_async_connection() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query)
+            return _build_snapshot(name, cursor.description, await cursor.fetchall())
+
+
+def get_reference_data(name):
+    """
+    Return the cached ReferenceSnapshot for a REFERENCE_QUERIES table, reading it
+    from the database if it is missing or older than ttl_seconds. Only one thread
+    reloads a table at a time. If a reload fails while an expired copy exists,
+    that copy keeps being served and the reload is retried on the next call.
+    """
+    snapshot = _snapshots.get(name)
+    if snapshot is not None and snapshot.is_fresh():
+        return snapshot
+
+    with _load_locks[name]:
+        snapshot = _snapshots.get(name)
+        if snapshot is not None and snapshot.is_fresh():
+            return snapshot
+        try:
+            snapshot = _load_snapshot(name)
+        except Exception as e:
+            if snapshot is None:
+                raise
+            logger.warning(f"Reloading reference data '{name}' failed, serving the cached copy: {e}")
+            return snapshot
+        _snapshots[name] = snapshot
+        return snapshot
+
+
+async def get_reference_data_async(name):
+    """
+    The async counterpart of get_reference_data(), for the ASGI app. It shares the
+    cache with get_reference_data(); only one task reloads a table at a time.
+    """
+    snapshot = _snapshots.get(name)
+    if snapshot is not None and snapshot.is_fresh():
+        return snapshot
+
+    lock = _async_load_locks.setdefault(name, asyncio.Lock())
+    async with lock:
+        snapshot = _snapshots.get(name)
+        if snapshot is not None and snapshot.is_fresh():
+            return snapshot
+        try:
+            snapshot = await _load_snapshot_async(name)
+        except Exception as e:
+            if snapshot is None:
+                raise
+            logger.warning(f"Reloading reference data '{name}' failed, serving the cached copy: {e}")
+            return snapshot
+        _snapshots[name] = snapshot
+        return snapshot
+
+
+def invalidate_reference_data(name=None):
+    """
+    Drop the cached copy of one table (or all of them) so the next call reads it
+    again. Call after changing ImportType or EnrichmentType.
+    """
+    names = [name] if name is not None else list(REFERENCE_QUERIES)
+    for table in names:
+        with _load_locks[table]:
+            _snapshots.pop(table, None)
+    logger.info(f"Invalidated reference data: {', '.join(names)}")
+
+
+def get_import_type(import_type_id):
+    """Return the ImportType row for an id, or None if there is no such type."""
+    return get_reference_data("import_types").by_id.get(str(import_type_id))
+
+
+def get_enrichment_type(enrichment_type_id):
+    """Return the EnrichmentType row for an id, or None if there is no such type."""
+    return get_reference_data("enrichment_types").by_id.get(str(enrichment_type_id))
@@ -20,6 +20,7 @@ DB_USER = "app_user"
 TABLES = [ 
     "TemporaryEnrichmentData",
     "TemporaryDischarge",
+    "RawDataImportSummary",
     "AuditLog",
     "Review",
     "DischargeProvider",
@@ -30,6 +31,7 @@ TABLES = [
     "Discharge",
     "Epic",
     "RawDataIngested",
+    "RawDocument",
     "ProviderProviderType",
     "Provider",
     "ProviderType",
@@ -44,7 +46,8 @@ TABLES = [
     "EnrichmentTypes",
     "RawDataIngestedAudit",
     "TemporaryEnrichmentDataAudit",
-    "TemporaryDischargeAudit"
+    "TemporaryDischargeAudit",
+    "SchemaMigration"
 ]
 
 
@@ -0,0 +1,370 @@
+import json
+import pytest
+import psycopg
+from psycopg import sql
+from db import DB_CONFIG
+from init_db import SUPERUSER_USER, SUPERUSER_PASSWORD
+from reference_data import REFERENCE_QUERIES
+from document_store import EXISTS_SQL, INFO_SQL, READ_CHUNK_SQL
+from api_common import (
+    REVIEW_VERSION_SQL, DISCHARGE_VERSION_SQL, REVIEW_PAYLOAD_SQL, DISCHARGE_SQL, DISCHARGE_ENRICHMENT_SQL,
+    FIND_RAW_DATA_BY_HASH_SQL, MARK_IMPORT_FAILED_SQL, FETCH_DISCHARGE_RECORD_SQL, APPROVE_DISCHARGE_SQL,
+    APPROVE_DISCHARGES_SQL, APPROVAL_CANDIDATES_BY_IMPORT_SQL, APPROVAL_CANDIDATES_BY_ID_SQL,
+    LOCK_APPROVAL_CHUNK_SQL, REJECT_DISCHARGE_SQL, STORED_DISCHARGE_FOR_UPDATE_SQL, ENRICHMENT_UPSERT_SQL,
+    RAW_DATA_SOURCE_SQL, build_raw_data_query, encode_raw_data_cursor, update_discharge_query,
+    enrichment_upsert_params,
+)
+
+# EXPLAINs the queries the backend issues, taken from the modules that issue them, against
+# seeded data, and fails on any plan that contains a sequential scan. The statements inside
+# f_approve_discharges and f_approve_discharge are checked through auto_explain.
+#
+#   python -m pytest test_query_plans.py
+#
+# Everything happens in one transaction that is rolled back, so it is safe to point at a
+# development database created by init_db.py. It connects as the superuser configured in
+# init_db.py, because only a superuser can load auto_explain; without a reachable database
+# the tests are skipped. The planner runs with enable_seqscan = off: a Seq Scan that
+# survives that setting means no index can serve the query.
+#
+# When adding a query to the backend, add it to QUERY_PLAN_CHECKS or RAW_DATA_QUERY_CHECKS.
+
+SEED_IMPORTS = 2000
+SEED_DISCHARGES_PER_IMPORT = 10
+SEED_PATIENTS = 20000
+SEED_STATEMENT_TIMEOUT = "30s"
+SEED_LOCK_TIMEOUT = "5s"
+
+ADMIN_USER_ID = "77118899-1111-1111-1111-111111111111"
+IMPORT_TYPE_ID = "11111111-1111-1111-1111-111111111111"
+PHONE_TYPE_ENRICHMENT_ID = "add1ed02-dc4e-460a-b3e1-9b9a160ab2b2"
+PHONE_STATUS_ENRICHMENT_ID = "eeb9f5b4-15e3-4ac2-a4b4-5c7c7f92b717"
+ATTENDING_PROVIDER_TYPE_ID = "47b4d1f9-60fc-4ec4-aab4-7c94b9cd5290"
+
+# Small reference tables that some queries read whole on purpose
+WHOLE_TABLE_READS = {"importtype", "enrichmenttype"}
+
+# GET /raw-data?file_name= has to be served by this index, not by filtering the newest imports
+FILE_NAME_SEARCH_INDEX = "idx_rawdataingested_source_file_name_trgm"
+
+# GET /raw-data?status= has to be served by this index when few imports have the status
+STATUS_FILTER_INDEX = "idx_rawdataimportsummary_status_created_at_id"
+
+APPROVE_DISCHARGES_COUNT = 5
+
+SEED_SQL = """
+INSERT INTO RawDocument (content_hash, content_size, stored_size, compression, stored_content)
+SELECT encode(sha256(('plan-check-' || g)::bytea), 'hex'), 1, 1, 'none', decode('00', 'hex')
+FROM generate_series(1, %(imports)s) g;
+
+INSERT INTO RawDataIngested (source_file_name, content_hash, content_size, import_type_id, created_by, updated_by, created_at)
+SELECT 'plan-check-' || g || '.pdf', encode(sha256(('plan-check-' || g)::bytea), 'hex'), 1,
+       %(import_type_id)s, %(user_id)s, %(user_id)s, CURRENT_TIMESTAMP - g * INTERVAL '1 minute'
+FROM generate_series(1, %(imports)s) g;
+
+INSERT INTO TemporaryDischarge (name, epic_id, phone_number, attending_physician, date, primary_care_provider,
+                                insurance, disposition, raw_data_id, status, hospital_name, created_by, updated_by)
+SELECT 'Plan Check Patient ' || r.n || '-' || g, 'EP' || (r.n * 100 + g), '404-727-1234', 'Doctor ' || (g %% 50),
+       '07-04-2023', 'Provider ' || (g %% 80), 'BCBS', 'Home', r.raw_data_id,
+       CASE WHEN g %% 3 = 0 THEN 'Approved' ELSE 'Pending' END, 'Hospital ' || (r.n %% 20), %(user_id)s, %(user_id)s
+FROM (
+    SELECT raw_data_id, row_number() OVER () AS n
+    FROM RawDataIngested
+    WHERE source_file_name LIKE 'plan-check-%%'
+) r
+CROSS JOIN generate_series(1, %(discharges_per_import)s) g;
+
+INSERT INTO TemporaryEnrichmentData (temp_discharge_id, enrichment_type_id, enrichment_value, created_by, updated_by)
+SELECT td.temp_discharge_id, et.enrichment_type_id, 'Mobile', %(user_id)s, %(user_id)s
+FROM TemporaryDischarge td
+CROSS JOIN (VALUES (%(phone_type_id)s::uuid), (%(phone_status_id)s::uuid)) et(enrichment_type_id)
+WHERE td.name LIKE 'Plan Check Patient %%';
+
+INSERT INTO Patient (patient_id, full_name)
+SELECT md5('plan-check-patient-' || g)::uuid, 'Plan Check Patient ' || g FROM generate_series(1, %(patients)s) g;
+
+INSERT INTO Epic (epic_id, epic_identifier, patient_id)
+SELECT md5('plan-check-epic-' || g)::uuid, 'PLANCHECK' || g, md5('plan-check-patient-' || g)::uuid
+FROM generate_series(1, %(patients)s) g;
+
+INSERT INTO Discharge (discharge_id, epic_id, discharge_date, disposition)
+SELECT md5('plan-check-discharge-' || g)::uuid, md5('plan-check-epic-' || g)::uuid, DATE '2023-07-04', 'Home'
+FROM generate_series(1, %(patients)s) g;
+
+INSERT INTO PatientPhone (patient_id, phone_number, phone_validation_status, phone_type)
+SELECT md5('plan-check-patient-' || g)::uuid, '404-727-1234', 'Valid', 'Mobile' FROM generate_series(1, %(patients)s) g;
+
+INSERT INTO Provider (provider_id, name)
+SELECT md5('plan-check-provider-' || g)::uuid, 'Plan Check Provider ' || g FROM generate_series(1, %(patients)s / 10) g;
+
+INSERT INTO ProviderProviderType (provider_provider_type_id, provider_id, provider_type_id)
+SELECT md5('plan-check-ppt-' || g)::uuid, md5('plan-check-provider-' || g)::uuid, %(provider_type_id)s
+FROM generate_series(1, %(patients)s / 10) g;
+
+INSERT INTO DischargeProvider (discharge_id, provider_provider_type_id)
+SELECT md5('plan-check-discharge-' || g)::uuid, md5('plan-check-ppt-' || (1 + g %% (%(patients)s / 10)))::uuid
+FROM generate_series(1, %(patients)s) g;
+
+INSERT INTO Insurance (insurance_id, insurance_name)
+SELECT md5('plan-check-insurance-' || g)::uuid, 'Plan Check Insurance ' || g FROM generate_series(1, %(patients)s / 40) g;
+
+INSERT INTO Hospital (hospital_id, hospital_name)
+SELECT md5('plan-check-hospital-' || g)::uuid, 'Plan Check Hospital ' || g FROM generate_series(1, %(patients)s / 40) g;
+
+INSERT INTO EpicInsurance (epic_id, insurance_id)
+SELECT md5('plan-check-epic-' || g)::uuid, md5('plan-check-insurance-1')::uuid FROM generate_series(1, %(patients)s) g;
+
+INSERT INTO EpicHospital (epic_id, hospital_id)
+SELECT md5('plan-check-epic-' || g)::uuid, md5('plan-check-hospital-1')::uuid FROM generate_series(1, %(patients)s) g;
+"""
+
+SEEDED_TABLES = [
+    "RawDocument", "RawDataIngested", "RawDataImportSummary", "TemporaryDischarge", "TemporaryEnrichmentData",
+    "Patient", "Epic", "Discharge", "PatientPhone", "Provider", "ProviderProviderType", "DischargeProvider",
+    "Insurance", "Hospital", "EpicInsurance", "EpicHospital",
+    "TemporaryDischargeAudit", "TemporaryEnrichmentDataAudit", "RawDataIngestedAudit",
+]
+
+IDS_SQL = """
+SELECT r.raw_data_id, r.content_hash, r.created_at, td.temp_discharge_id
+FROM RawDataIngested r
+JOIN TemporaryDischarge td ON td.raw_data_id = r.raw_data_id
+WHERE r.source_file_name = 'plan-check-100.pdf'
+LIMIT 1
+"""
+
+PENDING_IDS_SQL = """
+SELECT td.temp_discharge_id
+FROM RawDataIngested r
+JOIN TemporaryDischarge td ON td.raw_data_id = r.raw_data_id
+WHERE r.source_file_name = 'plan-check-200.pdf' AND td.status = 'Pending'
+LIMIT %s
+"""
+
+# (name, query, params). params takes the ids dict of the seeded_ids fixture.
+QUERY_PLAN_CHECKS = [
+    *[
+        (f"reference_data: {name}", query, lambda ids: ())
+        for name, (query, _) in REFERENCE_QUERIES.items()
+    ],
+    ("find_raw_data_by_hash", FIND_RAW_DATA_BY_HASH_SQL, lambda ids: (ids["content_hash"], IMPORT_TYPE_ID)),
+    ("mark_import_failed", MARK_IMPORT_FAILED_SQL, lambda ids: (ids["raw_data_id"],)),
+    ("store_document: exists", EXISTS_SQL, lambda ids: (ids["content_hash"],)),
+    ("get_document_info", INFO_SQL, lambda ids: (ids["content_hash"],)),
+    ("iter_stored_document", READ_CHUNK_SQL, lambda ids: (1, 262144, ids["content_hash"])),
+    ("get_review_version", REVIEW_VERSION_SQL, lambda ids: (ids["raw_data_id"],)),
+    ("get_review_data", REVIEW_PAYLOAD_SQL, lambda ids: (ids["raw_data_id"],)),
+    ("approve_discharges: validate import", APPROVAL_CANDIDATES_BY_IMPORT_SQL, lambda ids: (ids["raw_data_id"],)),
+    ("approve_discharges: validate ids", APPROVAL_CANDIDATES_BY_ID_SQL, lambda ids: ([ids["temp_discharge_id"]],)),
+    ("approve_discharges: lock chunk", LOCK_APPROVAL_CHUNK_SQL, lambda ids: ([ids["temp_discharge_id"]],)),
+    ("fetch_discharge_record", FETCH_DISCHARGE_RECORD_SQL, lambda ids: (ids["temp_discharge_id"],)),
+    ("reject_discharge", REJECT_DISCHARGE_SQL, lambda ids: (ADMIN_USER_ID, ids["temp_discharge_id"])),
+    ("get_discharge_version", DISCHARGE_VERSION_SQL, lambda ids: (ids["temp_discharge_id"],)),
+    ("get_discharge: discharge", DISCHARGE_SQL, lambda ids: (ids["temp_discharge_id"],)),
+    ("get_discharge: enrichment", DISCHARGE_ENRICHMENT_SQL, lambda ids: (ids["temp_discharge_id"],)),
+    ("update_discharge: stored row", STORED_DISCHARGE_FOR_UPDATE_SQL, lambda ids: (ids["temp_discharge_id"],)),
+    ("update_discharge: discharge", update_discharge_query({"name": "Plan Check"}),
+     lambda ids: ("Plan Check", ids["temp_discharge_id"])),
+    ("update_discharge: upsert enrichment", ENRICHMENT_UPSERT_SQL, lambda ids: enrichment_upsert_params(
+        ids["temp_discharge_id"], {"created_by": ADMIN_USER_ID, "updated_by": ADMIN_USER_ID},
+        {PHONE_TYPE_ENRICHMENT_ID: "Mobile"},
+    )),
+    ("get_raw_data_content", RAW_DATA_SOURCE_SQL, lambda ids: (ids["raw_data_id"],)),
+    # Foreign key checks that run when audited rows or users are deleted
+    ("audit fk: temporary discharge", "SELECT 1 FROM TemporaryDischargeAudit WHERE temp_discharge_id = %s",
+     lambda ids: (ids["temp_discharge_id"],)),
+    ("audit fk: enrichment data", "SELECT 1 FROM TemporaryEnrichmentDataAudit WHERE enrichment_data_id = %s",
+     lambda ids: (ids["temp_discharge_id"],)),
+    ("audit fk: raw data", "SELECT 1 FROM RawDataIngestedAudit WHERE raw_data_id = %s", lambda ids: (ids["raw_data_id"],)),
+    ("audit fk: users", """
+        SELECT 1 FROM TemporaryDischargeAudit WHERE changed_by = %(user_id)s
+        UNION ALL SELECT 1 FROM TemporaryEnrichmentDataAudit WHERE changed_by = %(user_id)s
+        UNION ALL SELECT 1 FROM RawDataIngestedAudit WHERE action_user = %(user_id)s
+    """, lambda ids: {"user_id": ADMIN_USER_ID}),
+]
+
+# (name, GET /raw-data query parameters). The query is built by build_raw_data_query.
+RAW_DATA_QUERY_CHECKS = [
+    ("first page", lambda ids: {}),
+    ("next page by import type", lambda ids: {
+        "import_type_id": IMPORT_TYPE_ID,
+        "cursor": encode_raw_data_cursor(ids["created_at"], ids["raw_data_id"]),
+    }),
+    ("pending imports", lambda ids: {"status": "pending"}),
+    ("reviewed imports in a date range", lambda ids: {
+        "status": "reviewed",
+        "start_date": "2020-01-01T00:00:00",
+        "end_date": ids["created_at"].isoformat(),
+    }),
+    ("next page of empty imports", lambda ids: {
+        "status": "empty",
+        "cursor": encode_raw_data_cursor(ids["created_at"], ids["raw_data_id"]),
+    }),
+    ("file name search", lambda ids: {"file_name": "check-100"}),
+]
+
+
+def find_plan_nodes(plan):
+    """Yield every node of an EXPLAIN (FORMAT JSON) plan tree."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from find_plan_nodes(child)
+
+
+def find_seq_scans(plan):
+    """Return the relation names of the Seq Scan nodes in a plan tree, except WHOLE_TABLE_READS."""
+    return [
+        node.get("Relation Name", "?") for node in find_plan_nodes(plan)
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name", "?").lower() not in WHOLE_TABLE_READS
+    ]
+
+
+def explain(cursor, query, params):
+    """The root plan node of query, planned with params."""
+    if not isinstance(query, sql.Composable):
+        query = sql.SQL(query)
+    cursor.execute(sql.SQL("EXPLAIN (FORMAT JSON) ") + query, params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+@pytest.fixture(scope="module")
+def plan_cursor():
+    """
+    A cursor on the development database with the plan-check data seeded and
+    enable_seqscan off. Parameters are bound client side, so each query is planned
+    with its actual values. Everything is rolled back afterwards.
+    """
+    try:
+        conn = psycopg.connect(
+            **{**DB_CONFIG, "user": SUPERUSER_USER, "password": SUPERUSER_PASSWORD},
+            cursor_factory=psycopg.ClientCursor,
+        )
+    except psycopg.OperationalError as e:
+        pytest.skip(f"No development database to check query plans against: {e}")
+    try:
+        with conn.cursor() as cursor:
+            seed_params = {
+                "imports": SEED_IMPORTS,
+                "discharges_per_import": SEED_DISCHARGES_PER_IMPORT,
+                "patients": SEED_PATIENTS,
+                "import_type_id": IMPORT_TYPE_ID,
+                "user_id": ADMIN_USER_ID,
+                "phone_type_id": PHONE_TYPE_ENRICHMENT_ID,
+                "phone_status_id": PHONE_STATUS_ENRICHMENT_ID,
+                "provider_type_id": ATTENDING_PROVIDER_TYPE_ID,
+            }
+            # Fail instead of hanging, e.g. behind the locks of an interrupted earlier run
+            cursor.execute(f"SET LOCAL statement_timeout = '{SEED_STATEMENT_TIMEOUT}'")
+            cursor.execute(f"SET LOCAL lock_timeout = '{SEED_LOCK_TIMEOUT}'")
+            # Set before seeding, so that the foreign key checks the seed fires are planned
+            # on their indexes even where a bloated table's statistics make it look empty
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            # Parameterized statements have to be sent one at a time
+            for statement in SEED_SQL.split(";\n\n"):
+                if statement.strip():
+                    cursor.execute(statement, seed_params)
+            for table in SEEDED_TABLES:
+                cursor.execute(f"ANALYZE {table}")
+            cursor.execute("SET LOCAL statement_timeout = 0")
+            yield cursor
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+@pytest.fixture(scope="module")
+def seeded_ids(plan_cursor):
+    """Ids of seeded rows to plan the queries with."""
+    plan_cursor.execute(IDS_SQL)
+    raw_data_id, content_hash, created_at, temp_discharge_id = plan_cursor.fetchone()
+    plan_cursor.execute(PENDING_IDS_SQL, (APPROVE_DISCHARGES_COUNT + 1,))
+    pending_ids = [row[0] for row in plan_cursor.fetchall()]
+    return {
+        "raw_data_id": raw_data_id,
+        "content_hash": content_hash,
+        "created_at": created_at,
+        "temp_discharge_id": temp_discharge_id,
+        "pending_ids": pending_ids,
+    }
+
+
+@pytest.mark.parametrize("name, query, params", QUERY_PLAN_CHECKS, ids=[check[0] for check in QUERY_PLAN_CHECKS])
+def test_query_uses_indexes(plan_cursor, seeded_ids, name, query, params):
+    with plan_cursor.connection.transaction():
+        plan = explain(plan_cursor, query, params(seeded_ids))
+    assert not find_seq_scans(plan), f"{name}: sequential scan on {', '.join(find_seq_scans(plan))}"
+
+
+@pytest.mark.parametrize("name, args", RAW_DATA_QUERY_CHECKS, ids=[check[0] for check in RAW_DATA_QUERY_CHECKS])
+def test_raw_data_query_uses_indexes(plan_cursor, seeded_ids, name, args):
+    query, params, _ = build_raw_data_query(args(seeded_ids))
+    with plan_cursor.connection.transaction():
+        plan = explain(plan_cursor, query, params)
+    assert not find_seq_scans(plan), f"{name}: sequential scan on {', '.join(find_seq_scans(plan))}"
+
+
+def test_file_name_search_uses_trigram_index(plan_cursor, seeded_ids):
+    query, params, _ = build_raw_data_query({"file_name": "check-100"})
+    with plan_cursor.connection.transaction():
+        plan = explain(plan_cursor, query, params)
+    index_names = {node.get("Index Name") for node in find_plan_nodes(plan)}
+    assert FILE_NAME_SEARCH_INDEX in index_names, f"file name search does not use {FILE_NAME_SEARCH_INDEX}"
+
+
+@pytest.mark.parametrize("status", ["empty", "reviewed"])
+def test_status_filter_uses_summary_index(plan_cursor, seeded_ids, status):
+    # No seeded import is empty or fully reviewed, as in a list that is mostly pending
+    query, params, _ = build_raw_data_query({"status": status})
+    with plan_cursor.connection.transaction():
+        plan = explain(plan_cursor, query, params)
+    index_names = {node.get("Index Name") for node in find_plan_nodes(plan)}
+    assert STATUS_FILTER_INDEX in index_names, f"status={status} does not use {STATUS_FILTER_INDEX}"
+
+
+def test_approval_functions_use_indexes(plan_cursor, seeded_ids):
+    """
+    Approve seeded discharges with auto_explain reporting the plan of every statement
+    run inside f_approve_discharges and f_approve_discharge, including trigger statements.
+    """
+    conn = plan_cursor.connection
+    plans = []
+
+    def collect_plan(diagnostic):
+        message = diagnostic.message_primary or ""
+        if "plan:" in message:
+            plans.append(json.loads(message.split("plan:", 1)[1]))
+
+    try:
+        with conn.transaction():
+            plan_cursor.execute("LOAD 'auto_explain'")
+    except psycopg.errors.UndefinedFile:
+        pytest.skip("auto_explain is not installed on this PostgreSQL server")
+
+    approve_ids = seeded_ids["pending_ids"][:APPROVE_DISCHARGES_COUNT]
+    single_id = seeded_ids["pending_ids"][APPROVE_DISCHARGES_COUNT]
+    conn.add_notice_handler(collect_plan)
+    try:
+        with conn.transaction():
+            plan_cursor.execute("SET LOCAL auto_explain.log_min_duration = 0")
+            plan_cursor.execute("SET LOCAL auto_explain.log_nested_statements = on")
+            plan_cursor.execute("SET LOCAL auto_explain.log_format = 'json'")
+            plan_cursor.execute("SET LOCAL client_min_messages = log")
+            plan_cursor.execute(APPROVE_DISCHARGES_SQL, (approve_ids,))
+            assert plan_cursor.fetchone()[0] == len(approve_ids)
+            plan_cursor.execute(APPROVE_DISCHARGE_SQL, (single_id,))
+            # Stop reporting before the savepoint is released
+            plan_cursor.execute("SET LOCAL auto_explain.log_min_duration = -1")
+    finally:
+        conn.remove_notice_handler(collect_plan)
+
+    assert any("INSERT INTO Patient" in plan["Query Text"] for plan in plans), (
+        "auto_explain did not report the statements inside f_approve_discharges"
+    )
+    failures = [
+        f"{' '.join(plan['Query Text'].split())[:80]}: sequential scan on {', '.join(find_seq_scans(plan['Plan']))}"
+        for plan in plans if find_seq_scans(plan["Plan"])
+    ]
+    assert not failures, "\n".join(failures)
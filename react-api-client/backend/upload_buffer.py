@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Uploads larger than this are spooled to a temporary file instead of kept in memory
+UPLOAD_SPOOL_THRESHOLD = 32 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadedDocument:
+    """
+    An uploaded file read exactly once. Small files are held in memory as bytes;
+    files above UPLOAD_SPOOL_THRESHOLD are spooled to a temporary file. Either way
+    the content hash is computed during that single read.
+    """
+
+    def __init__(self, filename, content_hash, size, content=None, spool_path=None):
+        self.filename = filename
+        self.content_hash = content_hash
+        self.size = size
+        self.content = content
+        self.spool_path = spool_path
+
+    @property
+    def source(self):
+        """What to hand to pdfplumber: the bytes, or the spool file's path."""
+        return self.content if self.content is not None else self.spool_path
+
+    def read_bytes(self):
+        """Return the whole document. Free for in-memory uploads; one read for spooled ones."""
+        if self.content is not None:
+            return self.content
+        with open(self.spool_path, 'rb') as spool_file:
+            return spool_file.read()
+
+    def iter_chunks(self, chunk_size=UPLOAD_CHUNK_SIZE):
+        """Yield the document in chunks of at most chunk_size bytes without copying it whole."""
+        if self.content is not None:
+            view = memoryview(self.content)
+            for offset in range(0, len(view), chunk_size):
+                yield view[offset:offset + chunk_size]
+            return
+        with open(self.spool_path, 'rb') as spool_file:
+            while True:
+                chunk = spool_file.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def cleanup(self):
+        """Release the buffer and delete the spool file, if any."""
+        self.content = None
+        if self.spool_path:
+            try:
+                os.remove(self.spool_path)
+            except FileNotFoundError:
+                pass
+            self.spool_path = None
+
+
+def read_upload(file, filename, spool_threshold=UPLOAD_SPOOL_THRESHOLD):
+    """
+    Read a werkzeug FileStorage once, hashing it as it is read, and return an UploadedDocument.
+    """
+    content_hash = hashlib.sha256()
+    chunks = []
+    size = 0
+    spool_file = None
+
+    try:
+        while True:
+            chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            content_hash.update(chunk)
+            size += len(chunk)
+
+            if spool_file is None and size > spool_threshold:
+                # Too big to keep in memory: move what we have so far to disk
+                spool_file = tempfile.NamedTemporaryFile(prefix='upload-', suffix='.pdf', delete=False)
+                logger.info(f"Spooling upload {filename} to {spool_file.name} (over {spool_threshold} bytes).")
+                spool_file.writelines(chunks)
+                chunks = []
+
+            if spool_file is not None:
+                spool_file.write(chunk)
+            else:
+                chunks.append(chunk)
+    except Exception:
+        if spool_file is not None:
+            spool_file.close()
+            os.remove(spool_file.name)
+        raise
+
+    if spool_file is not None:
+        spool_file.close()
+        return UploadedDocument(filename, content_hash.hexdigest(), size, spool_path=spool_file.name)
+
+    content = chunks[0] if len(chunks) == 1 else b''.join(chunks)
+    return UploadedDocument(filename, content_hash.hexdigest(), size, content=content)
@@ -0,0 +1,84 @@
+from collections import deque
+
+
+class VocabularyMatcher:
+    """
+    Aho-Corasick automaton over a fixed list of terms.
+
+    find_longest scans the text once, whatever the vocabulary size, and returns
+    the longest term found anywhere in it (the leftmost one on a tie). The result
+    does not depend on the order of the term list, so "Home with Follow-up" wins
+    over "Home". Matching is case-sensitive.
+    """
+
+    def __init__(self, terms):
+        self.terms = list(dict.fromkeys(term for term in terms if term))
+        # Node 0 is the root. For each node: outgoing edges, failure link, the term
+        # ending exactly at the node, and the nearest term-ending proper suffix node.
+        self._goto = [{}]
+        self._fail = [0]
+        self._term = [None]
+        self._output = [0]
+
+        for term in self.terms:
+            node = 0
+            for char in term:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._term.append(None)
+                    self._output.append(0)
+                node = next_node
+            self._term[node] = term
+
+        # Breadth-first so every failure target is finished before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._output[child] = fail if self._term[fail] else self._output[fail]
+                queue.append(child)
+
+        # Longest term ending at each node: its own term, else its output link's
+        self._longest = [term or self._term[self._output[node]] for node, term in enumerate(self._term)]
+        self._longest_length = [len(term) if term else 0 for term in self._longest]
+        # Full (goto + failure) transitions, filled in lazily as characters are seen
+        self._delta = [dict(edges) for edges in self._goto]
+
+    def _transition(self, node, char):
+        """Follow failure links from node for char and memoize the resulting state."""
+        state = node
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+        next_node = self._goto[state].get(char, 0)
+        self._delta[node][char] = next_node
+        return next_node
+
+    def find_longest(self, text):
+        """
+        Return the longest vocabulary term that occurs in text, or None.
+        """
+        delta = self._delta
+        longest_length = self._longest_length
+
+        best_node = 0
+        best_length = 0
+        node = 0
+        for char in text:
+            next_node = delta[node].get(char, -1)
+            node = next_node if next_node >= 0 else self._transition(node, char)
+            if longest_length[node] > best_length:
+                best_node = node
+                best_length = longest_length[node]
+        return self._longest[best_node] if best_length else None
+
+    def __len__(self):
+        return len(self.terms)
@@ -7,6 +7,7 @@ interface EnrichmentType {
   enrichment_type_id: string;
   type_name: string;
   description: string;
+  value_type: "text" | "boolean";
 }
 
 interface EnrichmentData {
@@ -189,10 +190,7 @@ const EditPage: React.FC = () => {
     enrichmentTypes.forEach((etype) => {
       const enrichment = formData.enrichmentData.find((ed) => ed.enrichment_type_id === etype.enrichment_type_id);
       if (enrichment && enrichment.enrichment_value && enrichment.enrichment_value !== "--select--") {
-        if (
-          etype.enrichment_type_id === "c8f7629d-38ec-4506-93b8-c2a9a08b3b65" ||
-          etype.enrichment_type_id === "2a8760cb-505b-4c6f-a0b0-2a4d87fe8850"
-        ) {
+        if (etype.value_type === "boolean") {
           // Expecting boolean values
           if (enrichment.enrichment_value !== "true" && enrichment.enrichment_value !== "false") {
             errors[`enrichment_${etype.enrichment_type_id}`] = `${etype.type_name} must be true or false.`;
@@ -341,9 +339,7 @@ const EditPage: React.FC = () => {
             );
 
             // Determine if the enrichment type requires a true/false dropdown
-            const isTrueFalseDropdown =
-              etype.enrichment_type_id === "c8f7629d-38ec-4506-93b8-c2a9a08b3b65" ||
-              etype.enrichment_type_id === "2a8760cb-505b-4c6f-a0b0-2a4d87fe8850";
+            const isTrueFalseDropdown = etype.value_type === "boolean";
 
             return (
               <div key={etype.enrichment_type_id} className="form-group">
@@ -8,8 +8,32 @@ interface RawDataEntry {
   created_at: string;
   type_name: string;
   status: string;
+  total_count: number;
+  pending_count: number;
+  approved_count: number;
+  rejected_count: number;
 }
 
+interface RawDataPage {
+  items: RawDataEntry[];
+  next_cursor: string | null;
+}
+
+interface ImportType {
+  id: string;
+  name: string;
+}
+
+interface Filters {
+  startDate?: string;
+  endDate?: string;
+  importTypeId?: string;
+  status?: string;
+  fileName?: string;
+}
+
+const PAGE_SIZE = 50;
+
 const FileList: React.FC = () => {
   const [data, setData] = useState<RawDataEntry[]>([]);
   const [loading, setLoading] = useState<boolean>(true);
@@ -17,6 +41,14 @@ const FileList: React.FC = () => {
   const [startDate, setStartDate] = useState<string>('');
   const [endDate, setEndDate] = useState<string>('');
   const [noFilesMessage, setNoFilesMessage] = useState<string>('');
+  const [importTypes, setImportTypes] = useState<ImportType[]>([]);
+  const [importTypeId, setImportTypeId] = useState<string>('');
+  const [status, setStatus] = useState<string>('');
+  const [fileName, setFileName] = useState<string>('');
+  // Filters of the list currently shown; "Load more" pages through them with nextCursor
+  const [activeFilters, setActiveFilters] = useState<Filters>({});
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
   const navigate = useNavigate();
 
   useEffect(() => {
@@ -25,32 +57,59 @@ const FileList: React.FC = () => {
     const sevenDaysAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000);
     setStartDate(sevenDaysAgo.toISOString().slice(0,16)); // 'YYYY-MM-DDThh:mm'
     setEndDate(now.toISOString().slice(0,16));
-    fetchData(sevenDaysAgo.toISOString(), now.toISOString());
+    fetchData({ startDate: sevenDaysAgo.toISOString(), endDate: now.toISOString() });
+
+    axios.get<ImportType[]>('http://localhost:5000/import-types')
+      .then((response) => setImportTypes(response.data))
+      .catch((err) => console.error('Error fetching import types:', err));
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
-  const fetchData = async (filterStartDate?: string, filterEndDate?: string) => {
+  const fetchPage = async (filters: Filters, cursor?: string | null) => {
+    const url = 'http://localhost:5000/raw-data';
+    const params: any = { limit: PAGE_SIZE };
+
+    if (filters.startDate) {
+      params.start_date = filters.startDate;
+    }
+
+    if (filters.endDate) {
+      params.end_date = filters.endDate;
+    }
+
+    if (filters.importTypeId) {
+      params.import_type_id = filters.importTypeId;
+    }
+
+    if (filters.status) {
+      params.status = filters.status;
+    }
+
+    if (filters.fileName) {
+      params.file_name = filters.fileName;
+    }
+
+    if (cursor) {
+      params.cursor = cursor;
+    }
+
+    const response = await axios.get<RawDataPage>(url, { params });
+    return response.data;
+  };
+
+  const fetchData = async (filters: Filters) => {
     setLoading(true);
     setError('');
     setNoFilesMessage('');
     try {
-      let url = 'http://localhost:5000/raw-data';
-      const params: any = {};
-
-      if (filterStartDate) {
-        params.start_date = filterStartDate;
-      }
-
-      if (filterEndDate) {
-        params.end_date = filterEndDate;
-      }
-
-      const response = await axios.get<RawDataEntry[]>(url, { params });
-      setData(response.data);
+      const page = await fetchPage(filters);
+      setActiveFilters(filters);
+      setData(page.items);
+      setNextCursor(page.next_cursor);
       setLoading(false);
 
-      if (response.data.length === 0) {
-        setNoFilesMessage('No files found for the selected time range.');
+      if (page.items.length === 0) {
+        setNoFilesMessage('No files found for the selected filters.');
       }
     } catch (err: any) {
       console.error('Error fetching raw data:', err);
@@ -59,6 +118,22 @@ const FileList: React.FC = () => {
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    setError('');
+    try {
+      const page = await fetchPage(activeFilters, nextCursor);
+      setData((previous) => [...previous, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (err: any) {
+      console.error('Error fetching more raw data:', err);
+      setError('Failed to fetch more raw data.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleReview = (raw_data_id: string) => {
     navigate(`/review/${raw_data_id}`);
   };
@@ -72,7 +147,13 @@ const FileList: React.FC = () => {
     // Convert local datetime to UTC
     const utcStartDate = startDate ? new Date(startDate).toISOString() : undefined;
     const utcEndDate = endDate ? new Date(endDate).toISOString() : undefined;
-    fetchData(utcStartDate, utcEndDate);
+    fetchData({
+      startDate: utcStartDate,
+      endDate: utcEndDate,
+      importTypeId: importTypeId || undefined,
+      status: status || undefined,
+      fileName: fileName.trim() || undefined,
+    });
   };
 
   const handleClearFilters = () => {
@@ -80,14 +161,17 @@ const FileList: React.FC = () => {
     const sevenDaysAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000);
     setStartDate(sevenDaysAgo.toISOString().slice(0,16));
     setEndDate(now.toISOString().slice(0,16));
-    fetchData(sevenDaysAgo.toISOString(), now.toISOString());
+    setImportTypeId('');
+    setStatus('');
+    setFileName('');
+    fetchData({ startDate: sevenDaysAgo.toISOString(), endDate: now.toISOString() });
   };
 
   return (
     <div className="container">
       <h2>Find an imported file to approve the import of its data into the database</h2>
 
-      <form onSubmit={handleFilterSubmit} aria-label="Filter raw data by date range">
+      <form onSubmit={handleFilterSubmit} aria-label="Filter raw data">
         <div className="form-group">
           <label htmlFor="start-date">Start Date and Time:</label>
           <input
@@ -112,8 +196,52 @@ const FileList: React.FC = () => {
           />
         </div>
 
-        <button type="submit" aria-label="Filter files by selected date range">Filter</button>
-        <button type="button" onClick={handleClearFilters} className="outlined" aria-label="Clear date filters">Clear Filters</button>
+        <div className="form-group">
+          <label htmlFor="import-type">Import Type:</label>
+          <select
+            id="import-type"
+            name="import-type"
+            value={importTypeId}
+            onChange={(e) => setImportTypeId(e.target.value)}
+          >
+            <option value="">All import types</option>
+            {importTypes.map((type) => (
+              <option key={type.id} value={type.id}>
+                {type.name}
+              </option>
+            ))}
+          </select>
+        </div>
+
+        <div className="form-group">
+          <label htmlFor="status">Status:</label>
+          <select
+            id="status"
+            name="status"
+            value={status}
+            onChange={(e) => setStatus(e.target.value)}
+          >
+            <option value="">All statuses</option>
+            <option value="pending">Records still pending review</option>
+            <option value="reviewed">All records reviewed</option>
+            <option value="empty">No discharge records found</option>
+          </select>
+        </div>
+
+        <div className="form-group">
+          <label htmlFor="file-name">File Name:</label>
+          <input
+            type="text"
+            id="file-name"
+            name="file-name"
+            value={fileName}
+            onChange={(e) => setFileName(e.target.value)}
+            placeholder="Part of the file name"
+          />
+        </div>
+
+        <button type="submit" aria-label="Filter files by the selected filters">Filter</button>
+        <button type="button" onClick={handleClearFilters} className="outlined" aria-label="Clear filters">Clear Filters</button>
       </form>
 
       {loading && <div className="spinner" aria-label="Loading"></div>}
@@ -137,7 +265,10 @@ const FileList: React.FC = () => {
                 <td>{entry.source_file_name}</td>
                 <td>{new Date(entry.created_at).toLocaleString()}</td>
                 <td>{entry.type_name}</td>
-                <td>{entry.status}</td>
+                <td>
+                  {entry.status}
+                  {entry.total_count > 0 && ` (${entry.approved_count} of ${entry.total_count} approved)`}
+                </td>
                 <td>
                   <button onClick={() => handleReview(entry.raw_data_id)} aria-label={`Review ${entry.source_file_name}`}>Review</button>
                 </td>
@@ -146,6 +277,12 @@ const FileList: React.FC = () => {
           </tbody>
         </table>
       )}
+
+      {!loading && nextCursor && (
+        <button type="button" onClick={handleLoadMore} disabled={loadingMore} aria-label="Load more files">
+          {loadingMore ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </div>
   );
 };
@@ -8,7 +8,8 @@ interface RawData {
   fileName: string;
   uploadedBy: string;
   ingestTimestamp: string;
-  rawContent: string;
+  contentSize: number;
+  contentUrl: string;
   importType: string;
 }
 
@@ -40,13 +41,25 @@ interface TemporaryDischarge {
   status: string;
   hospital_name: string | null;
   raw_data_id: string | null;
+  enrichmentData: EnrichmentData[];
   // Add other fields as necessary
 }
 
 interface ReviewData {
   temporaryDischarge: TemporaryDischarge[];
   rawData: RawData | null;
-  enrichmentData: EnrichmentData[];
+}
+
+interface ApprovalResult {
+  temp_discharge_id: string;
+  status: "approved" | "invalid" | "not_found" | "already_approved" | "failed";
+  errors?: { [field: string]: string };
+  error?: string;
+}
+
+interface BatchApprovalResponse {
+  summary: { [status: string]: number };
+  results: ApprovalResult[];
 }
 
 const ReviewPage: React.FC = () => {
@@ -82,18 +95,22 @@ const ReviewPage: React.FC = () => {
     fetchReviewData();
   }, [raw_data_id]);
 
-  const downloadRawPDF = () => {
-    if (reviewData?.rawData?.rawContent) {
-      // Assuming rawContent is a hex string, decode it
-      const byteData = reviewData.rawData.rawContent.replace(/^\\x/, "");
-      const binaryData = new Uint8Array(
-        byteData.match(/.{1,2}/g)!.map((byte) => parseInt(byte, 16))
-      );
-      const blob = new Blob([binaryData], { type: "application/pdf" });
-      const link = document.createElement("a");
-      link.href = URL.createObjectURL(blob);
-      link.download = reviewData.rawData.fileName;
-      link.click();
+  const downloadRawPDF = async () => {
+    if (reviewData?.rawData?.contentUrl) {
+      // The PDF is served separately from the review data (and cached by the browser)
+      try {
+        const response = await axios.get<Blob>(
+          `${API_BASE_URL}${reviewData.rawData.contentUrl}`,
+          { responseType: "blob" }
+        );
+        const link = document.createElement("a");
+        link.href = URL.createObjectURL(response.data);
+        link.download = reviewData.rawData.fileName;
+        link.click();
+      } catch (error) {
+        console.error("Error downloading raw PDF:", error);
+        alert("Failed to download the original PDF.");
+      }
     }
   };
 
@@ -113,7 +130,70 @@ const ReviewPage: React.FC = () => {
     });
   };
 
+  const handleApproveAll = () => {
+    setCurrentRowId(null);
+    setCurrentAction("approve-all");
+    setModalText(
+      "Are you sure you want to approve every pending discharge in this file? This cannot be undone."
+    );
+    setModalVisible(true);
+  };
+
+  const approveAllPending = async () => {
+    try {
+      const response = await axios.post<BatchApprovalResponse>(
+        `${API_BASE_URL}/api/approve`,
+        { raw_data_id }
+      );
+      const results = response.data.results;
+      const approvedIds = new Set(
+        results
+          .filter((result) => result.status === "approved" || result.status === "already_approved")
+          .map((result) => result.temp_discharge_id)
+      );
+
+      setReviewData((prev) => {
+        if (!prev) return prev;
+        const updatedDischarge = prev.temporaryDischarge.map((record) =>
+          approvedIds.has(record.temp_discharge_id)
+            ? { ...record, status: "Approved" }
+            : record
+        );
+        return { ...prev, temporaryDischarge: updatedDischarge };
+      });
+
+      // Show the validation or database errors next to the records that were not approved
+      const rowErrors: { [key: string]: { [field: string]: string } } = {};
+      results.forEach((result) => {
+        if (result.status === "invalid" && result.errors) {
+          rowErrors[result.temp_discharge_id] = result.errors;
+        } else if (result.status === "failed") {
+          rowErrors[result.temp_discharge_id] = {
+            approval: `Approval failed: ${result.error}`,
+          };
+        }
+      });
+      setValidationErrors((prev) => ({ ...prev, ...rowErrors }));
+
+      setModalVisible(false);
+      const notApproved = Object.keys(rowErrors).length;
+      alert(
+        `${response.data.summary.approved || 0} discharge record(s) approved.` +
+          (notApproved ? ` ${notApproved} need attention.` : "")
+      );
+    } catch (error: any) {
+      console.error("Error approving all discharges:", error);
+      setModalText(
+        `Failed to approve the discharges: ${error.response?.data?.error || "unexpected error"}`
+      );
+    }
+  };
+
   const confirmAction = async () => {
+    if (currentAction === "approve-all") {
+      await approveAllPending();
+      return;
+    }
     if (!currentRowId || !currentAction) return;
 
     try {
@@ -215,6 +295,13 @@ const ReviewPage: React.FC = () => {
       {/* Temporary Discharge and Enrichment Data Section */}
       <section aria-labelledby="temporary-discharge-heading">
         <h2 id="temporary-discharge-heading">Temporary Discharge</h2>
+        {reviewData?.temporaryDischarge.some(
+          (discharge) => discharge.status !== "Approved" && discharge.status !== "Rejected"
+        ) && (
+          <button onClick={handleApproveAll} aria-label="Approve all pending discharges">
+            Approve All Pending
+          </button>
+        )}
         {reviewData?.temporaryDischarge.map((discharge) => {
           const errors = validationErrors[discharge.temp_discharge_id];
 
@@ -267,11 +354,7 @@ const ReviewPage: React.FC = () => {
                   Enrichment Data
                 </h4>
                 <div className="table-container">
-                  {reviewData.enrichmentData.filter(
-                    (enrichment) =>
-                      enrichment.temp_discharge_id ===
-                      discharge.temp_discharge_id
-                  ).length > 0 ? (
+                  {discharge.enrichmentData.length > 0 ? (
                     <table className="enrichment-table">
                       <caption>
                         Enrichment Data for {discharge.name}
@@ -285,13 +368,7 @@ const ReviewPage: React.FC = () => {
                         </tr>
                       </thead>
                       <tbody>
-                        {reviewData.enrichmentData
-                          .filter(
-                            (enrichment) =>
-                              enrichment.temp_discharge_id ===
-                              discharge.temp_discharge_id
-                          )
-                          .map((enrichment) => (
+                        {discharge.enrichmentData.map((enrichment) => (
                             <tr key={enrichment.enrichment_data_id}>
                               <td>
                                 {enrichment.enrichment_type_name || "N/A"}
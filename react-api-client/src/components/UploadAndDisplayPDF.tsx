@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import axios from "axios";
 
@@ -21,6 +21,47 @@ interface ImportType {
   name: string;
 }
 
+interface IngestionJob {
+  job_id: string;
+  state: "queued" | "running" | "succeeded" | "failed";
+  stages: { [stage: string]: number };
+  counts: { [counter: string]: number };
+  result: { raw_data_id?: string; duplicate?: boolean };
+  error: string | null;
+}
+
+// How often to poll an ingestion job while it is queued or running, and how many times
+// before giving up (the job itself keeps running on the server)
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_POLL_MAX_ATTEMPTS = 600;
+
+// Resolve after ms, or reject as soon as signal is aborted
+const wait = (ms: number, signal: AbortSignal) =>
+  new Promise<void>((resolve, reject) => {
+    const timer = setTimeout(resolve, ms);
+    signal.addEventListener(
+      "abort",
+      () => {
+        clearTimeout(timer);
+        reject(signal.reason);
+      },
+      { once: true }
+    );
+  });
+
+// Poll /jobs/<id> until the ingestion job finishes. Returns null if it is still running
+// after JOB_POLL_MAX_ATTEMPTS polls; rejects once signal is aborted.
+const waitForJob = async (jobId: string, signal: AbortSignal): Promise<IngestionJob | null> => {
+  for (let attempt = 0; attempt < JOB_POLL_MAX_ATTEMPTS; attempt++) {
+    const response = await axios.get<IngestionJob>(`http://127.0.0.1:5000/jobs/${jobId}`, { signal });
+    if (response.data.state === "succeeded" || response.data.state === "failed") {
+      return response.data;
+    }
+    await wait(JOB_POLL_INTERVAL_MS, signal);
+  }
+  return null;
+};
+
 const UploadAndDisplayPDF: React.FC = () => {
   const [file, setFile] = useState<File | null>(null);
   const [message, setMessage] = useState<string>("");
@@ -31,8 +72,13 @@ const UploadAndDisplayPDF: React.FC = () => {
   const [selectedImportType, setSelectedImportType] = useState<string>("");
   const [rawDataId, setRawDataId] = useState<string | null>(null);
 
+  // Aborts the upload's job polling when the component unmounts
+  const pollController = useRef<AbortController | null>(null);
+
   const navigate = useNavigate();
 
+  useEffect(() => () => pollController.current?.abort(), []);
+
   useEffect(() => {
     // Fetch import types from the backend
     const fetchImportType = async () => {
@@ -82,14 +128,21 @@ const UploadAndDisplayPDF: React.FC = () => {
     setError("");
     setExtractedData(null);
 
+    pollController.current?.abort();
+    const controller = new AbortController();
+    pollController.current = controller;
+
     const formData = new FormData();
     formData.append("file", file);
     formData.append("import_type_id", selectedImportType);
 
     try {
       const response = await axios.post<{
-        [x: string]: any; data: ExtractedData[]; raw_data_id: string 
-}>(
+        job_id?: string;
+        raw_data_id?: string;
+        duplicate?: boolean;
+        error?: string;
+      }>(
         "http://127.0.0.1:5000/upload-pdf",
         formData,
         {
@@ -103,23 +156,70 @@ const UploadAndDisplayPDF: React.FC = () => {
 
       if (response.data.error) {
         setError(response.data.error);
-      } else {
-        setExtractedData(response.data.data);
-        setRawDataId(response.data.raw_data_id); // Store raw_data_id
-        setMessage("PDF uploaded and processed successfully!");
-
-        // Clear file input after successful upload
-        const fileInput = document.querySelector('input[type="file"]') as HTMLInputElement;
-        if (fileInput) {
-          fileInput.value = ""; // Reset the file input
+        return;
+      }
+
+      // A file that was already imported is not processed again
+      let importedRawDataId = response.data.raw_data_id;
+      let duplicate = Boolean(response.data.duplicate);
+
+      if (!importedRawDataId && response.data.job_id) {
+        setMessage("PDF uploaded. Processing...");
+        const job = await waitForJob(response.data.job_id, controller.signal);
+        if (!job) {
+          setMessage("");
+          setError("The PDF is taking too long to process. It will appear in the import list once it is done.");
+          return;
         }
-        setFile(null); // Clear the file state
+
+        if (job.state === "failed" || !job.result.raw_data_id) {
+          setMessage("");
+          setError(job.error || "Failed to process the PDF.");
+          return;
+        }
+        importedRawDataId = job.result.raw_data_id;
+        duplicate = Boolean(job.result.duplicate);
+      }
+
+      if (!importedRawDataId) {
+        setError("Failed to process the PDF.");
+        return;
       }
+
+      // Load the parsed rows that the job stored for review
+      const reviewResponse = await axios.get<{ temporaryDischarge: ExtractedData[] }>(
+        `http://127.0.0.1:5000/review/${importedRawDataId}`
+      );
+      setExtractedData(
+        reviewResponse.data.temporaryDischarge.map((record) => ({
+          ...record,
+          hospital: record.hospital_name,
+        }))
+      );
+      setRawDataId(importedRawDataId); // Store raw_data_id
+      setMessage(
+        duplicate
+          ? "This PDF has already been imported. Showing the existing records."
+          : "PDF uploaded and processed successfully!"
+      );
+
+      // Clear file input after successful upload
+      const fileInput = document.querySelector('input[type="file"]') as HTMLInputElement;
+      if (fileInput) {
+        fileInput.value = ""; // Reset the file input
+      }
+      setFile(null); // Clear the file state
     } catch (error: any) {
+      if (controller.signal.aborted) {
+        return; // Unmounted, or replaced by a newer upload
+      }
       console.error("Error uploading PDF:", error);
+      setMessage("");
       setError(error.response?.data?.error || "Failed to upload and process the PDF.");
     } finally {
-      setLoading(false);
+      if (!controller.signal.aborted) {
+        setLoading(false);
+      }
     }
   };
 